@@ -41,9 +41,7 @@ def get_light_agent(client: ChatClientProtocol) -> ChatAgent:
         name="light",
         middleware=[logging_agent_middleware, logging_function_middleware, chat],
         tools=[get_lights, change_state],
-        chat_message_store_factory=lambda: history.PostgresChatMessageStore(
-            postgres_url=os.getenv("POSTGRES_URI")
-        ),
+        chat_message_store_factory=history.PostgresChatMessageStore.from_settings,
         chat_options={"tool_choice": "required"},
     )
     return agent
@@ -0,0 +1,108 @@
+from pathlib import Path
+import sys
+
+current_file_path = Path(__file__).resolve()
+project_root = current_file_path.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from agent_adapter.checkpoint.benchmark_checkpoint import make_checkpoints
+from agent_adapter.checkpoint.memory import MemoryCheckpointStorage
+from agent_adapter.checkpoint.postgres import PostgresCheckpointStorage
+from agent_adapter.checkpoint.sqlite import SqliteCheckpointStorage
+from agent_adapter.storage.engine import dispose_engines
+
+
+async def timed(calls) -> list[float]:
+    latencies = []
+    for call in calls:
+        start = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(backend: str, operation: str, latencies: list[float]):
+    print(
+        f"{backend:<10} {operation:<8} p50={statistics.median(latencies):.3f}ms "
+        f"p99={statistics.quantiles(latencies, n=100)[-1]:.3f}ms"
+    )
+
+
+async def bench(name: str, storage, steps: int, executors: int):
+    """Save a `steps`-superstep workflow, then load and list it back."""
+    workflow_id = f"bench-{name}"
+    checkpoints = list(make_checkpoints(workflow_id, steps, executors))
+    ids = [checkpoint.checkpoint_id for checkpoint in checkpoints]
+
+    report(
+        name,
+        "save",
+        await timed(
+            (lambda c=checkpoint: storage.save_checkpoint(c))
+            for checkpoint in checkpoints
+        ),
+    )
+    report(
+        name,
+        "load",
+        await timed(
+            (lambda i=checkpoint_id: storage.load_checkpoint(i))
+            for checkpoint_id in ids
+        ),
+    )
+    report(
+        name,
+        "latest",
+        await timed(
+            lambda: storage.load_latest_checkpoint(workflow_id) for _ in range(50)
+        ),
+    )
+    report(
+        name,
+        "list",
+        await timed(
+            lambda: storage.list_checkpoint_summaries(workflow_id, limit=50)
+            for _ in range(50)
+        ),
+    )
+    await storage.prune_checkpoints(workflow_id, keep_last=0)
+
+
+async def run(postgres_url: str | None, steps: int, executors: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        storages = {
+            "memory": MemoryCheckpointStorage(),
+            "sqlite": SqliteCheckpointStorage(f"sqlite+aiosqlite:///{tmp}/cp.db"),
+        }
+        if postgres_url:
+            storages["postgres"] = PostgresCheckpointStorage(postgres_url)
+
+        print(f"{steps} supersteps, {executors} executors\n")
+        for name, storage in storages.items():
+            await bench(name, storage, steps, executors)
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--postgres_url",
+        default=os.getenv("POSTGRES_URI"),
+        help="also measure PostgresCheckpointStorage (skipped when unset)",
+    )
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--executors", type=int, default=4)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.postgres_url, args.steps, args.executors))
@@ -0,0 +1,160 @@
+from pathlib import Path
+import sys
+
+current_file_path = Path(__file__).resolve()
+project_root = current_file_path.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+from agent_framework import WorkflowCheckpoint
+from sqlalchemy import Column, Integer, String, JSON, delete, insert, text
+from sqlalchemy.orm import declarative_base
+
+from agent_adapter.checkpoint.postgres import (
+    PostgresCheckpointStorage,
+    WorkflowCheckpointORM,
+)
+from agent_adapter.storage.engine import dispose_engines, ensure_schema, get_engine
+
+LegacyBase = declarative_base()
+
+
+class LegacyCheckpoint(LegacyBase):
+    """The previous layout: the whole state in JSON columns on every save."""
+
+    __tablename__ = "bench_json_workflow_checkpoints"
+
+    checkpoint_id = Column(String, primary_key=True)
+    workflow_id = Column(String, nullable=False)
+    timestamp = Column(String)
+    messages = Column(JSON)
+    shared_state = Column(JSON)
+    pending_request_info_events = Column(JSON)
+    iteration_count = Column(Integer)
+    metadata_data = Column(JSON)
+    version = Column(String)
+
+
+def make_checkpoints(workflow_id: str, steps: int, executors: int):
+    """
+    A long workflow in the shape `get_exec_workflow` checkpoints: per-executor
+    state in `shared_state` that grows by one message per superstep, plus the
+    messages in flight between supersteps.
+    """
+    executor_state = {f"executor-{e}": {"messages": []} for e in range(executors)}
+    for step in range(steps):
+        executor = f"executor-{step % executors}"
+        message = {
+            "role": "assistant",
+            "text": f"step {step}: " + "intermediate result " * 20,
+        }
+        executor_state[executor]["messages"].append(message)
+        yield WorkflowCheckpoint(
+            workflow_id=workflow_id,
+            messages={
+                executor: [{"data": message, "source_id": executor, "target_id": None}]
+            },
+            shared_state={
+                "_workflow_run_kwargs": {},
+                "_executor_state": json.loads(json.dumps(executor_state)),
+            },
+            iteration_count=step,
+            metadata={"superstep": step, "checkpoint_type": "superstep"},
+        )
+
+
+async def save_legacy(engine, checkpoint: WorkflowCheckpoint) -> int:
+    row = {
+        "checkpoint_id": checkpoint.checkpoint_id,
+        "workflow_id": checkpoint.workflow_id,
+        "timestamp": checkpoint.timestamp,
+        "messages": checkpoint.messages,
+        "shared_state": checkpoint.shared_state,
+        "pending_request_info_events": checkpoint.pending_request_info_events,
+        "iteration_count": checkpoint.iteration_count,
+        "metadata_data": checkpoint.metadata,
+        "version": checkpoint.version,
+    }
+    async with engine.begin() as conn:
+        await conn.execute(insert(LegacyCheckpoint).values(row))
+    return sum(
+        len(json.dumps(row[column]))
+        for column in ("messages", "shared_state", "pending_request_info_events")
+    ) + len(json.dumps(row["metadata_data"]))
+
+
+def report(label: str, latencies: list[float], written: int):
+    print(
+        f"{label:<22} save p50={statistics.median(latencies):.2f}ms "
+        f"max={max(latencies):.2f}ms written={written / 1024:.1f}KiB"
+    )
+
+
+async def run(db_url: str, steps: int, executors: int, snapshot_interval: int):
+    engine = get_engine(db_url)
+    await ensure_schema(engine, LegacyBase.metadata)
+    storage = PostgresCheckpointStorage(db_url, snapshot_interval=snapshot_interval)
+    checkpoints = list(make_checkpoints("bench-json", steps, executors))
+
+    latencies, written = [], 0
+    for checkpoint in checkpoints:
+        start = time.perf_counter()
+        written += await save_legacy(engine, checkpoint)
+        latencies.append((time.perf_counter() - start) * 1000)
+    report("json columns", latencies, written)
+
+    latencies = []
+    for checkpoint in make_checkpoints("bench-binary", steps, executors):
+        start = time.perf_counter()
+        await storage.save_checkpoint(checkpoint)
+        latencies.append((time.perf_counter() - start) * 1000)
+        checkpoints.append(checkpoint)
+    async with engine.connect() as conn:
+        written = await conn.scalar(
+            text(
+                "SELECT sum(length(payload)) FROM python_workflow_checkpoints "
+                "WHERE workflow_id = 'bench-binary'"
+            )
+        )
+    report(f"delta+zstd (every {snapshot_interval})", latencies, written)
+
+    latencies = []
+    for checkpoint in checkpoints[steps:]:
+        start = time.perf_counter()
+        loaded = await storage.load_checkpoint(checkpoint.checkpoint_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert loaded.shared_state == checkpoint.shared_state
+    print(
+        f"{'':<22} load p50={statistics.median(latencies):.2f}ms "
+        f"max={max(latencies):.2f}ms"
+    )
+
+    async with engine.begin() as conn:
+        await conn.execute(delete(LegacyCheckpoint))
+        await conn.execute(
+            delete(WorkflowCheckpointORM).filter(
+                WorkflowCheckpointORM.workflow_id == "bench-binary"
+            )
+        )
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db_url", default=os.getenv("POSTGRES_URI"))
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--executors", type=int, default=4)
+    parser.add_argument("--snapshot_interval", type=int, default=16)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.db_url, args.steps, args.executors, args.snapshot_interval))
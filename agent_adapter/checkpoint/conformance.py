@@ -0,0 +1,242 @@
+from pathlib import Path
+import sys
+
+current_file_path = Path(__file__).resolve()
+project_root = current_file_path.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import uuid
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from agent_framework import WorkflowCheckpoint
+
+from agent_adapter.checkpoint.memory import MemoryCheckpointStorage
+from agent_adapter.checkpoint.postgres import PostgresCheckpointStorage
+from agent_adapter.checkpoint.sqlite import SqliteCheckpointStorage
+from agent_adapter.storage.engine import dispose_engines
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_checkpoint(workflow_id: str, step: int, log: list) -> WorkflowCheckpoint:
+    log.append({"step": step, "text": f"result of superstep {step}"})
+    return WorkflowCheckpoint(
+        workflow_id=workflow_id,
+        timestamp=(START + timedelta(seconds=step)).isoformat(),
+        messages={"executor": [{"data": step}]} if step % 2 else {},
+        shared_state={
+            "_executor_state": {"executor": {"messages": list(log)}},
+            "last": step,
+            **({"odd": True} if step % 2 else {}),
+        },
+        iteration_count=step,
+        metadata={"superstep": step},
+    )
+
+
+async def check_storage(storage, steps: int = 40) -> None:
+    """
+    The behaviour every checkpoint storage of this package shares; raises
+    AssertionError at the first difference.
+    """
+    workflow_id = f"conformance-{uuid.uuid4()}"
+    log = []
+    saved = [make_checkpoint(workflow_id, step, log) for step in range(steps)]
+    expected = {checkpoint.checkpoint_id: checkpoint.to_dict() for checkpoint in saved}
+    for checkpoint in saved:
+        assert await storage.save_checkpoint(checkpoint) == checkpoint.checkpoint_id
+
+    async def assert_stored(ids: list[str]):
+        for checkpoint_id in ids:
+            loaded = await storage.load_checkpoint(checkpoint_id)
+            assert loaded is not None, checkpoint_id
+            assert loaded.to_dict() == expected[checkpoint_id], checkpoint_id
+        assert await storage.list_checkpoint_ids(workflow_id) == ids
+        listed = await storage.list_checkpoints(workflow_id)
+        assert [c.to_dict() for c in listed] == [expected[i] for i in ids]
+        latest = await storage.load_latest_checkpoint(workflow_id)
+        assert latest.to_dict() == expected[ids[-1]]
+
+    ids = [checkpoint.checkpoint_id for checkpoint in saved]
+    await assert_stored(ids)
+    assert await storage.load_checkpoint("missing") is None
+    assert await storage.load_latest_checkpoint(f"{workflow_id}-missing") is None
+
+    # Loads are independent copies
+    loaded = await storage.load_checkpoint(ids[5])
+    loaded.shared_state["last"] = -1
+    assert (await storage.load_checkpoint(ids[5])).shared_state["last"] == 5
+
+    for newest_first in (True, False):
+        pages, cursor = [], None
+        while True:
+            page, cursor = await storage.list_checkpoint_summaries(
+                workflow_id, cursor, limit=7, newest_first=newest_first
+            )
+            if not page:
+                break
+            pages.extend(summary.checkpoint_id for summary in page)
+        assert pages == (ids[::-1] if newest_first else ids), newest_first
+    [summary], _ = await storage.list_checkpoint_summaries(workflow_id, limit=1)
+    assert (summary.checkpoint_id, summary.iteration_count) == (ids[-1], steps - 1)
+
+    # Deleting the first, a middle and the last checkpoint keeps the rest intact
+    for checkpoint_id in (ids[0], ids[10], ids[-1]):
+        assert await storage.delete_checkpoint(checkpoint_id)
+        assert not await storage.delete_checkpoint(checkpoint_id)
+        ids.remove(checkpoint_id)
+    await assert_stored(ids)
+
+    # Retention keeps the newest 20 and anything newer than superstep 25
+    assert await storage.prune_checkpoints(workflow_id) == 0
+    cutoff = START + timedelta(seconds=25)
+    pruned = await storage.prune_checkpoints(
+        workflow_id, keep_last=20, older_than=cutoff, batch_size=3
+    )
+    assert pruned == len(ids) - 20, pruned
+    ids = ids[-20:]
+    await assert_stored(ids)
+    pruned = await storage.prune_checkpoints(workflow_id, older_than=cutoff)
+    ids = [i for i in ids if expected[i]["iteration_count"] >= 25]
+    assert pruned == 20 - len(ids), pruned
+    await assert_stored(ids)
+
+    # Saving continues after deletes and pruning
+    more = [make_checkpoint(workflow_id, step, log) for step in range(steps, steps + 5)]
+    for checkpoint in more:
+        await storage.save_checkpoint(checkpoint)
+        expected[checkpoint.checkpoint_id] = checkpoint.to_dict()
+        ids.append(checkpoint.checkpoint_id)
+    await assert_stored(ids)
+
+    assert await storage.prune_checkpoints(workflow_id, keep_last=0) == len(ids)
+    assert await storage.list_checkpoint_ids(workflow_id) == []
+
+
+async def check_shared_database(first, second, steps: int = 12) -> None:
+    """
+    Two storages on one database, as two processes would be: each one's
+    deltas must stay correct after the other saved, deleted or pruned.
+    """
+    workflow_id = f"shared-{uuid.uuid4()}"
+    log, expected = [], {}
+
+    async def save(storage, step):
+        checkpoint = make_checkpoint(workflow_id, step, log)
+        expected[checkpoint.checkpoint_id] = checkpoint.to_dict()
+        await storage.save_checkpoint(checkpoint)
+        return checkpoint.checkpoint_id
+
+    ids = [await save(first, step) for step in range(3)]
+    # The other storage continues the chain, then the first one again
+    ids += [await save(second, step) for step in range(3, 5)]
+    ids += [await save(first, step) for step in range(5, 7)]
+    # The other storage deletes the first one's head, then prunes
+    assert await second.delete_checkpoint(ids.pop())
+    ids.append(await save(first, 7))
+    assert await second.prune_checkpoints(workflow_id, keep_last=2) == len(ids) - 2
+    ids = ids[-2:]
+    ids += [await save(first, step) for step in range(8, steps)]
+
+    for storage in (first, second):
+        assert await storage.list_checkpoint_ids(workflow_id) == ids
+        for checkpoint_id in ids:
+            loaded = await storage.load_checkpoint(checkpoint_id)
+            assert loaded.to_dict() == expected[checkpoint_id], checkpoint_id
+    await first.prune_checkpoints(workflow_id, keep_last=0)
+
+
+async def check_concurrent_writers(first, second, rounds: int = 6) -> None:
+    """
+    Saves of one workflow racing each other, within one storage and across
+    two storages on one database: every checkpoint must stay readable.
+    """
+    workflow_id = f"concurrent-{uuid.uuid4()}"
+    log, expected = [], {}
+    step = 0
+    for _ in range(rounds):
+        for writers in ((first, first), (first, second)):
+            checkpoints = []
+            for _ in writers:
+                checkpoints.append(make_checkpoint(workflow_id, step, log))
+                step += 1
+            for checkpoint in checkpoints:
+                expected[checkpoint.checkpoint_id] = checkpoint.to_dict()
+            await asyncio.gather(
+                *(
+                    storage.save_checkpoint(checkpoint)
+                    for storage, checkpoint in zip(writers, checkpoints)
+                )
+            )
+
+    for storage in (first, second):
+        listed = await storage.list_checkpoints(workflow_id)
+        assert {c.checkpoint_id: c.to_dict() for c in listed} == expected
+        for checkpoint_id, checkpoint in expected.items():
+            loaded = await storage.load_checkpoint(checkpoint_id)
+            assert loaded.to_dict() == checkpoint, checkpoint_id
+    await first.prune_checkpoints(workflow_id, keep_last=0)
+
+
+async def run(postgres_url: str | None):
+    with tempfile.TemporaryDirectory() as tmp:
+        storages = {
+            "memory": MemoryCheckpointStorage(),
+            "sqlite": SqliteCheckpointStorage(f"sqlite+aiosqlite:///{tmp}/cp.db"),
+            "sqlite, snapshot every 3": SqliteCheckpointStorage(
+                f"sqlite+aiosqlite:///{tmp}/cp.db", snapshot_interval=3
+            ),
+        }
+        if postgres_url:
+            storages["postgres"] = PostgresCheckpointStorage(postgres_url)
+            storages["postgres, snapshot every 3"] = PostgresCheckpointStorage(
+                postgres_url, snapshot_interval=3
+            )
+
+        for name, storage in storages.items():
+            await check_storage(storage)
+            print(f"{name}: ok")
+
+        shared = [
+            (
+                "sqlite",
+                lambda: SqliteCheckpointStorage(
+                    f"sqlite+aiosqlite:///{tmp}/cp.db", snapshot_interval=4
+                ),
+            )
+        ]
+        if postgres_url:
+            shared.append(
+                (
+                    "postgres",
+                    lambda: PostgresCheckpointStorage(
+                        postgres_url, snapshot_interval=4
+                    ),
+                )
+            )
+        for name, make_storage in shared:
+            await check_shared_database(make_storage(), make_storage())
+            print(f"{name}, two storages: ok")
+            await check_concurrent_writers(make_storage(), make_storage())
+            print(f"{name}, concurrent writers: ok")
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--postgres_url",
+        default=os.getenv("POSTGRES_URI"),
+        help="also check PostgresCheckpointStorage (skipped when unset)",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.postgres_url))
@@ -0,0 +1,143 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import List, Tuple
+
+import orjson
+
+from agent_framework import WorkflowCheckpoint
+
+from agent_adapter.checkpoint.postgres import (
+    PRUNE_BATCH_SIZE,
+    CheckpointSummary,
+    as_timestamp,
+)
+
+
+class MemoryCheckpointStorage:
+    """
+    Checkpoints in process memory, with the same API and ordering as
+    PostgresCheckpointStorage; for tests and local runs without a database.
+
+    Checkpoints are kept serialized, so a loaded checkpoint never shares
+    state with the saved one or with other loads, as with a database.
+    """
+
+    def __init__(self):
+        self._payloads: dict[str, bytes] = {}
+        self._summaries: dict[str, CheckpointSummary] = {}
+        # Per workflow, (timestamp, checkpoint_id) keys in ascending order
+        self._timelines: dict[str, list[tuple[str, str]]] = {}
+
+    @staticmethod
+    def _key(summary: CheckpointSummary) -> tuple[str, str]:
+        return (summary.timestamp or "", summary.checkpoint_id)
+
+    async def save_checkpoint(self, checkpoint: WorkflowCheckpoint) -> str:
+        if checkpoint.checkpoint_id in self._payloads:
+            await self.delete_checkpoint(checkpoint.checkpoint_id)
+
+        summary = CheckpointSummary(
+            checkpoint.checkpoint_id,
+            checkpoint.workflow_id,
+            checkpoint.timestamp,
+            checkpoint.iteration_count,
+        )
+        self._payloads[checkpoint.checkpoint_id] = orjson.dumps(
+            checkpoint.to_dict(), option=orjson.OPT_NON_STR_KEYS
+        )
+        self._summaries[checkpoint.checkpoint_id] = summary
+        insort(
+            self._timelines.setdefault(checkpoint.workflow_id, []), self._key(summary)
+        )
+        return checkpoint.checkpoint_id
+
+    async def load_checkpoint(self, checkpoint_id: str) -> WorkflowCheckpoint | None:
+        payload = self._payloads.get(checkpoint_id)
+        if payload is None:
+            return None
+        return WorkflowCheckpoint.from_dict(orjson.loads(payload))
+
+    async def load_latest_checkpoint(
+        self, workflow_id: str
+    ) -> WorkflowCheckpoint | None:
+        timeline = self._timelines.get(workflow_id)
+        if not timeline:
+            return None
+        return await self.load_checkpoint(timeline[-1][1])
+
+    async def list_checkpoint_ids(self, workflow_id: str | None = None) -> list[str]:
+        if workflow_id:
+            return [
+                checkpoint_id
+                for _, checkpoint_id in self._timelines.get(workflow_id, [])
+            ]
+        return list(self._payloads)
+
+    async def list_checkpoint_summaries(
+        self,
+        workflow_id: str,
+        cursor: str | None = None,
+        limit: int = 100,
+        newest_first: bool = True,
+    ) -> Tuple[List[CheckpointSummary], str | None]:
+        timeline = self._timelines.get(workflow_id, [])
+        if cursor is None:
+            start, end = 0, len(timeline)
+        elif cursor in self._summaries:
+            position = self._key(self._summaries[cursor])
+            if newest_first:
+                start, end = 0, bisect_left(timeline, position)
+            else:
+                start, end = bisect_right(timeline, position), len(timeline)
+        else:
+            # Like the SQL storages: an unknown cursor matches nothing
+            start, end = 0, 0
+
+        if newest_first:
+            keys = timeline[max(start, end - limit) : end][::-1]
+        else:
+            keys = timeline[start : start + limit]
+        summaries = [self._summaries[checkpoint_id] for _, checkpoint_id in keys]
+        return summaries, (summaries[-1].checkpoint_id if summaries else cursor)
+
+    async def list_checkpoints(
+        self, workflow_id: str | None = None
+    ) -> list[WorkflowCheckpoint]:
+        checkpoints = [
+            await self.load_checkpoint(checkpoint_id)
+            for checkpoint_id in await self.list_checkpoint_ids(workflow_id)
+        ]
+        return sorted(checkpoints, key=lambda checkpoint: checkpoint.timestamp or "")
+
+    async def delete_checkpoint(self, checkpoint_id: str) -> bool:
+        summary = self._summaries.pop(checkpoint_id, None)
+        if summary is None:
+            return False
+
+        del self._payloads[checkpoint_id]
+        timeline = self._timelines[summary.workflow_id]
+        timeline.pop(bisect_left(timeline, self._key(summary)))
+        return True
+
+    async def prune_checkpoints(
+        self,
+        workflow_id: str,
+        keep_last: int | None = None,
+        older_than: datetime | str | None = None,
+        batch_size: int = PRUNE_BATCH_SIZE,
+    ) -> int:
+        if keep_last is None and older_than is None:
+            return 0
+
+        timeline = self._timelines.get(workflow_id, [])
+        end = len(timeline)
+        if keep_last is not None:
+            end = max(len(timeline) - keep_last, 0)
+        if older_than is not None:
+            end = min(end, bisect_left(timeline, (as_timestamp(older_than),)))
+
+        for _, checkpoint_id in timeline[:end]:
+            del self._payloads[checkpoint_id]
+            del self._summaries[checkpoint_id]
+        del timeline[:end]
+        return end
@@ -1,18 +1,53 @@
 import uuid
 import asyncio
+import weakref
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from datetime import datetime
-from typing import List, Optional
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Tuple
+
+import orjson
+import zstandard
 
 from agent_framework import WorkflowCheckpoint
 
-from sqlalchemy import create_engine, Column, Integer, String, JSON, DateTime, inspect
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    JSON,
+    LargeBinary,
+    Index,
+    and_,
+    delete,
+    exists,
+    insert,
+    literal,
+    or_,
+    tuple_,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import aliased
+
+from agent_adapter.storage.engine import ensure_schema, get_engine, get_sessionmaker
 
+# A full snapshot is written every SNAPSHOT_INTERVAL checkpoints of a
+# workflow; the ones in between only store their delta to the previous one
+SNAPSHOT_INTERVAL = 16
+ZSTD_LEVEL = 3
+# Rows deleted per transaction by prune_checkpoints
+PRUNE_BATCH_SIZE = 1000
+# Workflows whose last checkpoint state is kept in memory, least recently
+# saved evicted first
+MAX_CACHED_HEADS = 256
+
+# The parts of a checkpoint that are delta-encoded
+STATE_FIELDS = ("messages", "shared_state", "pending_request_info_events", "metadata")
 
 Base = declarative_base()
 
@@ -23,82 +58,285 @@ class WorkflowCheckpointORM(Base):
     checkpoint_id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     workflow_id = Column(String, nullable=False)
     timestamp = Column(String)
-    messages = Column(JSON, default=dict)
-    shared_state = Column(JSON, default=dict)
-    pending_request_info_events = Column(JSON, default=dict)
     iteration_count = Column(Integer, default=0)
-    metadata_data = Column(JSON, default=dict)
     version = Column(String, default="1.0")
+    # zstd-compressed orjson: the state itself for a snapshot (chain_index 0),
+    # the delta to checkpoint chain_index - 1 of the same snapshot otherwise
+    payload = Column(LargeBinary, nullable=True)
+    snapshot_id = Column(String, nullable=True)
+    chain_index = Column(Integer, nullable=True)
+    # Rows written before the binary format keep their state here
+    messages = Column(JSON, nullable=True)
+    shared_state = Column(JSON, nullable=True)
+    pending_request_info_events = Column(JSON, nullable=True)
+    metadata_data = Column(JSON, nullable=True)
 
-    def to_dict(self):
-        return {
-            "checkpoint_id": self.checkpoint_id,
-            "workflow_id": self.workflow_id,
-            "timestamp": self.timestamp,
-            "messages": self.messages,
-            "shared_state": self.shared_state,
-            "pending_request_info_events": self.pending_request_info_events,
-            "iteration_count": self.iteration_count,
-            "metadata": self.metadata_data,
-            "version": self.version,
-        }
+    __table_args__ = (
+        # One checkpoint per chain position, so two writers extending the
+        # same chain cannot both succeed
+        Index(
+            "ux_python_workflow_checkpoints_chain",
+            "snapshot_id",
+            "chain_index",
+            unique=True,
+        ),
+        # Listing, latest lookup and retention walk this index only
+        Index(
+            "ix_python_workflow_checkpoints_workflow_timestamp",
+            "workflow_id",
+            "timestamp",
+            "checkpoint_id",
+        ),
+    )
+
+
+# The non-unique chain index of earlier versions, replaced by the unique one
+DROP_CHAIN_INDEX = "DROP INDEX IF EXISTS ix_python_workflow_checkpoints_chain"
+
+# Tables created before the binary format get its columns added in place
+UPGRADES = (
+    "ALTER TABLE IF EXISTS python_workflow_checkpoints "
+    "ADD COLUMN IF NOT EXISTS payload BYTEA, "
+    "ADD COLUMN IF NOT EXISTS snapshot_id VARCHAR, "
+    "ADD COLUMN IF NOT EXISTS chain_index INTEGER",
+    DROP_CHAIN_INDEX,
+)
+
+
+@dataclass
+class CheckpointSummary:
+    """What listing a checkpoint needs, without its state."""
+
+    checkpoint_id: str
+    workflow_id: str
+    timestamp: str
+    iteration_count: int
+
+
+_compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+def encode(value: Any) -> bytes:
+    return _compressor.compress(orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS))
+
+
+def decode(payload: bytes) -> Any:
+    return orjson.loads(_decompressor.decompress(payload))
+
+
+def as_timestamp(value: datetime | str) -> str:
+    """`value` in the ISO format of checkpoint timestamps (UTC for naive)."""
+    if isinstance(value, str):
+        return value
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def checkpoint_state(checkpoint: WorkflowCheckpoint) -> dict[str, Any]:
+    """
+    The delta-encoded fields of `checkpoint` as plain JSON values, detached
+    from the live workflow objects.
+    """
+    return orjson.loads(
+        orjson.dumps(
+            {field: getattr(checkpoint, field) for field in STATE_FIELDS},
+            option=orjson.OPT_NON_STR_KEYS,
+        )
+    )
+
+
+def diff_state(old: dict, new: dict, path: tuple = ()) -> list[list]:
+    """
+    Operations turning `old` into `new`: `["s", path, value]` sets a key,
+    `["d", path]` deletes one and `["x", path, items]` appends to a list.
+    Nested dicts are diffed key by key, so a superstep that touches one
+    executor's state only records that executor's change.
+    """
+    ops = []
+    for key, value in new.items():
+        if key not in old:
+            ops.append(["s", [*path, key], value])
+            continue
+
+        previous = old[key]
+        if previous == value:
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict):
+            ops.extend(diff_state(previous, value, (*path, key)))
+        elif (
+            isinstance(previous, list)
+            and isinstance(value, list)
+            and len(value) > len(previous)
+            and value[: len(previous)] == previous
+        ):
+            ops.append(["x", [*path, key], value[len(previous) :]])
+        else:
+            ops.append(["s", [*path, key], value])
+
+    for key in old:
+        if key not in new:
+            ops.append(["d", [*path, key]])
+    return ops
 
-    @classmethod
-    def from_dict(cls, data):
-        return cls(**data)
 
+def apply_delta(state: dict, ops: list[list]) -> dict:
+    """
+    The state `ops` (from `diff_state`) lead to from `state`. Only the dicts
+    on the changed paths are copied; `state` itself is left untouched.
+    """
+    root = dict(state)
+    copied = {id(root)}
+    for op in ops:
+        kind, path = op[0], op[1]
+        node = root
+        for key in path[:-1]:
+            child = node[key]
+            if id(child) not in copied:
+                child = dict(child)
+                node[key] = child
+                copied.add(id(child))
+            node = child
 
-# Convert WorkflowCheckpoint to WorkflowCheckpointORM
+        key = path[-1]
+        if kind == "s":
+            node[key] = op[2]
+        elif kind == "d":
+            node.pop(key, None)
+        else:
+            node[key] = node[key] + op[2]
+    return root
+
+
+# Convert WorkflowCheckpoint to a full snapshot WorkflowCheckpointORM
 def workflow_checkpoint_to_orm(checkpoint: WorkflowCheckpoint) -> WorkflowCheckpointORM:
     return WorkflowCheckpointORM(
         checkpoint_id=checkpoint.checkpoint_id,
         workflow_id=checkpoint.workflow_id,
         timestamp=checkpoint.timestamp,
-        messages=checkpoint.messages,
-        shared_state=checkpoint.shared_state,
-        pending_request_info_events=checkpoint.pending_request_info_events,
         iteration_count=checkpoint.iteration_count,
-        metadata_data=checkpoint.metadata,
         version=checkpoint.version,
+        payload=encode(checkpoint_state(checkpoint)),
+        snapshot_id=checkpoint.checkpoint_id,
+        chain_index=0,
     )
 
 
-# Convert WorkflowCheckpointORM to WorkflowCheckpoint
-def workflow_checkpoint_from_orm(orm: WorkflowCheckpointORM) -> WorkflowCheckpoint:
+def orm_state(orm: WorkflowCheckpointORM) -> dict[str, Any]:
+    """The state stored in a snapshot or pre-binary row."""
+    if orm.payload is None:
+        return {
+            "messages": orm.messages,
+            "shared_state": orm.shared_state,
+            "pending_request_info_events": orm.pending_request_info_events,
+            "metadata": orm.metadata_data,
+        }
+    if orm.chain_index != 0:
+        raise ValueError(f"Checkpoint {orm.checkpoint_id} only stores a delta")
+    return decode(orm.payload)
+
+
+# Convert WorkflowCheckpointORM to WorkflowCheckpoint; the state of a delta
+# row has to be reconstructed by the caller and passed in
+def workflow_checkpoint_from_orm(
+    orm: WorkflowCheckpointORM, state: dict[str, Any] | None = None
+) -> WorkflowCheckpoint:
+    if state is None:
+        state = orm_state(orm)
+
     return WorkflowCheckpoint(
         checkpoint_id=orm.checkpoint_id,
         workflow_id=orm.workflow_id,
         timestamp=orm.timestamp,
-        messages=orm.messages,
-        shared_state=orm.shared_state,
-        pending_request_info_events=orm.pending_request_info_events,
+        messages=state["messages"] or {},
+        shared_state=state["shared_state"] or {},
+        pending_request_info_events=state["pending_request_info_events"] or {},
         iteration_count=orm.iteration_count,
-        metadata=orm.metadata_data,
+        metadata=state["metadata"] or {},
         version=orm.version,
     )
 
 
+def replay(
+    rows: Iterable[WorkflowCheckpointORM],
+) -> list[tuple[WorkflowCheckpointORM, dict[str, Any]]]:
+    """
+    Reconstruct the state of every row; rows must come ordered by
+    (snapshot_id, chain_index) so that each delta follows its base.
+    """
+    heads: dict[str, tuple[int, dict]] = {}
+    replayed = []
+    for row in rows:
+        if row.payload is None or row.chain_index == 0:
+            state = orm_state(row)
+        else:
+            index, base = heads.get(row.snapshot_id, (None, None))
+            if index != row.chain_index - 1:
+                raise ValueError(
+                    f"Checkpoint {row.checkpoint_id} is missing its base "
+                    f"{row.snapshot_id}#{row.chain_index - 1}"
+                )
+            state = apply_delta(base, decode(row.payload))
+
+        if row.snapshot_id is not None:
+            heads[row.snapshot_id] = (row.chain_index, state)
+        replayed.append((row, state))
+    return replayed
+
+
+@dataclass
+class _ChainHead:
+    """The last checkpoint of a workflow, which the next delta is based on."""
+
+    checkpoint_id: str
+    snapshot_id: str
+    chain_index: int
+    state: dict[str, Any]
+
+
 class PostgresCheckpointStorage:
-    def __init__(self, db_url: str):
+    """
+    Workflow checkpoints stored as zstd-compressed orjson.
+
+    Every `snapshot_interval`-th checkpoint of a workflow is a full
+    snapshot; the ones in between only store what changed since the
+    previous checkpoint this storage saved for the workflow, so a
+    superstep writes its changes instead of the whole workflow state.
+    Loading replays at most `snapshot_interval - 1` small deltas on top of
+    the snapshot, all read in one query.
+
+    The state of the last checkpoint is cached for at most `max_heads`
+    workflows. Before a delta is written, the cached head is checked to
+    still be the tail of its chain in the database; when it is missing or
+    stale, e.g. after another process deleted, pruned or saved checkpoints
+    of the workflow, the head is reloaded from the database.
+
+    Saves of one workflow are serialized within the storage. A unique
+    (snapshot_id, chain_index) index catches writers in other processes:
+    the save that loses the race is written as a full snapshot instead.
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        snapshot_interval: int = SNAPSHOT_INTERVAL,
+        max_heads: int = MAX_CACHED_HEADS,
+    ):
         self.db_url = db_url
-        self.engine = create_async_engine(self.db_url, echo=True, future=True)
-        self.SessionLocal = sessionmaker(
-            bind=self.engine,
-            class_=AsyncSession,
-            expire_on_commit=False,
+        self.snapshot_interval = max(snapshot_interval, 1)
+        self.max_heads = max(max_heads, 0)
+        self.engine = get_engine(self.db_url)
+        self.SessionLocal = get_sessionmaker(self.db_url)
+        self._heads: OrderedDict[str, _ChainHead] = OrderedDict()
+        # Only workflows with a save in progress keep their lock alive
+        self._save_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
         )
-        self._initialized = False
-        self._init_lock = asyncio.Lock()
 
     async def _create_table_if_needed(self) -> None:
         """Automatically create the table if it does not exist."""
-        async with self._init_lock:
-            if self._initialized:
-                return
-
-            async with self.engine.begin() as conn:
-                await conn.run_sync(Base.metadata.create_all)
-                self._initialized = True
+        await ensure_schema(self.engine, Base.metadata, upgrades=UPGRADES)
 
     @asynccontextmanager
     async def _get_session(self) -> AsyncSession:
@@ -106,55 +344,450 @@ class PostgresCheckpointStorage:
         async with self.SessionLocal() as session:
             yield session
 
+    def _save_lock(self, workflow_id: str) -> asyncio.Lock:
+        lock = self._save_locks.get(workflow_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._save_locks[workflow_id] = lock
+        return lock
+
     async def save_checkpoint(self, checkpoint: WorkflowCheckpoint) -> str:
-        async with self._get_session() as session:
-            orm_checkpoint = workflow_checkpoint_to_orm(checkpoint)
-            session.add(orm_checkpoint)
-            await session.commit()
-            return orm_checkpoint.checkpoint_id
+        state = checkpoint_state(checkpoint)
+        async with self._save_lock(checkpoint.workflow_id):
+            async with self._get_session() as session:
+                head = await self._current_head(session, checkpoint.workflow_id)
+                if head is not None and head.chain_index + 1 < self.snapshot_interval:
+                    snapshot_id = head.snapshot_id
+                    chain_index = head.chain_index + 1
+                    payload = encode(diff_state(head.state, state))
+                else:
+                    snapshot_id = checkpoint.checkpoint_id
+                    chain_index = 0
+                    payload = encode(state)
 
-    async def load_checkpoint(self, checkpoint_id: str) -> WorkflowCheckpoint | None:
-        async with self._get_session() as session:
-            stmt = select(WorkflowCheckpointORM).filter(
-                WorkflowCheckpointORM.checkpoint_id == checkpoint_id
+                row = {
+                    "checkpoint_id": checkpoint.checkpoint_id,
+                    "workflow_id": checkpoint.workflow_id,
+                    "timestamp": checkpoint.timestamp,
+                    "iteration_count": checkpoint.iteration_count,
+                    "version": checkpoint.version,
+                }
+                try:
+                    await session.execute(
+                        insert(WorkflowCheckpointORM).values(
+                            **row,
+                            payload=payload,
+                            snapshot_id=snapshot_id,
+                            chain_index=chain_index,
+                        )
+                    )
+                    await session.commit()
+                except IntegrityError:
+                    if chain_index == 0:
+                        raise
+                    # Another process extended the chain first; start a new one
+                    await session.rollback()
+                    self._heads.pop(checkpoint.workflow_id, None)
+                    snapshot_id = checkpoint.checkpoint_id
+                    chain_index = 0
+                    await session.execute(
+                        insert(WorkflowCheckpointORM).values(
+                            **row,
+                            payload=encode(state),
+                            snapshot_id=snapshot_id,
+                            chain_index=chain_index,
+                        )
+                    )
+                    await session.commit()
+
+            self._cache_head(
+                checkpoint.workflow_id,
+                _ChainHead(checkpoint.checkpoint_id, snapshot_id, chain_index, state),
             )
-            result = await session.execute(stmt)
-            orm_checkpoint = result.scalar_one_or_none()
-            return (
-                workflow_checkpoint_from_orm(orm_checkpoint) if orm_checkpoint else None
+        return checkpoint.checkpoint_id
+
+    def _cache_head(self, workflow_id: str, head: _ChainHead) -> None:
+        self._heads[workflow_id] = head
+        self._heads.move_to_end(workflow_id)
+        while len(self._heads) > self.max_heads:
+            self._heads.popitem(last=False)
+
+    @staticmethod
+    def _is_tail(snapshot_id, chain_index):
+        """No later delta is based on checkpoint `chain_index` of the chain."""
+        successor = aliased(WorkflowCheckpointORM)
+        return ~exists().where(
+            successor.snapshot_id == snapshot_id,
+            successor.chain_index == chain_index + 1,
+        )
+
+    async def _current_head(
+        self, session: AsyncSession, workflow_id: str
+    ) -> _ChainHead | None:
+        """
+        The head to base the next delta of `workflow_id` on: the cached one
+        if the database still ends its chain there, else the newest
+        checkpoint reloaded from the database, if it is the tail of a chain.
+        """
+        head = self._heads.get(workflow_id)
+        if head is not None:
+            result = await session.execute(
+                select(WorkflowCheckpointORM.checkpoint_id).filter(
+                    WorkflowCheckpointORM.checkpoint_id == head.checkpoint_id,
+                    WorkflowCheckpointORM.snapshot_id == head.snapshot_id,
+                    WorkflowCheckpointORM.chain_index == head.chain_index,
+                    self._is_tail(head.snapshot_id, head.chain_index),
+                )
+            )
+            if result.first() is not None:
+                return head
+            del self._heads[workflow_id]
+
+        result = await session.execute(self._chain_query(self._latest(workflow_id)))
+        rows = result.scalars().all()
+        if not rows:
+            return None
+        row, state = replay(rows)[-1]
+        if row.payload is None or row.snapshot_id is None:
+            # Rows from before the binary format cannot be a delta base
+            return None
+        result = await session.execute(
+            select(literal(1)).filter(self._is_tail(row.snapshot_id, row.chain_index))
+        )
+        if result.first() is None:
+            return None
+        return _ChainHead(row.checkpoint_id, row.snapshot_id, row.chain_index, state)
+
+    @staticmethod
+    def _latest(workflow_id: str):
+        """A scalar subquery selecting the newest checkpoint id of `workflow_id`."""
+        return (
+            select(WorkflowCheckpointORM.checkpoint_id)
+            .filter(WorkflowCheckpointORM.workflow_id == workflow_id)
+            .order_by(
+                WorkflowCheckpointORM.timestamp.desc(),
+                WorkflowCheckpointORM.checkpoint_id.desc(),
+            )
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    def _chain_query(checkpoint_id, inclusive: int = 0):
+        """
+        The rows needed to rebuild `checkpoint_id` (and `inclusive` rows of
+        its chain after it), base snapshot first. `checkpoint_id` may also
+        be a scalar subquery selecting the id.
+        """
+        target = select(WorkflowCheckpointORM).filter(
+            WorkflowCheckpointORM.checkpoint_id == checkpoint_id
+        )
+        snapshot_id = target.with_only_columns(WorkflowCheckpointORM.snapshot_id)
+        last_index = target.with_only_columns(
+            WorkflowCheckpointORM.chain_index + inclusive
+        )
+        return (
+            select(WorkflowCheckpointORM)
+            .filter(
+                or_(
+                    WorkflowCheckpointORM.checkpoint_id == checkpoint_id,
+                    and_(
+                        WorkflowCheckpointORM.snapshot_id
+                        == snapshot_id.scalar_subquery(),
+                        WorkflowCheckpointORM.chain_index
+                        <= last_index.scalar_subquery(),
+                    ),
+                )
             )
+            .order_by(WorkflowCheckpointORM.chain_index)
+        )
+
+    async def load_checkpoint(self, checkpoint_id: str) -> WorkflowCheckpoint | None:
+        async with self._get_session() as session:
+            result = await session.execute(self._chain_query(checkpoint_id))
+            rows = result.scalars().all()
+
+        for row, state in replay(rows):
+            if row.checkpoint_id == checkpoint_id:
+                return workflow_checkpoint_from_orm(row, state)
+        return None
+
+    async def load_latest_checkpoint(
+        self, workflow_id: str
+    ) -> WorkflowCheckpoint | None:
+        """The newest checkpoint of `workflow_id`, found and rebuilt in one query."""
+        async with self._get_session() as session:
+            result = await session.execute(self._chain_query(self._latest(workflow_id)))
+            rows = result.scalars().all()
+
+        if not rows:
+            return None
+        # The chain is ordered base first, so the target comes last
+        row, state = replay(rows)[-1]
+        return workflow_checkpoint_from_orm(row, state)
 
     async def list_checkpoint_ids(self, workflow_id: str | None = None) -> list[str]:
         async with self._get_session() as session:
             stmt = select(WorkflowCheckpointORM.checkpoint_id)
             if workflow_id:
-                stmt = stmt.filter(WorkflowCheckpointORM.workflow_id == workflow_id)
+                stmt = stmt.filter(
+                    WorkflowCheckpointORM.workflow_id == workflow_id
+                ).order_by(
+                    WorkflowCheckpointORM.timestamp, WorkflowCheckpointORM.checkpoint_id
+                )
 
             result = await session.execute(stmt)
             return [row[0] for row in result.fetchall()]
 
+    async def list_checkpoint_summaries(
+        self,
+        workflow_id: str,
+        cursor: str | None = None,
+        limit: int = 100,
+        newest_first: bool = True,
+    ) -> Tuple[List[CheckpointSummary], str | None]:
+        """
+        Metadata of the checkpoints of `workflow_id` after `cursor` (from the
+        start for None), at most `limit`, with the cursor to pass on the next
+        call. Walks the `(workflow_id, timestamp)` index and reads no payloads.
+        """
+        order = (WorkflowCheckpointORM.timestamp, WorkflowCheckpointORM.checkpoint_id)
+        stmt = select(
+            WorkflowCheckpointORM.checkpoint_id,
+            WorkflowCheckpointORM.workflow_id,
+            WorkflowCheckpointORM.timestamp,
+            WorkflowCheckpointORM.iteration_count,
+        ).filter(WorkflowCheckpointORM.workflow_id == workflow_id)
+        if cursor is not None:
+            position = tuple_(
+                select(WorkflowCheckpointORM.timestamp)
+                .filter(WorkflowCheckpointORM.checkpoint_id == cursor)
+                .scalar_subquery(),
+                literal(cursor),
+            )
+            stmt = stmt.filter(
+                tuple_(*order) < position if newest_first else tuple_(*order) > position
+            )
+        stmt = stmt.order_by(
+            *([column.desc() for column in order] if newest_first else order)
+        ).limit(limit)
+
+        async with self._get_session() as session:
+            result = await session.execute(stmt)
+            summaries = [CheckpointSummary(*row) for row in result.all()]
+
+        return summaries, (summaries[-1].checkpoint_id if summaries else cursor)
+
     async def list_checkpoints(
         self, workflow_id: str | None = None
     ) -> list[WorkflowCheckpoint]:
+        """
+        Checkpoints oldest first. Checkpoints of one chain share the parts
+        of their state that did not change between them.
+        Prefer `list_checkpoint_summaries` for long workflows.
+        """
         async with self._get_session() as session:
-            stmt = select(WorkflowCheckpointORM)
+            stmt = select(WorkflowCheckpointORM).order_by(
+                WorkflowCheckpointORM.snapshot_id, WorkflowCheckpointORM.chain_index
+            )
             if workflow_id:
                 stmt = stmt.filter(WorkflowCheckpointORM.workflow_id == workflow_id)
 
             result = await session.execute(stmt)
-            orm_checkpoints = result.scalars().all()
-            return [workflow_checkpoint_from_orm(orm) for orm in orm_checkpoints]
+            rows = result.scalars().all()
+
+        checkpoints = [
+            workflow_checkpoint_from_orm(row, state) for row, state in replay(rows)
+        ]
+        return sorted(checkpoints, key=lambda checkpoint: checkpoint.timestamp or "")
 
     async def delete_checkpoint(self, checkpoint_id: str) -> bool:
+        """
+        Delete one checkpoint. When a later delta depends on it, that
+        checkpoint is rewritten as a full snapshot and the rest of the chain
+        re-based on it; otherwise this is a single DELETE.
+        """
+        dependent = aliased(WorkflowCheckpointORM)
         async with self._get_session() as session:
-            stmt = select(WorkflowCheckpointORM).filter(
-                WorkflowCheckpointORM.checkpoint_id == checkpoint_id
+            result = await session.execute(
+                delete(WorkflowCheckpointORM)
+                .filter(
+                    WorkflowCheckpointORM.checkpoint_id == checkpoint_id,
+                    ~exists().where(
+                        dependent.snapshot_id == WorkflowCheckpointORM.snapshot_id,
+                        dependent.chain_index == WorkflowCheckpointORM.chain_index + 1,
+                    ),
+                )
+                .returning(
+                    WorkflowCheckpointORM.workflow_id,
+                    WorkflowCheckpointORM.snapshot_id,
+                    WorkflowCheckpointORM.chain_index,
+                )
+                .execution_options(synchronize_session=False)
             )
-            result = await session.execute(stmt)
-            orm_checkpoint = result.scalar_one_or_none()
+            deleted = result.first()
+            await session.commit()
+        if deleted is not None:
+            self._drop_head(deleted.workflow_id, checkpoint_id)
+            return True
+
+        async with self._get_session() as session:
+            result = await session.execute(self._chain_query(checkpoint_id, 1))
+            replayed = replay(result.scalars().all())
+            target = next(
+                (row for row, _ in replayed if row.checkpoint_id == checkpoint_id),
+                None,
+            )
+            if target is None:
+                return False
+
+            row, state = replayed[-1]
+            if row is not target:
+                await self._make_snapshot(session, row, state)
+            await session.execute(
+                delete(WorkflowCheckpointORM)
+                .filter(WorkflowCheckpointORM.checkpoint_id == checkpoint_id)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+        self._drop_head(target.workflow_id, checkpoint_id)
+        return True
+
+    async def prune_checkpoints(
+        self,
+        workflow_id: str,
+        keep_last: int | None = None,
+        older_than: datetime | str | None = None,
+        batch_size: int = PRUNE_BATCH_SIZE,
+    ) -> int:
+        """
+        Retention: delete the checkpoints of `workflow_id` that are neither
+        among its `keep_last` newest nor newer than `older_than`, at most
+        `batch_size` rows per transaction. Returns how many were deleted.
+        """
+        if keep_last is None and older_than is None:
+            return 0
+
+        async with self._get_session() as session:
+            cutoff = None
+            if keep_last is not None:
+                result = await session.execute(
+                    select(
+                        WorkflowCheckpointORM.timestamp,
+                        WorkflowCheckpointORM.checkpoint_id,
+                    )
+                    .filter(WorkflowCheckpointORM.workflow_id == workflow_id)
+                    .order_by(
+                        WorkflowCheckpointORM.timestamp.desc(),
+                        WorkflowCheckpointORM.checkpoint_id.desc(),
+                    )
+                    .offset(keep_last)
+                    .limit(1)
+                )
+                cutoff = result.first()
+                if cutoff is None:
+                    return 0
+
+            def expired(table):
+                conditions = [table.workflow_id == workflow_id]
+                if cutoff is not None:
+                    conditions.append(
+                        tuple_(table.timestamp, table.checkpoint_id)
+                        <= tuple_(
+                            literal(cutoff.timestamp), literal(cutoff.checkpoint_id)
+                        )
+                    )
+                if older_than is not None:
+                    conditions.append(table.timestamp < as_timestamp(older_than))
+                return and_(*conditions)
 
-            if orm_checkpoint:
-                await session.delete(orm_checkpoint)
+            # Kept deltas whose base expires are rewritten as snapshots first
+            base = aliased(WorkflowCheckpointORM)
+            result = await session.execute(
+                select(WorkflowCheckpointORM.checkpoint_id).filter(
+                    WorkflowCheckpointORM.workflow_id == workflow_id,
+                    WorkflowCheckpointORM.chain_index > 0,
+                    ~expired(WorkflowCheckpointORM),
+                    exists().where(
+                        base.snapshot_id == WorkflowCheckpointORM.snapshot_id,
+                        base.chain_index == WorkflowCheckpointORM.chain_index - 1,
+                        expired(base),
+                    ),
+                )
+            )
+            for checkpoint_id in result.scalars().all():
+                chain = await session.execute(self._chain_query(checkpoint_id))
+                row, state = replay(chain.scalars().all())[-1]
+                await self._make_snapshot(session, row, state)
+            await session.commit()
+
+            pruned = 0
+            while True:
+                batch = (
+                    select(WorkflowCheckpointORM.checkpoint_id)
+                    .filter(expired(WorkflowCheckpointORM))
+                    .limit(batch_size)
+                )
+                result = await session.execute(
+                    delete(WorkflowCheckpointORM)
+                    .filter(WorkflowCheckpointORM.checkpoint_id.in_(batch))
+                    .execution_options(synchronize_session=False)
+                )
                 await session.commit()
-                return True
-            return False
+                pruned += result.rowcount
+                if result.rowcount < batch_size:
+                    break
+
+            head = self._heads.get(workflow_id)
+            if pruned and head is not None:
+                result = await session.execute(
+                    select(WorkflowCheckpointORM.checkpoint_id).filter(
+                        WorkflowCheckpointORM.checkpoint_id == head.checkpoint_id
+                    )
+                )
+                if result.first() is None:
+                    del self._heads[workflow_id]
+
+        return pruned
+
+    async def _make_snapshot(
+        self, session: AsyncSession, row: WorkflowCheckpointORM, state: dict
+    ) -> None:
+        """Rewrite delta `row` as a full snapshot and re-base its chain on it."""
+        if row.payload is None or row.chain_index == 0:
+            return
+
+        await session.execute(
+            update(WorkflowCheckpointORM)
+            .filter(
+                WorkflowCheckpointORM.snapshot_id == row.snapshot_id,
+                WorkflowCheckpointORM.chain_index > row.chain_index,
+            )
+            .values(
+                snapshot_id=row.checkpoint_id,
+                chain_index=WorkflowCheckpointORM.chain_index - row.chain_index,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(
+            update(WorkflowCheckpointORM)
+            .filter(WorkflowCheckpointORM.checkpoint_id == row.checkpoint_id)
+            .values(payload=encode(state), snapshot_id=row.checkpoint_id, chain_index=0)
+            .execution_options(synchronize_session=False)
+        )
+
+        head = self._heads.get(row.workflow_id)
+        if (
+            head is not None
+            and head.snapshot_id == row.snapshot_id
+            and head.chain_index >= row.chain_index
+        ):
+            head.snapshot_id = row.checkpoint_id
+            head.chain_index -= row.chain_index
+
+    def _drop_head(self, workflow_id: str, checkpoint_id: str) -> None:
+        """The next save of the workflow is a snapshot if its base is gone."""
+        head = self._heads.get(workflow_id)
+        if head is not None and head.checkpoint_id == checkpoint_id:
+            del self._heads[workflow_id]
@@ -0,0 +1,41 @@
+from sqlalchemy import event
+
+from agent_adapter.checkpoint.postgres import (
+    DROP_CHAIN_INDEX,
+    MAX_CACHED_HEADS,
+    SNAPSHOT_INTERVAL,
+    Base,
+    PostgresCheckpointStorage,
+)
+from agent_adapter.storage.engine import ensure_schema
+
+
+def _enable_wal(dbapi_connection, connection_record) -> None:
+    # Readers no longer block the writer, and commits skip the full fsync
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+class SqliteCheckpointStorage(PostgresCheckpointStorage):
+    """
+    The Postgres checkpoint table and delta format in a local SQLite file
+    in WAL mode, for single-host deployments and CI without a server.
+    """
+
+    def __init__(
+        self,
+        db_url: str = "sqlite+aiosqlite:///checkpoints.db",
+        snapshot_interval: int = SNAPSHOT_INTERVAL,
+        max_heads: int = MAX_CACHED_HEADS,
+    ):
+        super().__init__(db_url, snapshot_interval, max_heads)
+        if not event.contains(self.engine.sync_engine, "connect", _enable_wal):
+            event.listen(self.engine.sync_engine, "connect", _enable_wal)
+
+    async def _create_table_if_needed(self) -> None:
+        """Automatically create the table if it does not exist."""
+        # Files are never older than the binary format, only than the
+        # unique chain index
+        await ensure_schema(self.engine, Base.metadata, upgrades=(DROP_CHAIN_INDEX,))
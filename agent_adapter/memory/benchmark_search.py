@@ -0,0 +1,161 @@
+from pathlib import Path
+import sys
+
+current_file_path = Path(__file__).resolve()
+project_root = current_file_path.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+from sqlalchemy import text
+
+from agent_adapter.memory.history import PostgresProvider
+from agent_adapter.storage.engine import dispose_engines
+
+# Distinct words; their frequency is skewed like natural text (a few words
+# are in a third of the messages, most are rare)
+VOCABULARY = 50_000
+# Common CJK characters, skewed the same way, for the Chinese messages
+CJK_VOCABULARY = 500
+# Share of the seeded messages that are Chinese text
+CJK_SHARE = 0.1
+
+
+def random_word() -> str:
+    return f"w{int(VOCABULARY * random.random() ** 3)}"
+
+
+def random_cjk(length: int) -> str:
+    return "".join(
+        chr(0x4E00 + int(CJK_VOCABULARY * random.random() ** 3)) for _ in range(length)
+    )
+
+
+# Twelve-word messages spread over many users and agents, generated in the
+# server so that millions of rows load without client round trips
+SEED_SQL = """
+INSERT INTO messages (role, content, conversation_id, message_id,
+                      application_id, agent_id, user_id, thread_id)
+SELECT 'user',
+       array_to_string(ARRAY(
+           SELECT 'w' || floor(:vocabulary * power(random(), 3))::int
+           FROM generate_series(1, 12 + 0 * g)
+       ), ' '),
+       'bench-' || (g % :threads),
+       'bench-' || g,
+       'bench',
+       'agent-' || (g % 8),
+       'user-' || (g % :users),
+       'bench-' || (g % :threads)
+FROM generate_series(1, :rows) AS g
+"""
+
+# Twenty-character Chinese messages without spaces, in the same scopes
+SEED_CJK_SQL = """
+INSERT INTO messages (role, content, conversation_id, message_id,
+                      application_id, agent_id, user_id, thread_id)
+SELECT 'user',
+       array_to_string(ARRAY(
+           SELECT chr(19968 + floor(:vocabulary * power(random(), 3))::int)
+           FROM generate_series(1, 20 + 0 * g)
+       ), ''),
+       'bench-' || (g % :threads),
+       'bench-cjk-' || g,
+       'bench',
+       'agent-' || (g % 8),
+       'user-' || (g % :users),
+       'bench-' || (g % :threads)
+FROM generate_series(1, :rows) AS g
+"""
+
+
+async def seed(provider: PostgresProvider, rows: int, users: int):
+    await provider._ensure_session()
+    async with provider.engine.begin() as conn:
+        await conn.execute(text("DELETE FROM messages WHERE application_id = 'bench'"))
+        start = time.perf_counter()
+        for offset in range(0, rows, 1_000_000):
+            await conn.execute(
+                text(SEED_SQL),
+                {
+                    "rows": min(1_000_000, rows - offset),
+                    "users": users,
+                    "threads": users * 4,
+                    "vocabulary": VOCABULARY,
+                },
+            )
+        await conn.execute(
+            text(SEED_CJK_SQL),
+            {
+                "rows": int(rows * CJK_SHARE),
+                "users": users,
+                "threads": users * 4,
+                "vocabulary": CJK_VOCABULARY,
+            },
+        )
+        await conn.execute(text("ANALYZE messages"))
+    print(f"seeded {rows} messages in {time.perf_counter() - start:.1f}s")
+
+
+async def run(db_url: str, rows: int, users: int, queries: int, keep: bool):
+    seeder = PostgresProvider(db_url, application_id="bench")
+    if rows:
+        await seed(seeder, rows, users)
+
+    prompts = (
+        ("", lambda: f"what about {random_word()} {random_word()} {random_word()}?"),
+        # One clause, as Chinese is typed: cut into grams by the provider
+        (", chinese", lambda: f"{random_cjk(8)}，{random_cjk(4)}？"),
+    )
+    for label, scope in (
+        ("application scope", {"application_id": "bench"}),
+        ("user scope", {"application_id": "bench", "user_id": "user-7"}),
+        (
+            "user+agent scope",
+            {"application_id": "bench", "user_id": "user-7", "agent_id": "agent-7"},
+        ),
+    ):
+        provider = PostgresProvider(db_url, **scope)
+        await provider._ensure_session()
+        for language, make_prompt in prompts:
+            latencies = []
+            found = 0
+            for _ in range(queries):
+                prompt = make_prompt()
+                start = time.perf_counter()
+                found += len(await provider._postgres_search(prompt, num_results=5))
+                latencies.append((time.perf_counter() - start) * 1000)
+            print(
+                f"{label + language:<27} p50={statistics.median(latencies):.2f}ms "
+                f"max={max(latencies):.2f}ms hits/query={found / queries:.1f}"
+            )
+
+    if not keep:
+        async with seeder.engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM messages WHERE application_id = 'bench'")
+            )
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db_url", default=os.getenv("POSTGRES_URI"))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument(
+        "--keep", action="store_true", help="keep the seeded rows for another run"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.db_url, args.rows, args.users, args.queries, args.keep))
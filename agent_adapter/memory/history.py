@@ -1,9 +1,22 @@
+import re
 import json
 from typing import Any, MutableSequence, Sequence, cast
 
-from sqlalchemy import create_engine, Column, String, Integer, Text
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+from typing_extensions import override
+
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    Text,
+    Index,
+    func,
+    case,
+    literal,
+    literal_column,
+    or_,
+)
+from sqlalchemy.orm import declarative_base
 from sqlalchemy.future import select
 
 from agent_framework import ChatMessage, Context, ContextProvider, Role
@@ -13,8 +26,61 @@ from agent_framework.exceptions import (
     ServiceInvalidRequestError,
 )
 
+from agent_adapter.storage.engine import ensure_schema, get_engine, get_sessionmaker
+
 Base = declarative_base()
 
+# Text search configuration: 'simple' only lowercases, so it works the same
+# for every language the agents talk in
+TS_CONFIG = "simple"
+# Upper bound on the terms taken from a prompt, keeps the tsquery cheap
+MAX_QUERY_TERMS = 16
+
+# CJK text has no spaces, so the 'simple' parser makes a whole clause one
+# token. CJK runs are cut into overlapping grams of this many characters
+# and matched as substrings through the pg_trgm index; three is the
+# shortest pattern pg_trgm can look up in the index
+CJK_GRAM_SIZE = 3
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+_CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af"
+_CJK_PATTERN = re.compile(f"[{_CJK_CHARS}]")
+_CJK_SPLIT_PATTERN = re.compile(f"([{_CJK_CHARS}]+)")
+_STOP_WORDS = set(
+    "a an and are as at be but by can do for from how i if in is it me my of "
+    "on or so that the this to was we what when where which who why will "
+    "with you your".split()
+)
+
+
+def content_tsvector(column):
+    return func.to_tsvector(literal_column(f"'{TS_CONFIG}'"), column)
+
+
+def cjk_grams(run: str, size: int = CJK_GRAM_SIZE) -> list[str]:
+    """Overlapping `size`-character grams of a CJK run; a shorter run as is."""
+    if len(run) <= size:
+        return [run]
+    return [run[i : i + size] for i in range(len(run) - size + 1)]
+
+
+def extract_query_terms(text: str, max_terms: int = MAX_QUERY_TERMS) -> list[str]:
+    """
+    Distinct lowercase words of `text`, without stop words, in order. CJK
+    runs are given as their grams (`cjk_grams`).
+    """
+    terms: dict[str, None] = {}
+    for match in _TERM_PATTERN.finditer(text.lower()):
+        for i, part in enumerate(_CJK_SPLIT_PATTERN.split(match.group())):
+            # split() puts the CJK runs at the odd positions
+            candidates = cjk_grams(part) if i % 2 else [part]
+            for term in candidates:
+                if len(term) > 1 and term not in _STOP_WORDS:
+                    terms[term] = None
+                    if len(terms) >= max_terms:
+                        return list(terms)
+    return list(terms)
+
 
 class Message(Base):
     """ORM model for storing messages in PostgreSQL."""
@@ -32,6 +98,26 @@ class Message(Base):
     user_id = Column(String, nullable=True)
     thread_id = Column(String, nullable=True)
 
+    __table_args__ = (
+        # Expression index, so existing tables need no new column
+        Index(
+            "ix_messages_content_tsv",
+            content_tsvector(content),
+            postgresql_using="gin",
+        ),
+        # Serves the substring matches of CJK grams
+        Index(
+            "ix_messages_content_trgm",
+            "content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "gin_trgm_ops"},
+        ),
+        # Partition filters of the provider
+        Index("ix_messages_scope", "application_id", "agent_id", "user_id"),
+        Index("ix_messages_user_agent", "user_id", "agent_id"),
+        Index("ix_messages_thread", "thread_id"),
+    )
+
 
 class PostgresProvider(ContextProvider):
     """PostgreSQL context provider with dynamic, filterable schema."""
@@ -55,11 +141,9 @@ class PostgresProvider(ContextProvider):
         self.context_prompt = context_prompt
         self._initialized = False
 
-        # Initialize asynchronous database engine and session
-        self.engine = create_async_engine(self.db_url, echo=True)
-        self.Session = sessionmaker(
-            self.engine, class_=AsyncSession, expire_on_commit=False
-        )
+        # Shared engine and session factory for this database
+        self.engine = get_engine(self.db_url)
+        self.Session = get_sessionmaker(self.db_url)
         self._session = None
 
     async def _ensure_session(self) -> None:
@@ -73,9 +157,7 @@ class PostgresProvider(ContextProvider):
 
     async def _create_table_if_needed(self) -> None:
         """Automatically create the table if it does not exist."""
-        async with self.engine.begin() as conn:
-            # Create all tables asynchronously
-            await conn.run_sync(Base.metadata.create_all)
+        await ensure_schema(self.engine, Base.metadata, extensions=("pg_trgm",))
 
     async def _add(
         self,
@@ -105,24 +187,67 @@ class PostgresProvider(ContextProvider):
                     session.add(message)
             await session.commit()
 
+    def _filter_conditions(self) -> list:
+        """Equality conditions for every partition filter that is set."""
+        return [
+            column == value
+            for column, value in (
+                (Message.application_id, self.application_id),
+                (Message.agent_id, self.agent_id),
+                (Message.user_id, self.user_id),
+                (Message.thread_id, self.thread_id),
+            )
+            if value
+        ]
+
     async def _postgres_search(
         self, text: str, *, num_results: int = 10
     ) -> list[dict[str, Any]]:
-        """Runs a simple text search on messages."""
+        """
+        Ranked search over the messages in the provider's scope. Words are
+        matched through the GIN index on the content tsvector and ranked by
+        how densely a message covers them; CJK grams are matched as
+        substrings through the pg_trgm index and ranked by the share of the
+        grams a message contains. Ties go to the newest message.
+        """
         self._validate_filters()
 
+        terms = extract_query_terms(text)
+        if not terms:
+            return []
+
+        words = [term for term in terms if not _CJK_PATTERN.search(term)]
+        grams = [term for term in terms if _CJK_PATTERN.search(term)]
+
+        matches = []
+        score = literal(0.0)
+        if words:
+            document = content_tsvector(Message.content)
+            query = func.to_tsquery(literal_column(f"'{TS_CONFIG}'"), " | ".join(words))
+            matches.append(document.op("@@")(query))
+            score = score + func.ts_rank_cd(document, query)
+        if grams:
+            substrings = [
+                Message.content.contains(gram, autoescape=True) for gram in grams
+            ]
+            matches.extend(substrings)
+            score = score + sum(
+                case((substring, 1.0), else_=0.0) for substring in substrings
+            ) / len(grams)
+
         async with self._session as session:
             stmt = (
-                select(Message)
-                .filter(Message.content.ilike(f"%{text}%"))
+                select(Message.role, Message.content, Message.message_id)
+                .filter(or_(*matches), *self._filter_conditions())
+                .order_by(score.desc(), Message.id.desc())
                 .limit(num_results)
             )
             result = await session.execute(stmt)
-            messages = result.scalars().all()
+            rows = result.all()
 
         return [
             {"role": m.role, "content": m.content, "message_id": m.message_id}
-            for m in messages
+            for m in rows
         ]
 
     async def search_all(self, page_size: int = 200) -> list[dict[str, Any]]:
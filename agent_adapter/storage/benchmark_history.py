@@ -0,0 +1,116 @@
+from pathlib import Path
+import sys
+
+current_file_path = Path(__file__).resolve()
+project_root = current_file_path.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import time
+import asyncio
+import argparse
+import statistics
+
+from agent_framework import ChatMessage
+
+from agent_adapter.storage.engine import dispose_engines
+from agent_adapter.storage.history import PostgresChatMessageStore
+
+
+def make_turn(i: int) -> list[ChatMessage]:
+    return [
+        ChatMessage(role="user", text=f"question {i}: what's the weather like?"),
+        ChatMessage(role="assistant", text=f"answer {i}: sunny, 25 degrees."),
+    ]
+
+
+async def timed_appends(store: PostgresChatMessageStore, turns: int) -> list[float]:
+    latencies = []
+    for i in range(turns):
+        start = time.perf_counter()
+        await store.add_messages(make_turn(i))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def seed(store: PostgresChatMessageStore, count: int):
+    for offset in range(0, count, 1000):
+        await store.add_messages(
+            [
+                ChatMessage(role="user", text=f"seed {offset + i}")
+                for i in range(min(1000, count - offset))
+            ]
+        )
+
+
+async def timed_turns(store: PostgresChatMessageStore, turns: int) -> list[float]:
+    """A full agent turn: read the history, then append the new exchange."""
+    latencies = []
+    for i in range(turns):
+        start = time.perf_counter()
+        await store.list_messages()
+        await store.add_messages(make_turn(i))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label: str, latencies: list[float], what: str = "append"):
+    print(
+        f"{label:<28} {what} p50={statistics.median(latencies):.2f}ms "
+        f"max={max(latencies):.2f}ms"
+    )
+
+
+async def run(postgres_url: str, sizes: list[int], turns: int, max_messages: int):
+    """
+    Grow one thread to each size in `sizes` and time `turns` two-message
+    appends there, plus full read+append turns with and without the hot
+    thread cache; then time appends that also trim to `max_messages`.
+    """
+    store = PostgresChatMessageStore(postgres_url, use_cache=True)
+    uncached = PostgresChatMessageStore(postgres_url, thread_id=store.thread_id)
+    current = 0
+    for size in sizes:
+        if size > current:
+            await seed(store, size - current)
+            current = size
+        report(f"thread size {size}", await timed_appends(store, turns))
+        # Reading a 100k thread uncached takes seconds, so sample a few turns
+        report("", await timed_turns(uncached, min(turns, 5)), "uncached turn")
+        report("", await timed_turns(store, turns), "hot turn")
+        current += 2 * turns + 2 * min(turns, 5)
+
+    trimmed = PostgresChatMessageStore(
+        postgres_url, thread_id=store.thread_id, max_messages=max_messages
+    )
+    # The first trim drops the seeded backlog; time the steady state after it
+    await trimmed.add_messages(make_turn(0))
+    report(f"max_messages={max_messages}", await timed_appends(trimmed, turns))
+
+    await store.clear()
+    await trimmed.aclose()
+    await uncached.aclose()
+    await store.aclose()
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--postgres_url", default=os.getenv("POSTGRES_URI"))
+    parser.add_argument("--sizes", default="0,1000,10000,100000")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--max_messages", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(
+        run(
+            args.postgres_url,
+            [int(s) for s in args.sizes.split(",")],
+            args.turns,
+            args.max_messages,
+        )
+    )
@@ -0,0 +1,102 @@
+import os
+import asyncio
+
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+# Pool sizing per database URL, shared by every store of the process
+POOL_SIZE = int(os.getenv("POSTGRES_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("POSTGRES_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = int(os.getenv("POSTGRES_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("POSTGRES_POOL_RECYCLE", "1800"))
+SQL_ECHO = os.getenv("SQL_ECHO", "").lower() in ("1", "true")
+
+_engines: dict[str, AsyncEngine] = {}
+_sessionmakers: dict[str, sessionmaker] = {}
+# (url, metadata) pairs whose tables and indexes are known to exist
+_schema_ready: set[tuple[str, int]] = set()
+_schema_locks: dict[tuple[str, int], asyncio.Lock] = {}
+
+
+def get_engine(url: str) -> AsyncEngine:
+    """
+    Return the process-wide engine for `url`, creating it on first use.
+    Chat stores, memory providers and checkpoint storages of the same
+    database share one connection pool instead of opening one each.
+    """
+    engine = _engines.get(url)
+    if engine is None:
+        options = {"echo": SQL_ECHO, "pool_pre_ping": True}
+        if make_url(url).get_backend_name() != "sqlite":
+            options.update(
+                pool_size=POOL_SIZE,
+                max_overflow=MAX_OVERFLOW,
+                pool_timeout=POOL_TIMEOUT,
+                pool_recycle=POOL_RECYCLE,
+            )
+        engine = create_async_engine(url, **options)
+        _engines[url] = engine
+    return engine
+
+
+def get_sessionmaker(url: str) -> sessionmaker:
+    """Session factory bound to the shared engine of `url`."""
+    factory = _sessionmakers.get(url)
+    if factory is None:
+        factory = sessionmaker(
+            bind=get_engine(url), class_=AsyncSession, expire_on_commit=False
+        )
+        _sessionmakers[url] = factory
+    return factory
+
+
+def _create_all(sync_conn, metadata: MetaData):
+    metadata.create_all(sync_conn)
+    # create_all skips the indexes of tables that already exist
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
+async def ensure_schema(
+    engine: AsyncEngine,
+    metadata: MetaData,
+    extensions: tuple[str, ...] = (),
+    upgrades: tuple[str, ...] = (),
+) -> None:
+    """
+    Create the tables and indexes of `metadata`, after the Postgres
+    `extensions` they need, once per process and URL.
+    `upgrades` are idempotent statements (e.g. `ADD COLUMN IF NOT EXISTS`)
+    that bring tables created by older versions up to date first.
+    Later calls return without touching the database.
+    """
+    key = (engine.url.render_as_string(hide_password=False), id(metadata))
+    if key in _schema_ready:
+        return
+
+    lock = _schema_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        if key in _schema_ready:
+            return
+        async with engine.begin() as conn:
+            for extension in extensions:
+                await conn.execute(
+                    text(f'CREATE EXTENSION IF NOT EXISTS "{extension}"')
+                )
+            for statement in upgrades:
+                await conn.execute(text(statement))
+            await conn.run_sync(_create_all, metadata)
+        _schema_ready.add(key)
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection, e.g. on application shutdown."""
+    for engine in _engines.values():
+        await engine.dispose()
+    _engines.clear()
+    _sessionmakers.clear()
+    _schema_ready.clear()
+    _schema_locks.clear()
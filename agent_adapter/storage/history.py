@@ -1,23 +1,36 @@
+import os
 import uuid
+from bisect import bisect_right
+from collections import OrderedDict
 from sqlalchemy import (
     Column,
     Integer,
     String,
     Text,
     DateTime,
+    Index,
+    delete,
+    insert,
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from datetime import datetime
-from typing import Any, List, Sequence
-from agent_framework import ChatMessage, ChatMessageStoreProtocol
+from typing import Any, List, Sequence, Tuple
+from agent_framework import ChatMessage, ChatMessageStoreProtocol, Role
 from agent_framework._serialization import SerializationMixin
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.future import select
 
+from agent_adapter.storage.engine import ensure_schema, get_engine, get_sessionmaker
+
 Base = declarative_base()
 
+# Recently active threads whose deserialized messages are kept in memory
+HOT_THREAD_CACHE_SIZE = int(os.getenv("CHAT_HISTORY_CACHE_THREADS", "1024"))
+# Newest messages of a thread the agents read per turn; 0 reads all of them
+CHAT_HISTORY_WINDOW = int(os.getenv("CHAT_HISTORY_WINDOW", "100"))
+# Process-local hot-thread cache; only safe when one process owns each thread
+CHAT_HISTORY_CACHE = os.getenv("CHAT_HISTORY_CACHE", "").lower() in ("1", "true")
+
 
 class ChatMessageORM(Base):
     """SQLAlchemy model for storing chat messages in PostgreSQL."""
@@ -31,10 +44,70 @@ class ChatMessageORM(Base):
     message = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Serves listing, counting and trimming of one conversation in time order
+    __table_args__ = (
+        Index(
+            "ix_python_chat_messages_conversation_created",
+            "conversation_id",
+            "created_at",
+        ),
+    )
+
     def __repr__(self):
         return f"<ChatMessage(id={self.id}, user_id={self.user_id}, conversation_id={self.conversation_id}, message_id={self.message_id})>"
 
 
+class _CachedThread:
+    """Deserialized messages of one thread with their row ids, oldest first."""
+
+    def __init__(self, ids: List[int], messages: List[ChatMessage]):
+        self.ids = ids
+        self.messages = messages
+
+    def append(self, ids: List[int], messages: Sequence[ChatMessage]):
+        self.ids.extend(ids)
+        self.messages.extend(messages)
+
+    def keep_last(self, count: int):
+        if len(self.ids) > count:
+            del self.ids[:-count]
+            del self.messages[:-count]
+
+
+class HotThreadCache:
+    """
+    LRU of recently active threads, keyed by (postgres_url, thread_id).
+
+    A thread that was listed once is kept up to date by `add_messages` of
+    this process, so the next turn reads it without a SELECT. Writes to the
+    same thread from another process are not seen while the thread stays
+    cached, so stores only use it with `use_cache=True`, for deployments
+    where one process owns each thread.
+    """
+
+    def __init__(self, max_threads: int = HOT_THREAD_CACHE_SIZE):
+        self.max_threads = max_threads
+        self._threads: OrderedDict[Tuple[str, str], _CachedThread] = OrderedDict()
+
+    def get(self, key: Tuple[str, str]) -> _CachedThread | None:
+        thread = self._threads.get(key)
+        if thread is not None:
+            self._threads.move_to_end(key)
+        return thread
+
+    def put(self, key: Tuple[str, str], thread: _CachedThread):
+        self._threads[key] = thread
+        self._threads.move_to_end(key)
+        while len(self._threads) > self.max_threads:
+            self._threads.popitem(last=False)
+
+    def discard(self, key: Tuple[str, str]):
+        self._threads.pop(key, None)
+
+
+hot_threads = HotThreadCache()
+
+
 class PostgresStoreState(SerializationMixin):
     """State model for serializing and deserializing Postgres chat message store data."""
 
@@ -42,6 +115,8 @@ class PostgresStoreState(SerializationMixin):
     user_id: str | None = (None,)
     postgres_url: str | None = None
     max_messages: int | None = None
+    history_window: int | None = None
+    use_cache: bool = False
 
     def __init__(
         self,
@@ -49,15 +124,25 @@ class PostgresStoreState(SerializationMixin):
         postgres_url: str | None = None,
         user_id: str | None = None,
         max_messages: int | None = None,
+        history_window: int | None = None,
+        use_cache: bool = False,
     ) -> None:
         self.thread_id = thread_id
         self.postgres_url = postgres_url
         self.user_id = user_id
         self.max_messages = max_messages
+        self.history_window = history_window
+        self.use_cache = use_cache
 
 
 class PostgresChatMessageStore(ChatMessageStoreProtocol):
-    """PostgreSQL-backed implementation of ChatMessageStore using SQLAlchemy."""
+    """
+    PostgreSQL-backed implementation of ChatMessageStore using SQLAlchemy.
+
+    With `history_window`, `list_messages` (what an agent reads every turn)
+    only returns the newest `history_window` messages, read by one bounded
+    query, instead of the whole thread.
+    """
 
     def __init__(
         self,
@@ -65,6 +150,8 @@ class PostgresChatMessageStore(ChatMessageStoreProtocol):
         thread_id: str | None = None,
         max_messages: int | None = None,
         user_id: str | None = None,
+        use_cache: bool = False,
+        history_window: int | None = None,
     ) -> None:
         if not postgres_url:
             raise ValueError("postgres_url is required for PostgreSQL connection")
@@ -73,18 +160,16 @@ class PostgresChatMessageStore(ChatMessageStoreProtocol):
         self.thread_id = thread_id or f"thread_{uuid.uuid4()}"
         self.user_id = user_id or self.thread_id
         self.max_messages = max_messages
+        self.use_cache = use_cache
+        self.history_window = history_window or None
 
-        self.engine = create_async_engine(self.postgres_url, echo=True, future=True)
-        self.Session = sessionmaker(
-            bind=self.engine, class_=AsyncSession, expire_on_commit=False
-        )
+        self.engine = get_engine(self.postgres_url)
+        self.Session = get_sessionmaker(self.postgres_url)
         self._session = None
 
     async def _create_table_if_needed(self) -> None:
         """Automatically create the table if it does not exist."""
-        async with self.engine.begin() as conn:
-            # Create all tables asynchronously
-            await conn.run_sync(Base.metadata.create_all)
+        await ensure_schema(self.engine, Base.metadata)
 
     async def _ensure_session(self) -> None:
         """Ensure that the session is initialized."""
@@ -92,38 +177,126 @@ class PostgresChatMessageStore(ChatMessageStoreProtocol):
             self._session = self.Session()
         await self._create_table_if_needed()
 
-    async def list_messages(self) -> List[ChatMessage]:
-        """Get all messages from the store in chronological order."""
+    @property
+    def _cache_key(self) -> Tuple[str, str]:
+        return (self.postgres_url, self.thread_id)
+
+    def _cached_thread(self) -> _CachedThread | None:
+        return hot_threads.get(self._cache_key) if self.use_cache else None
+
+    async def _select_messages(self, stmt) -> Tuple[List[int], List[ChatMessage]]:
         await self._ensure_session()
 
-        result = await self._session.execute(
-            select(ChatMessageORM)
-            .filter_by(conversation_id=self.thread_id)
-            .order_by(ChatMessageORM.created_at.asc())
+        result = await self._session.execute(stmt)
+        rows = result.all()
+        return [row.id for row in rows], [
+            self._deserialize_message(row.message) for row in rows
+        ]
+
+    def _thread_query(self):
+        return select(ChatMessageORM.id, ChatMessageORM.message).filter_by(
+            conversation_id=self.thread_id
+        )
+
+    async def list_messages(self) -> List[ChatMessage]:
+        """
+        Get the messages of the thread in chronological order: all of them,
+        or the newest `history_window`.
+        """
+        thread = self._cached_thread()
+        if thread is None and self.use_cache:
+            # Read the whole thread once; later turns are served from memory
+            ids, messages = await self._select_messages(
+                self._thread_query().order_by(
+                    ChatMessageORM.created_at.asc(), ChatMessageORM.id.asc()
+                )
+            )
+            thread = _CachedThread(ids, messages)
+            hot_threads.put(self._cache_key, thread)
+
+        if self.history_window is None:
+            if thread is not None:
+                return list(thread.messages)
+            ids, messages = await self._select_messages(
+                self._thread_query().order_by(
+                    ChatMessageORM.created_at.asc(), ChatMessageORM.id.asc()
+                )
+            )
+            return messages
+
+        messages = await self.list_recent_messages(self.history_window)
+        # A window must not open with tool results whose call it cut off
+        start = 0
+        while start < len(messages) and messages[start].role == Role.TOOL:
+            start += 1
+        return messages[start:]
+
+    async def list_recent_messages(self, limit: int) -> List[ChatMessage]:
+        """Get the newest `limit` messages in chronological order."""
+        thread = self._cached_thread()
+        if thread is not None:
+            return thread.messages[-limit:] if limit > 0 else []
+
+        ids, messages = await self._select_messages(
+            self._thread_query()
+            .order_by(ChatMessageORM.created_at.desc(), ChatMessageORM.id.desc())
+            .limit(limit)
         )
-        messages = result.scalars().all()
-        return [self._deserialize_message(msg.message) for msg in messages]
+        messages.reverse()
+        return messages
+
+    async def list_messages_after(
+        self, cursor: int | None = None, limit: int | None = None
+    ) -> Tuple[List[ChatMessage], int | None]:
+        """
+        Get the messages stored after `cursor` (all of them for None), oldest
+        first and at most `limit`, with the cursor to pass on the next call.
+        """
+        thread = self._cached_thread()
+        if thread is not None:
+            start = bisect_right(thread.ids, cursor) if cursor is not None else 0
+            end = len(thread.ids) if limit is None else start + limit
+            ids, messages = thread.ids[start:end], thread.messages[start:end]
+        else:
+            stmt = self._thread_query()
+            if cursor is not None:
+                stmt = stmt.filter(ChatMessageORM.id > cursor)
+            stmt = stmt.order_by(ChatMessageORM.id.asc())
+            if limit is not None:
+                stmt = stmt.limit(limit)
+            ids, messages = await self._select_messages(stmt)
+
+        return list(messages), (ids[-1] if ids else cursor)
 
     async def add_messages(self, messages: Sequence[ChatMessage]) -> None:
-        """Add messages to the PostgreSQL store."""
+        """Add messages to the PostgreSQL store with one multi-row INSERT."""
         if not messages:
             return
 
         await self._ensure_session()
 
-        for message in messages:
-            user_id = self.user_id
-            serialized_message = self._serialize_message(message)
-            new_message = ChatMessageORM(
-                user_id=user_id,
-                conversation_id=self.thread_id,
-                message=serialized_message,
-                message_id=message.message_id or f"{uuid.uuid4()}",
-            )
-            self._session.add(new_message)
-
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_id": self.user_id,
+                "conversation_id": self.thread_id,
+                "message": self._serialize_message(message),
+                "message_id": message.message_id or f"{uuid.uuid4()}",
+                "created_at": now,
+            }
+            for message in messages
+        ]
+        result = await self._session.execute(
+            insert(ChatMessageORM).values(rows).returning(ChatMessageORM.id)
+        )
+        ids = sorted(result.scalars().all())
         await self._session.commit()
 
+        # A hot thread takes the new messages as they are, no re-read needed
+        thread = self._cached_thread()
+        if thread is not None:
+            thread.append(ids, messages)
+
         # Apply message limit if configured
         if self.max_messages is not None:
             await self._trim_messages()
@@ -135,6 +308,8 @@ class PostgresChatMessageStore(ChatMessageStoreProtocol):
             postgres_url=self.postgres_url,
             user_id=self.user_id,
             max_messages=self.max_messages,
+            history_window=self.history_window,
+            use_cache=self.use_cache,
         )
         return state.to_dict(**kwargs)
 
@@ -145,13 +320,15 @@ class PostgresChatMessageStore(ChatMessageStoreProtocol):
         if not serialized_store_state:
             raise ValueError("serialized_store_state is required for deserialization")
 
-        state = PostgresChatMessageStore.from_dict(serialized_store_state, **kwargs)
+        state = PostgresStoreState.from_dict(serialized_store_state, **kwargs)
 
         return cls(
             postgres_url=state.postgres_url,
             thread_id=state.thread_id,
             user_id=state.user_id,
             max_messages=state.max_messages,
+            use_cache=state.use_cache,
+            history_window=state.history_window,
         )
 
     async def update_from_state(
@@ -160,12 +337,14 @@ class PostgresChatMessageStore(ChatMessageStoreProtocol):
         if not serialized_store_state:
             return
 
-        state = PostgresChatMessageStore.from_dict(serialized_store_state, **kwargs)
+        state = PostgresStoreState.from_dict(serialized_store_state, **kwargs)
 
         self.thread_id = state.thread_id
         if state.postgres_url is not None:
             self.postgres_url = state.postgres_url
         self.max_messages = state.max_messages
+        self.history_window = state.history_window
+        self.use_cache = state.use_cache
 
         if state.postgres_url and state.postgres_url != getattr(
             self, "_last_postgres_url", None
@@ -174,25 +353,27 @@ class PostgresChatMessageStore(ChatMessageStoreProtocol):
             await self._ensure_session()
 
     async def _trim_messages(self) -> None:
-        """Trim the messages table to the maximum number of messages."""
+        """Keep only the newest `max_messages` messages of the conversation."""
         await self._ensure_session()
 
-        result = await self._session.execute(
-            select(ChatMessageORM).filter_by(conversation_id=self.thread_id)
+        # Everything past the newest max_messages rows, found by a backward
+        # scan of the (conversation_id, created_at) index; no rows are loaded
+        excess_ids = (
+            select(ChatMessageORM.id)
+            .filter_by(conversation_id=self.thread_id)
+            .order_by(ChatMessageORM.created_at.desc(), ChatMessageORM.id.desc())
+            .offset(self.max_messages)
         )
-        messages = result.scalars().all()
-        count = len(messages)
-
-        if count > self.max_messages:
-            # Delete the oldest messages
-            excess_count = count - self.max_messages
-            await self._session.execute(
-                select(ChatMessageORM)
-                .filter_by(conversation_id=self.thread_id)
-                .order_by(ChatMessageORM.created_at.asc())
-                .limit(excess_count)
-            )
-            await self._session.commit()
+        await self._session.execute(
+            delete(ChatMessageORM)
+            .where(ChatMessageORM.id.in_(excess_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await self._session.commit()
+
+        thread = self._cached_thread()
+        if thread is not None:
+            thread.keep_last(self.max_messages)
 
     def _serialize_message(self, message: ChatMessage) -> str:
         """Serialize a ChatMessage to JSON string."""
@@ -204,12 +385,24 @@ class PostgresChatMessageStore(ChatMessageStoreProtocol):
 
     async def clear(self) -> None:
         """Remove all messages from the store."""
-        # await self._ensure_session()
-        # await self._session.execute(
-        #     select(ChatMessageORM).filter_by(conversation_id=self.thread_id).delete()
-        # )
-        # await self._session.commit()
-        ...
+        await self._ensure_session()
+        await self._session.execute(
+            delete(ChatMessageORM)
+            .filter_by(conversation_id=self.thread_id)
+            .execution_options(synchronize_session=False)
+        )
+        await self._session.commit()
+        hot_threads.discard(self._cache_key)
+
+    @classmethod
+    def from_settings(cls, postgres_url: str | None = None, **kwargs: Any):
+        """
+        A store configured by the CHAT_HISTORY_WINDOW and CHAT_HISTORY_CACHE
+        settings, on POSTGRES_URI unless `postgres_url` is given.
+        """
+        kwargs.setdefault("history_window", CHAT_HISTORY_WINDOW)
+        kwargs.setdefault("use_cache", CHAT_HISTORY_CACHE)
+        return cls(postgres_url or os.getenv("POSTGRES_URI"), **kwargs)
 
     async def aclose(self) -> None:
         """Close the PostgreSQL session."""
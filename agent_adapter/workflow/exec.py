@@ -27,6 +27,7 @@ from agent_adapter.executor.dispatcher import Dispatcher
 from agent_adapter.executor.sum import Sum
 from agent_adapter.executor.average import Average
 from agent_adapter.checkpoint.postgres import PostgresCheckpointStorage
+from agent_adapter.checkpoint.sqlite import SqliteCheckpointStorage
 
 
 def get_exec_workflow(checkpointStorage: CheckpointStorage | None = None) -> Workflow:
@@ -63,7 +64,12 @@ async def main():
 
 
 async def run_checkpoint():
-    checkpoint_storage = PostgresCheckpointStorage(os.getenv("POSTGRES_URI"))
+    # Local runs without a Postgres server checkpoint to a SQLite file
+    checkpoint_storage = (
+        PostgresCheckpointStorage(os.getenv("POSTGRES_URI"))
+        if os.getenv("POSTGRES_URI")
+        else SqliteCheckpointStorage()
+    )
     workflow = get_exec_workflow(checkpoint_storage)
     output: list[ChatMessage] | None = None
     arr = [random.randint(1, 100) for _ in range(10)]
@@ -75,8 +81,10 @@ async def run_checkpoint():
     if output is not None:
         print(output)
 
-    checkpoints = await checkpoint_storage.list_checkpoints(workflow.id)
-    print(f"checkpoints count: {len(checkpoints)}")
+    checkpoints, _ = await checkpoint_storage.list_checkpoint_summaries(
+        workflow.id, limit=2, newest_first=False
+    )
+    print(f"first checkpoints: {[c.iteration_count for c in checkpoints]}")
 
     saved_checkpoint = checkpoints[1]
     async for event in workflow.run_stream(
@@ -5,6 +5,7 @@ from contextlib import asynccontextmanager, AsyncExitStack
 from dataclasses import dataclass
 from typing import Callable, Any
 from agent_adapter.agui import register_agents
+from agent_adapter.storage.engine import dispose_engines
 
 from adk_adapter.agui import register_adk_agents
 
@@ -17,6 +18,8 @@ warnings.filterwarnings("ignore", category=UserWarning, module=".*")
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with AsyncExitStack() as stack:
+        # Close the Postgres pools the agents' stores opened
+        stack.push_async_callback(dispose_engines)
         yield
 
 
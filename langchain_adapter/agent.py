@@ -62,16 +62,23 @@ def calculate(query: str, config: LangChainOption):
     return response["output"]
 
 
-def calculate2(query: str, config: LangChainOption):
+def get_react_agent(config: LangChainOption):
     llm = init_chat_model(
         config.lang_google_chat_model,
         model_provider="google_genai",
         api_key=config.lang_google_api_key,
     )
 
-    agent = create_react_agent(llm, tools, prompt=prompt2)
+    return create_react_agent(llm, tools, prompt=prompt2)
+
+
+def calculate2(query: str, config: LangChainOption):
+    response = get_react_agent(config).invoke({"messages": [("human", query)]})
+    return response["messages"][-1].content
+
 
-    response = agent.invoke({"messages": [("human", query)]})
+async def acalculate2(query: str, config: LangChainOption):
+    response = await get_react_agent(config).ainvoke({"messages": [("human", query)]})
     return response["messages"][-1].content
 
 
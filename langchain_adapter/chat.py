@@ -44,6 +44,10 @@ def generate_joke(input_text: str, chain) -> Joke:
     return chain.invoke(input_text)
 
 
+async def agenerate_joke(input_text: str, chain) -> Joke:
+    return await chain.ainvoke(input_text)
+
+
 def generate_joke_stream(input_text: str, chain):
     for chunk in chain.stream(input_text):
         print(chunk.punchline, end="|", flush=True)
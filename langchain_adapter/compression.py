@@ -13,8 +13,11 @@ from langchain_text_splitters import CharacterTextSplitter
 from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
+from .index_registry import index_registry
 from .option import LangChainOption
 
+STATE_OF_THE_UNION = "./langchain_adapter/state_of_the_union.txt"
+
 
 def pretty_print_docs(docs):
     print(
@@ -24,30 +27,42 @@ def pretty_print_docs(docs):
     )
 
 
-def get_retriever(config: LangChainOption):
-    embedding = GoogleGenerativeAIEmbeddings(
+def get_embedding(config: LangChainOption):
+    return GoogleGenerativeAIEmbeddings(
         model=config.lang_google_embedding_model,
         google_api_key=config.lang_google_api_key,
     )
 
-    documents = TextLoader("./langchain_adapter/state_of_the_union.txt").load()
-    text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=0)
-    texts = text_splitter.split_documents(documents)
-    return FAISS.from_documents(texts, embedding).as_retriever()
 
+def get_retriever(config: LangChainOption):
+    embedding = get_embedding(config)
+    return index_registry(config).load(STATE_OF_THE_UNION, embedding).as_retriever()
 
-def contextual_compression(question: str, retriever, config: LangChainOption):
+
+async def aget_retriever(config: LangChainOption):
+    embedding = get_embedding(config)
+    vectorstore = await index_registry(config).aload(STATE_OF_THE_UNION, embedding)
+    return vectorstore.as_retriever()
+
+
+def get_compression_retriever(retriever, config: LangChainOption):
     llm = init_chat_model(
         config.lang_google_chat_model,
         model_provider="google_genai",
         api_key=config.lang_google_api_key,
     )
     compressor = LLMChainExtractor.from_llm(llm)
-    compression_retriever = ContextualCompressionRetriever(
+    return ContextualCompressionRetriever(
         base_compressor=compressor, base_retriever=retriever
     )
 
-    return compression_retriever.invoke(question)
+
+def contextual_compression(question: str, retriever, config: LangChainOption):
+    return get_compression_retriever(retriever, config).invoke(question)
+
+
+async def acontextual_compression(question: str, retriever, config: LangChainOption):
+    return await get_compression_retriever(retriever, config).ainvoke(question)
 
 
 def retrieval_qa(query: str, config: LangChainOption):
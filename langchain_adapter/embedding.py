@@ -26,6 +26,7 @@ from langchain_classic.chains.query_constructor.schema import AttributeInfo
 from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
+from .index_registry import index_registry
 from .option import LangChainOption
 
 
@@ -58,35 +59,44 @@ def generate_embedding(input_texts: List[str], config: LangChainOption):
     return embeddings_model.embed_documents(input_texts)
 
 
-def retriever(question: str, path: str, config: LangChainOption):
-    embeddings_model = GoogleGenerativeAIEmbeddings(
+def get_embeddings_model(config: LangChainOption):
+    return GoogleGenerativeAIEmbeddings(
         model=config.lang_google_embedding_model,
         google_api_key=config.lang_google_api_key,
     )
 
-    loader = TextLoader(path)
-    documents = loader.load()
-    text_splitter = CharacterTextSplitter(chunk_size=10, chunk_overlap=0)
-    texts = text_splitter.split_documents(documents)
-    vectorstore = FAISS.from_documents(texts, embeddings_model)
-    retriever = vectorstore.as_retriever()
-    return retriever.invoke(question)
 
+def retriever(question: str, path: str, config: LangChainOption):
+    embeddings_model = get_embeddings_model(config)
+    vectorstore = index_registry(config).load(path, embeddings_model, chunk_size=10)
+    return vectorstore.as_retriever().invoke(question)
 
-def vectordb_with_Chroma(path: str, config: LangChainOption):
-    embedding = GoogleGenerativeAIEmbeddings(
-        model=config.lang_google_embedding_model,
-        google_api_key=config.lang_google_api_key,
+
+async def aretriever(question: str, path: str, config: LangChainOption):
+    embeddings_model = get_embeddings_model(config)
+    vectorstore = await index_registry(config).aload(
+        path, embeddings_model, chunk_size=10
     )
+    return await vectorstore.as_retriever().ainvoke(question)
 
-    loader = WebBaseLoader(path)
-    data = loader.load()
 
-    # Split
+def split_web_documents(data):
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=0)
-    splits = text_splitter.split_documents(data)
+    return text_splitter.split_documents(data)
+
+
+def vectordb_with_Chroma(path: str, config: LangChainOption):
+    data = WebBaseLoader(path).load()
+    return Chroma.from_documents(
+        documents=split_web_documents(data), embedding=get_embeddings_model(config)
+    )
 
-    return Chroma.from_documents(documents=splits, embedding=embedding)
+
+async def avectordb_with_Chroma(path: str, config: LangChainOption):
+    data = [doc async for doc in WebBaseLoader(path).alazy_load()]
+    return await Chroma.afrom_documents(
+        documents=split_web_documents(data), embedding=get_embeddings_model(config)
+    )
 
 
 def multi_query_retriever(question: str, vectordb, config: LangChainOption):
@@ -101,7 +111,7 @@ def multi_query_retriever(question: str, vectordb, config: LangChainOption):
     return retriever_from_llm.invoke(question)
 
 
-def multi_query_retriever_with_output(question: str, vectordb, config: LangChainOption):
+def get_multi_query_retriever(vectordb, config: LangChainOption):
     llm = init_chat_model(
         config.lang_google_chat_model,
         model_provider="google_genai",
@@ -110,11 +120,19 @@ def multi_query_retriever_with_output(question: str, vectordb, config: LangChain
     llm_chain = QUERY_PROMPT | llm | output_parser
 
     # MultiQueryRetriever.from_llm is implemented like this
-    retriever_from_llm = MultiQueryRetriever(
+    return MultiQueryRetriever(
         retriever=vectordb.as_retriever(), llm_chain=llm_chain, parser_key="lines"
     )
 
-    return retriever_from_llm.invoke(question)
+
+def multi_query_retriever_with_output(question: str, vectordb, config: LangChainOption):
+    return get_multi_query_retriever(vectordb, config).invoke(question)
+
+
+async def amulti_query_retriever_with_output(
+    question: str, vectordb, config: LangChainOption
+):
+    return await get_multi_query_retriever(vectordb, config).ainvoke(question)
 
 
 def self_querying_retriever(question: str, config: LangChainOption):
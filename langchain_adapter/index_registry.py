@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+from langchain_community.document_loaders import TextLoader
+from langchain_community.vectorstores import FAISS
+from langchain_text_splitters import CharacterTextSplitter
+
+from .option import LangChainOption
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class _Entry:
+    mtime_ns: int
+    size: int
+    sha256: str
+    vectorstore: FAISS
+
+
+class IndexRegistry:
+    """
+    FAISS indexes of local text files, built once and shared by every request.
+
+    An index is embedded on first use and persisted with `FAISS.save_local`
+    under `cache_dir`, so restarts load it from disk instead of calling the
+    embedding API again. Each lookup stats the file; the index is rebuilt
+    only when the content hash changed, not on a bare mtime touch.
+    """
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = Path(cache_dir)
+        self._entries: dict[str, _Entry] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    @staticmethod
+    def _key(path: Path, model: str, chunk_size: int, chunk_overlap: int) -> str:
+        return json.dumps([str(path), model, chunk_size, chunk_overlap])
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def load(
+        self,
+        path: str | Path,
+        embeddings: Embeddings,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 0,
+    ) -> FAISS:
+        """The index of `path`, split into `chunk_size` chunks."""
+        path = Path(path).resolve()
+        model = getattr(embeddings, "model", type(embeddings).__name__)
+        key = self._key(path, model, chunk_size, chunk_overlap)
+
+        stat = os.stat(path)
+        entry = self._entries.get(key)
+        if entry and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+            return entry.vectorstore
+
+        with self._lock(key):
+            entry = self._entries.get(key)
+            if entry and (entry.mtime_ns, entry.size) == (
+                stat.st_mtime_ns,
+                stat.st_size,
+            ):
+                return entry.vectorstore
+
+            sha256 = file_sha256(path)
+            if entry and entry.sha256 == sha256:
+                vectorstore = entry.vectorstore
+            else:
+                vectorstore = self._load_or_build(
+                    key, path, sha256, embeddings, chunk_size, chunk_overlap
+                )
+            self._entries[key] = _Entry(
+                stat.st_mtime_ns, stat.st_size, sha256, vectorstore
+            )
+            return vectorstore
+
+    async def aload(
+        self,
+        path: str | Path,
+        embeddings: Embeddings,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 0,
+    ) -> FAISS:
+        """`load` off the event loop; a cache hit costs one `stat`."""
+        return await asyncio.to_thread(
+            self.load, path, embeddings, chunk_size, chunk_overlap
+        )
+
+    def _load_or_build(
+        self,
+        key: str,
+        path: Path,
+        sha256: str,
+        embeddings: Embeddings,
+        chunk_size: int,
+        chunk_overlap: int,
+    ) -> FAISS:
+        folder = self.cache_dir / hashlib.sha256(key.encode()).hexdigest()[:16]
+        meta_path = folder / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if meta.get("key") == key and meta.get("sha256") == sha256:
+                # Only indexes this registry saved are deserialized
+                return FAISS.load_local(
+                    str(folder), embeddings, allow_dangerous_deserialization=True
+                )
+
+        documents = TextLoader(str(path)).load()
+        text_splitter = CharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        )
+        texts = text_splitter.split_documents(documents)
+        vectorstore = FAISS.from_documents(texts, embeddings)
+
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            vectorstore.save_local(str(folder))
+            meta_path.write_text(json.dumps({"key": key, "sha256": sha256}))
+        except OSError as e:
+            # A read-only deployment still serves the index from memory
+            logger.warning(f"Could not persist the index of {path}: {e}")
+        return vectorstore
+
+
+@lru_cache
+def get_index_registry(cache_dir: str) -> IndexRegistry:
+    return IndexRegistry(cache_dir)
+
+
+def index_registry(config: LangChainOption) -> IndexRegistry:
+    """The process-wide registry of the configured cache directory."""
+    return get_index_registry(config.lang_index_cache_dir)
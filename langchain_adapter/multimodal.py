@@ -10,14 +10,8 @@ class MultimodalData(BaseModel):
     image_url: str
 
 
-def multimodal(data: MultimodalData, config: LangChainOption):
-    llm = init_chat_model(
-        config.lang_google_chat_model,
-        model_provider="google_genai",
-        api_key=config.lang_google_api_key,
-    )
-
-    message = {
+def describe_image_message(data: MultimodalData) -> dict:
+    return {
         "role": "user",
         "content": [
             {
@@ -31,7 +25,23 @@ def multimodal(data: MultimodalData, config: LangChainOption):
             },
         ],
     }
-    response = llm.invoke([message])
+
+
+def get_llm(config: LangChainOption):
+    return init_chat_model(
+        config.lang_google_chat_model,
+        model_provider="google_genai",
+        api_key=config.lang_google_api_key,
+    )
+
+
+def multimodal(data: MultimodalData, config: LangChainOption):
+    response = get_llm(config).invoke([describe_image_message(data)])
+    return response.text()
+
+
+async def amultimodal(data: MultimodalData, config: LangChainOption):
+    response = await get_llm(config).ainvoke([describe_image_message(data)])
     return response.text()
 
 
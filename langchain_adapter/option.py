@@ -7,6 +7,8 @@ class LangChainOption(BaseSettings):
     lang_google_chat_model: str
     lang_google_embedding_model: str
     ai21_api_key: str
+    # FAISS indexes of local files are persisted here, see index_registry
+    lang_index_cache_dir: str = ".cache/langchain_indexes"
 
     model_config = ConfigDict(
         env_file=".env",
@@ -31,24 +31,41 @@ def multiply(a: int, b: int) -> int:
 tools = [add, multiply]
 
 
-def calculate(query: str, config: LangChainOption):
+def get_llm_with_tools(config: LangChainOption):
     llm = init_chat_model(
         config.lang_google_chat_model,
         model_provider="google_genai",
         api_key=config.lang_google_api_key,
     )
-    llm_with_tools = llm.bind_tools(tools)
+    return llm.bind_tools(tools)
+
+
+def select_tool(tool_call):
+    return {"add": add, "multiply": multiply}[tool_call["name"].lower()]
+
+
+def calculate(query: str, config: LangChainOption):
+    llm_with_tools = get_llm_with_tools(config)
     messages = [HumanMessage(query)]
     ai_msg = llm_with_tools.invoke(messages)
     messages.append(ai_msg)
     for tool_call in ai_msg.tool_calls:
-        selected_tool = {"add": add, "multiply": multiply}[tool_call["name"].lower()]
-        tool_msg = selected_tool.invoke(tool_call)
-        messages.append(tool_msg)
+        messages.append(select_tool(tool_call).invoke(tool_call))
 
     return llm_with_tools.invoke(messages)
 
 
+async def acalculate(query: str, config: LangChainOption):
+    llm_with_tools = get_llm_with_tools(config)
+    messages = [HumanMessage(query)]
+    ai_msg = await llm_with_tools.ainvoke(messages)
+    messages.append(ai_msg)
+    for tool_call in ai_msg.tool_calls:
+        messages.append(await select_tool(tool_call).ainvoke(tool_call))
+
+    return await llm_with_tools.ainvoke(messages)
+
+
 function = {
     "name": "solver",
     "description": "Formulates and solves an equation",
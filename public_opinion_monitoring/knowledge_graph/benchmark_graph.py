@@ -0,0 +1,87 @@
+import sys
+import os
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import time
+import click
+import asyncio
+from neo4j import AsyncGraphDatabase
+
+from knowledge_graph.neo_gragh import (
+    URI,
+    AUTH,
+    DEFAULT_BATCH_SIZE,
+    create_event_triple_with_execute_query,
+    ensure_constraints,
+    write_triples,
+)
+
+PREFIX = "bench-"
+
+
+def synthetic_rows(triples: int, foods: int = 500, hazards: int = 50):
+    return [
+        {
+            "subject": f"{PREFIX}food-{i % foods}",
+            "predicate": "检测出",
+            "obj": f"{PREFIX}hazard-{i % hazards}",
+            "description": f"benchmark triple {i}",
+        }
+        for i in range(triples)
+    ]
+
+
+async def cleanup(driver):
+    await driver.execute_query(
+        "MATCH (n) WHERE (n:Food OR n:Hazard) AND n.name STARTS WITH $prefix "
+        "DETACH DELETE n",
+        prefix=PREFIX,
+        database_="neo4j",
+    )
+
+
+async def run(triples: int, batch_size: int):
+    rows = synthetic_rows(triples)
+
+    async with AsyncGraphDatabase.driver(URI, auth=AUTH) as driver:
+        await driver.verify_connectivity()
+        await ensure_constraints(driver)
+        await cleanup(driver)
+
+        start = time.perf_counter()
+        for row in rows:
+            await create_event_triple_with_execute_query(driver, **row)
+        per_triple = time.perf_counter() - start
+        await cleanup(driver)
+
+        start = time.perf_counter()
+        for i in range(0, len(rows), batch_size):
+            await write_triples(driver, rows[i : i + batch_size])
+        bulk = time.perf_counter() - start
+        await cleanup(driver)
+
+    print(
+        f"per-triple MERGE: {triples / per_triple:,.0f} triples/s ({per_triple:.2f}s)"
+    )
+    print(
+        f"UNWIND x{batch_size}: {triples / bulk:,.0f} triples/s ({bulk:.2f}s), "
+        f"{per_triple / bulk:.1f}x faster"
+    )
+
+
+@click.command()
+@click.option("--triples", default=5000, help="synthetic triples to ingest")
+@click.option("--batch_size", default=DEFAULT_BATCH_SIZE, help="rows per UNWIND")
+def cli(triples: int, batch_size: int):
+    """
+    Compare per-triple MERGE round-trips with batched UNWIND ingestion against
+    the Neo4j at NEO_URL (use a local container, see docker-compose.yml).
+    Benchmark nodes are prefixed with 'bench-' and removed afterwards.
+    """
+    asyncio.run(run(triples, batch_size))
+
+
+if __name__ == "__main__":
+    cli()
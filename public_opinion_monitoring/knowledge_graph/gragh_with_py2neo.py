@@ -14,6 +14,13 @@ from py2neo import Graph, Node, Relationship
 from py2neo.matching import NodeMatcher
 
 from models.llm_response import LLMResponse
+from knowledge_graph.neo_gragh import (
+    BULK_MERGE_QUERY,
+    CONSTRAINT_QUERIES,
+    DEFAULT_BATCH_SIZE,
+    invalidate_search_cache,
+    iter_triple_rows,
+)
 
 from dotenv import load_dotenv
 
@@ -50,43 +57,65 @@ def create_event_triple_py2neo(graph, subject, obj, predicate, description):
     return result.stats()
 
 
+def ensure_constraints_py2neo(graph):
+    for query in CONSTRAINT_QUERIES:
+        graph.run(query)
+
+
+def write_triples_py2neo(graph, rows):
+    """
+    MERGE a batch of triples with a single UNWIND query inside one transaction.
+    """
+    tx = graph.begin()
+    stats = tx.run(BULK_MERGE_QUERY, rows=rows).stats()
+    graph.commit(tx)
+    return stats
+
+
 def generate_knowledge_graph(
     input_path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
 ):
     """
     Read JSONL files to generate knowledge graphs using py2neo.
-    This is a synchronous implementation.
+    This is a synchronous implementation; triples are written `batch_size`
+    at a time with one UNWIND query per batch.
     """
     # Establish a synchronous connection to the database using py2neo.Graph.
     graph = Graph(URI, auth=AUTH)
+    ensure_constraints_py2neo(graph)
     print(input_path)
+
+    nodes_created = 0
+    relationships_created = 0
+    triples = 0
+    rows = []
+
+    def flush():
+        nonlocal nodes_created, relationships_created, triples
+        if not rows:
+            return
+        stats = write_triples_py2neo(graph, rows)
+        nodes_created += stats.get("nodes_created", 0)
+        relationships_created += stats.get("relationships_created", 0)
+        triples += len(rows)
+        rows.clear()
+        invalidate_search_cache()
+
     # Open the file and process it line by line.
     with open(input_path, "r", encoding="utf-8") as fr:
         for line in fr:
-            # Data validation using Pydantic remains the same.
-            llm_response = LLMResponse.model_validate_json(line)
-            if (
-                not llm_response
-                or not llm_response.analysis_result
-                or not llm_response.analysis_result.event_triples
-            ):
+            if not line.strip():
                 continue
+            rows.extend(iter_triple_rows(line))
+            if len(rows) >= batch_size:
+                flush()
 
-            print(llm_response.analysis_result.event_triples)
-            for event in llm_response.analysis_result.event_triples:
-                # Call the new synchronous creation function.
-                stats = create_event_triple_py2neo(
-                    graph,
-                    subject=event.subject,
-                    predicate=event.predicate,
-                    obj=event.object,
-                    description=event.description,
-                )
-                nodes_created = stats.get("nodes_created", 0)
-                relationships_created = stats.get("relationships_created", 0)
+    flush()
 
-                print(f"Nodes created: {nodes_created}")
-                print(f"Relationships created: {relationships_created}")
+    print(f"Triples merged: {triples}")
+    print(f"Nodes created: {nodes_created}")
+    print(f"Relationships created: {relationships_created}")
 
 
 # Query mode and helper maps/regex remain the same.
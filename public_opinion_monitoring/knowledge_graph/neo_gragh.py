@@ -5,6 +5,7 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, project_root)
 
 import json
+import time
 import asyncio
 import aiofiles
 import re
@@ -23,6 +24,69 @@ load_dotenv()
 URI = os.getenv("NEO_URL")
 AUTH = (os.getenv("NEO_NAME"), os.getenv("NEO_PASSWORD"))
 
+# Connections kept by the shared driver
+DRIVER_POOL_SIZE = 50
+# Aggregate results are also refreshed after this long, to pick up writes
+# made by other processes
+AGGREGATE_CACHE_TTL = 300.0
+
+_driver = None
+_driver_loop = None
+# Serializes driver creation; an asyncio.Lock belongs to one loop as well
+_driver_lock = None
+_driver_lock_loop = None
+
+# mode -> (cached_at, result) for the aggregate query modes
+_aggregate_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+async def get_driver():
+    """
+    Return the long-lived, pooled driver of this process.
+    Connectivity is verified once when the driver is created, and the driver
+    is only shared after that succeeded. The async driver belongs to one event
+    loop, so a new loop (e.g. another asyncio.run) gets a new driver.
+    """
+    global _driver, _driver_loop, _driver_lock, _driver_lock_loop
+
+    loop = asyncio.get_running_loop()
+    if _driver is not None and _driver_loop is loop:
+        return _driver
+
+    if _driver_lock_loop is not loop:
+        _driver_lock = asyncio.Lock()
+        _driver_lock_loop = loop
+
+    async with _driver_lock:
+        if _driver is not None and _driver_loop is loop:
+            return _driver
+
+        driver = AsyncGraphDatabase.driver(
+            URI, auth=AUTH, max_connection_pool_size=DRIVER_POOL_SIZE
+        )
+        try:
+            await driver.verify_connectivity()
+        except BaseException:
+            await driver.close()
+            raise
+        _driver = driver
+        _driver_loop = loop
+        return _driver
+
+
+async def close_driver():
+    global _driver, _driver_loop
+
+    if _driver is not None:
+        await _driver.close()
+    _driver = None
+    _driver_loop = None
+
+
+def invalidate_search_cache():
+    """Drop cached aggregate results; called whenever triples are written."""
+    _aggregate_cache.clear()
+
 
 def create_event_triple(session, subject, predicate, obj, description):
     """
@@ -74,38 +138,104 @@ async def create_event_triple_with_execute_query(
     return summary
 
 
+# Number of triples sent per UNWIND round-trip
+DEFAULT_BATCH_SIZE = 1000
+
+# Unique names back the MERGE lookups with an index instead of a label scan
+CONSTRAINT_QUERIES = [
+    "CREATE CONSTRAINT food_name IF NOT EXISTS FOR (f:Food) REQUIRE f.name IS UNIQUE",
+    "CREATE CONSTRAINT hazard_name IF NOT EXISTS FOR (h:Hazard) REQUIRE h.name IS UNIQUE",
+]
+
+BULK_MERGE_QUERY = """
+UNWIND $rows AS row
+MERGE (food:Food {name: row.subject})
+MERGE (hazard:Hazard {name: row.obj})
+MERGE (food)-[rel:DETECTED]->(hazard)
+ON CREATE SET rel.description = row.description, rel.predicate = row.predicate
+"""
+
+
+async def ensure_constraints(driver):
+    for query in CONSTRAINT_QUERIES:
+        await driver.execute_query(query, database_="neo4j")
+
+
+async def _merge_rows(tx, rows):
+    result = await tx.run(BULK_MERGE_QUERY, rows=rows)
+    return await result.consume()
+
+
+async def write_triples(driver, rows: List[Dict[str, str]]):
+    """
+    MERGE a batch of triples in one managed write transaction.
+    The transaction function is retried by the driver on transient errors,
+    which is safe because MERGE is idempotent.
+    """
+    async with driver.session(database="neo4j") as session:
+        return await session.execute_write(_merge_rows, rows)
+
+
+def iter_triple_rows(line: str):
+    llm_response = LLMResponse.model_validate_json(line)
+    if (
+        not llm_response
+        or not llm_response.analysis_result
+        or not llm_response.analysis_result.event_triples
+    ):
+        return
+
+    for event in llm_response.analysis_result.event_triples:
+        yield {
+            "subject": event.subject,
+            "predicate": event.predicate,
+            "obj": event.object,
+            "description": event.description,
+        }
+
+
 async def generate_knowledge_graph(
     input_path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
 ):
     """
     Read JSONL files to generate knowledge graphs.
+    Triples are buffered and written `batch_size` at a time with
+    `UNWIND $rows AS row MERGE ...` instead of one round-trip per triple.
     """
-    async with AsyncGraphDatabase.driver(URI, auth=AUTH) as driver:
-        async with aiofiles.open(input_path, "r", encoding="utf-8") as fr:
-            await driver.verify_connectivity()
+    nodes_created = 0
+    relationships_created = 0
+    triples = 0
+
+    driver = await get_driver()
+    await ensure_constraints(driver)
+
+    rows = []
 
-            async for line in fr:
-                data = json.loads(line)
-                llm_response = LLMResponse.model_validate_json(line)
-                if (
-                    not llm_response
-                    or not llm_response.analysis_result
-                    or not llm_response.analysis_result.event_triples
-                ):
-                    continue
-                print(llm_response.analysis_result.event_triples)
-                for event in llm_response.analysis_result.event_triples:
-                    summary = await create_event_triple_with_execute_query(
-                        driver,
-                        subject=event.subject,
-                        predicate=event.predicate,
-                        obj=event.object,
-                        description=event.description,
-                    )
-                    print(f"Nodes created: {summary.counters.nodes_created}")
-                    print(
-                        f"Relationships created: {summary.counters.relationships_created}"
-                    )
+    async def flush():
+        nonlocal nodes_created, relationships_created, triples
+        if not rows:
+            return
+        summary = await write_triples(driver, rows)
+        nodes_created += summary.counters.nodes_created
+        relationships_created += summary.counters.relationships_created
+        triples += len(rows)
+        rows.clear()
+        invalidate_search_cache()
+
+    async with aiofiles.open(input_path, "r", encoding="utf-8") as fr:
+        async for line in fr:
+            if not line.strip():
+                continue
+            rows.extend(iter_triple_rows(line))
+            if len(rows) >= batch_size:
+                await flush()
+
+    await flush()
+
+    print(f"Triples merged: {triples}")
+    print(f"Nodes created: {nodes_created}")
+    print(f"Relationships created: {relationships_created}")
 
 
 # Query mode
@@ -190,16 +320,22 @@ async def search_knowledge_graph(
             " RETURN f.name AS Food, h.name AS Hazard, r.description AS Description"
         )
     print(query)
-    async with AsyncGraphDatabase.driver(URI, auth=AUTH) as driver:
-        await driver.verify_connectivity()
-        records, summary, keys = await driver.execute_query(
-            query,
-            **params,
-            routing_="r",
-            database_="neo4j",
-        )
+    # Aggregates rescan the whole graph, so they are served from the cache
+    # until the ingest path writes new triples
+    if mode != "list":
+        cached = _aggregate_cache.get(mode)
+        if cached is not None and time.monotonic() - cached[0] < AGGREGATE_CACHE_TTL:
+            return {**cached[1], "cached": True}
+
+    driver = await get_driver()
+    records, summary, keys = await driver.execute_query(
+        query,
+        **params,
+        routing_="r",
+        database_="neo4j",
+    )
 
-    return {
+    result = {
         "records": records,
         "keys": keys,
         "query": summary.query,
@@ -207,6 +343,11 @@ async def search_knowledge_graph(
         "time": summary.result_available_after,
     }
 
+    if mode != "list":
+        _aggregate_cache[mode] = (time.monotonic(), result)
+
+    return {**result, "cached": False}
+
 
 async def search_demo():
     result = await search_knowledge_graph(mode="list")
@@ -229,8 +370,15 @@ async def search_demo():
     print(result)
 
 
+async def generate_demo(input_path: str):
+    try:
+        await generate_knowledge_graph(input_path)
+        # await search_demo()
+    finally:
+        await close_driver()
+
+
 if __name__ == "__main__":
     input_jsonl_file = "3.1.weibo_data_analyzed_structured.jsonl"
-    asyncio.run(generate_knowledge_graph(input_jsonl_file))
-    # asyncio.run(search_demo())
+    asyncio.run(generate_demo(input_jsonl_file))
     print(f"Processing completed")
@@ -2,8 +2,11 @@ from typing import Any, Literal, Annotated
 import os
 import click
 import asyncio
+from contextlib import contextmanager
 
 from spider.weibo_spider import search_weibo, save_data_as_jsonl
+from spider.async_weibo_spider import search_keywords
+from spider.id_index import WeiboIdIndex
 from tokenization.tokenize_handler import CustomSegmenter, process_text_tokenization
 
 # hanlp is too big to import into venv.
@@ -13,11 +16,13 @@ from tokenization.tokenize_handler import CustomSegmenter, process_text_tokeniza
 
 from nlp.analyze import process_llm_calling
 from nlp.analyze_structured import process_llm_calling as process_llm_calling_structured
+from nlp.llm_engine import DEFAULT_CONCURRENCY
+from nlp.llm_cache import LLMResultCache
 
 from knowledge_graph.gragh_with_py2neo import (
     generate_knowledge_graph as generate_knowledge_graph_py2neo,
 )
-from knowledge_graph.neo_gragh import generate_knowledge_graph
+from knowledge_graph.neo_gragh import generate_knowledge_graph, close_driver
 
 
 @click.command()
@@ -27,6 +32,12 @@ from knowledge_graph.neo_gragh import generate_knowledge_graph
     type=click.Choice(["all", "spider", "tokenization", "nlp", "graph"]),
     help="Workflow",
 )
+@click.option(
+    "--spider_type",
+    default="async",
+    type=click.Choice(["async", "nomal"]),
+    help="spider type",
+)
 @click.option(
     "--token_type",
     default="nomal",
@@ -45,7 +56,11 @@ from knowledge_graph.neo_gragh import generate_knowledge_graph
     type=click.Choice(["py2neo", "neo4j"]),
     help="graph type",
 )
-@click.option("--keyword", default="食品安全", help="keyword to search")
+@click.option(
+    "--keyword",
+    default="食品安全",
+    help="keyword to search, comma separated keywords are crawled together (async spider)",
+)
 @click.option("--pages", default=5, help="max pages to process")
 @click.option(
     "--spider_output", default="1.weibo_foodsafety.jsonl", help="save spider result"
@@ -61,9 +76,35 @@ from knowledge_graph.neo_gragh import generate_knowledge_graph
     help="save llm result",
 )
 @click.option("--dict_path", default="custom_food_dict.txt", help="dictionary Path")
+@click.option(
+    "--workers",
+    default=1,
+    help="tokenization worker processes, 0 for one per CPU core",
+)
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    help="max LLM requests in flight",
+)
+@click.option(
+    "--resume/--no-resume",
+    default=True,
+    help="skip records already saved to llm_output",
+)
+@click.option(
+    "--llm_cache",
+    default="llm_cache.sqlite3",
+    help="LLM result cache path, empty to disable",
+)
+@click.option(
+    "--batch_size",
+    default=1,
+    help="posts packed into one LLM request (structured nlp only)",
+)
 def cli(
     keyword: str,
     process: Literal["all", "spider", "tokenization", "nlp", "graph"] = "all",
+    spider_type: Literal["async", "nomal"] = "async",
     token_type: Literal["hanlp", "nomal"] = "nomal",
     nlp_type: Literal["structured", "nomal"] = "structured",
     graph_type: Literal["neo4j", "py2neo"] = "neo4j",
@@ -72,11 +113,17 @@ def cli(
     spider_output: str = "1.weibo_foodsafety.jsonl",
     tokenize_output: str = "2.weibo_data_tagged.jsonl",
     llm_output: str = "3.weibo_data_analyzed.jsonl",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    resume: bool = True,
+    llm_cache: str = "llm_cache.sqlite3",
+    batch_size: int = 1,
+    workers: int = 1,
 ):
     asyncio.run(
         main(
             keyword,
             process,
+            spider_type,
             token_type,
             nlp_type,
             graph_type,
@@ -85,13 +132,42 @@ def cli(
             spider_output,
             tokenize_output,
             llm_output,
+            concurrency,
+            resume,
+            llm_cache,
+            batch_size,
+            workers,
         )
     )
 
 
+@contextmanager
+def open_llm_cache(path: str):
+    if not path:
+        yield None
+        return
+
+    cache = LLMResultCache(path)
+    try:
+        yield cache
+    finally:
+        cache.close()
+
+
+async def crawl(keyword: str, spider_type: str, pages: int, spider_output: str):
+    # Posts already archived in spider_output are never fetched again
+    with WeiboIdIndex(spider_output) as known_ids:
+        if spider_type == "async":
+            return await search_keywords(
+                keyword.split(","), max_pages=pages, known_ids=known_ids
+            )
+        return search_weibo(keyword, max_pages=pages, known_ids=known_ids)
+
+
 async def main(
     keyword: str,
     process: Literal["all", "spider", "tokenization", "nlp", "graph"] = "all",
+    spider_type: Literal["async", "nomal"] = "async",
     token_type: Literal["hanlp", "nomal"] = "nomal",
     nlp_type: Literal["structured", "nomal"] = "structured",
     graph_type: Literal["neo4j", "py2neo"] = "neo4j",
@@ -100,56 +176,90 @@ async def main(
     spider_output: str = "1.weibo_foodsafety.jsonl",
     tokenize_output: str = "2.weibo_data_tagged.jsonl",
     llm_output: str = "3.weibo_data_analyzed.jsonl",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    resume: bool = True,
+    llm_cache: str = "llm_cache.sqlite3",
+    batch_size: int = 1,
+    workers: int = 1,
 ):
     if process == "spider":
-        data = search_weibo(keyword, max_pages=pages)
+        data = await crawl(keyword, spider_type, pages, spider_output)
         save_data_as_jsonl(data, filename=spider_output)
         return
 
     if process == "tokenization":
         if token_type == "nomal":
             segmenter = CustomSegmenter(dict_path)
-            process_text_tokenization(spider_output, tokenize_output, segmenter, True)
+            process_text_tokenization(
+                spider_output, tokenize_output, segmenter, True, workers
+            )
             return
         else:
             hanlp_process_text_tokenization(spider_output, tokenize_output, True)
             return
 
     if process == "nlp":
-        if nlp_type == "structured":
-            await process_llm_calling_structured(tokenize_output, llm_output)
-            return
-        else:
-            await process_llm_calling(tokenize_output, llm_output)
-            return
+        with open_llm_cache(llm_cache) as cache:
+            if nlp_type == "structured":
+                await process_llm_calling_structured(
+                    tokenize_output,
+                    llm_output,
+                    concurrency,
+                    resume,
+                    cache,
+                    batch_size,
+                )
+            else:
+                await process_llm_calling(
+                    tokenize_output, llm_output, concurrency, resume, cache
+                )
+        return
 
     if process == "graph":
         if graph_type == "py2neo":
             generate_knowledge_graph_py2neo(llm_output)
             return
         else:
-            await generate_knowledge_graph(llm_output)
+            try:
+                await generate_knowledge_graph(llm_output)
+            finally:
+                await close_driver()
             return
 
     if process == "all":
-        data = search_weibo(keyword, max_pages=pages)
+        data = await crawl(keyword, spider_type, pages, spider_output)
         save_data_as_jsonl(data, filename=spider_output)
 
         if token_type == "nomal":
             segmenter = CustomSegmenter(dict_path)
-            process_text_tokenization(spider_output, tokenize_output, segmenter, True)
+            process_text_tokenization(
+                spider_output, tokenize_output, segmenter, True, workers
+            )
         else:
             hanlp_process_text_tokenization(spider_output, tokenize_output, True)
 
-        if nlp_type == "structured":
-            await process_llm_calling_structured(tokenize_output, llm_output)
-        else:
-            await process_llm_calling(tokenize_output, llm_output)
+        with open_llm_cache(llm_cache) as cache:
+            if nlp_type == "structured":
+                await process_llm_calling_structured(
+                    tokenize_output,
+                    llm_output,
+                    concurrency,
+                    resume,
+                    cache,
+                    batch_size,
+                )
+            else:
+                await process_llm_calling(
+                    tokenize_output, llm_output, concurrency, resume, cache
+                )
 
         if graph_type == "py2neo":
             generate_knowledge_graph_py2neo(llm_output)
         else:
-            await generate_knowledge_graph(llm_output)
+            try:
+                await generate_knowledge_graph(llm_output)
+            finally:
+                await close_driver()
 
 
 if __name__ == "__main__":
@@ -62,3 +62,17 @@ class LLMResponse(BaseModel):
     """LLM输出的顶层模型"""
 
     analysis_result: Optional[AnalysisResult] = None
+
+
+class LLMBatchItem(LLMResponse):
+    """批量模式下单条文本的输出模型"""
+
+    id: int = Field(..., description="待分析文本的编号，与输入中的 id 一致。")
+
+
+class LLMBatchResponse(BaseModel):
+    """批量模式下LLM输出的顶层模型"""
+
+    results: List[LLMBatchItem] = Field(
+        ..., description="每条待分析文本的分析结果，每个 id 对应一个元素。"
+    )
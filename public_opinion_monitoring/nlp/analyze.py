@@ -6,16 +6,29 @@ sys.path.insert(0, project_root)
 
 import json
 import asyncio
+import functools
+from typing import Optional
 from openai import AsyncOpenAI
-from tqdm import tqdm
 from models.llm_response import LLMResponse
+from nlp.llm_engine import (
+    DEFAULT_CONCURRENCY,
+    create_completion,
+    failed_analysis,
+    run_analysis,
+)
+from nlp.llm_cache import LLMResultCache
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
-async def analyze_text_with_llm(text_content, tags_content):
+async def analyze_text_with_llm(
+    text_content,
+    tags_content,
+    client: Optional[AsyncOpenAI] = None,
+    cache: Optional[LLMResultCache] = None,
+):
     """
     Call the LLM API to analyze the text and return structured JSON results.
     """
@@ -108,10 +121,19 @@ async def analyze_text_with_llm(text_content, tags_content):
   }}
 }}
 """
-    client = AsyncOpenAI(
-        api_key=os.getenv("GOOGLE_API_KEY"),
-        base_url=os.getenv("GOOGLE_URL"),
-    )
+    # Reposts and identical posts are answered from the cache without a network call
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.make_key(
+            text_content,
+            tags_content,
+            os.getenv("GOOGLE_CHAT_MODEL_ID"),
+            system_prompt + user_prompt_template,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     messages = [
         {"role": "system", "content": system_prompt},
         {
@@ -123,79 +145,38 @@ async def analyze_text_with_llm(text_content, tags_content):
     ]
 
     try:
-        async with AsyncOpenAI(
-            api_key=os.getenv("GOOGLE_API_KEY"),
-            base_url=os.getenv("GOOGLE_URL"),
-        ) as client:
-            completion = await client.chat.completions.create(
-                messages=messages,
-                model=os.getenv("GOOGLE_CHAT_MODEL_ID"),
-                response_format={"type": "json_object"},
-            )
-
-            result_json_str = completion.choices[0].message.content
-            return json.loads(result_json_str)
+        # The shared client is pooled and retries 429/5xx responses with backoff
+        result_json_str = await create_completion(messages, client)
+        result = json.loads(result_json_str)
+        if cache is not None:
+            cache.set(cache_key, result)
+        return result
 
     except Exception as e:
         print(f"Error calling LLM API: {e}")
-        return {"analysis_result": None}
+        return failed_analysis(e)
 
 
-async def process_llm_calling(input_file, output_file):
+async def process_llm_calling(
+    input_file,
+    output_file,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    resume: bool = True,
+    cache: Optional[LLMResultCache] = None,
+):
     """
-    Reads a JSONL file, processes each line, and saves the result to a new file.
+    Streams a JSONL file, processes the lines concurrently, and appends the
+    results to a new file in input order. Interrupted runs resume where they stopped.
+    Results found in `cache` are reused instead of calling the LLM again.
     """
-    processed_data = []
+    analyze = analyze_text_with_llm
+    if cache is not None:
+        analyze = functools.partial(analyze_text_with_llm, cache=cache)
 
-    try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            # Read all lines to get the total for the progress bar
-            lines = f.readlines()
-            total_lines = len(lines)
-
-            # Use tqdm to display the progress bar
-            for line in tqdm(lines, total=total_lines, desc="Processing JSONL"):
-                data = json.loads(line)
-                text = data.get("text", "")
-                tags = data.get("tags", {})
-                tags_content_lines = []
-
-                for k, v in tags.items():
-                    tags_content_lines.append(f"{k}: {list(v.keys())}")
-
-                tags_content = "\n".join(tags_content_lines)
-
-                if text:
-                    # Call LLM for analysis
-                    analysis_result = await analyze_text_with_llm(text, tags_content)
-
-                    # Merge the analysis results into the original data
-                    if analysis_result:
-                        data.update(analysis_result)
-                else:
-                    data.update(
-                        {
-                            "analysis_result": {
-                                "event_triples": [],
-                                "sentiment_analysis": None,
-                                "ad_detection": None,
-                            }
-                        }
-                    )
-
-                processed_data.append(data)
-
-    except FileNotFoundError:
-        print(f"Error: File '{input_file}' not found.")
-        return
-
-    # Write the processed data to a new JSONL file
-    with open(output_file, "w", encoding="utf-8") as f:
-        for item in processed_data:
-            json_line = json.dumps(item, ensure_ascii=False)
-            f.write(json_line + "\n")
-
-    print(f"Processing completed! The results have been saved to '{output_file}'.")
+    await run_analysis(input_file, output_file, analyze, concurrency, resume)
+
+    if cache is not None:
+        print(f"LLM cache: {cache.stats()}")
 
 
 if __name__ == "__main__":
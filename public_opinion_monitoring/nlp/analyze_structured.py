@@ -6,12 +6,19 @@ sys.path.insert(0, project_root)
 
 import json
 import asyncio
+import functools
 from openai import AsyncOpenAI
-from tqdm import tqdm
 from pydantic import BaseModel, Field, ValidationError
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
-from models.llm_response import LLMResponse
+from models.llm_response import LLMResponse, LLMBatchItem, LLMBatchResponse
+from nlp.llm_engine import (
+    DEFAULT_CONCURRENCY,
+    create_completion,
+    failed_analysis,
+    run_analysis,
+)
+from nlp.llm_cache import LLMResultCache
 
 from dotenv import load_dotenv
 
@@ -21,8 +28,65 @@ load_dotenv()
 llm_response_schema = LLMResponse.model_json_schema()
 llm_response_schema_str = json.dumps(llm_response_schema, indent=2, ensure_ascii=False)
 
+llm_batch_response_schema = LLMBatchResponse.model_json_schema()
+llm_batch_response_schema_str = json.dumps(
+    llm_batch_response_schema, indent=2, ensure_ascii=False
+)
 
-async def analyze_text_with_llm(text_content, tags_content):
+# Number of posts packed into one request in batch mode
+DEFAULT_BATCH_SIZE = 10
+
+batch_system_prompt = """你是一个专业的食品安全舆情分析专家，精通自然语言处理技术。你的任务是分析用户提供的多条文本，从每条文本中提取食品安全事件相关信息，识别广告并进行情感分析。请严格按照要求，以JSON格式输出结果。"""
+
+batch_user_prompt_template = """请逐条分析以下 {count} 条文本，为每条文本提取食品安全事件三元组（主体-谓词-客体）、情感分析结果以及是否为广告内容。每条文本都附带了已识别的关键实体（如企业名、有害物质等），请将其作为辅助信息。如果某条文本中没有相关信息，该条的 `analysis_result` 返回 null。
+
+--- 输出要求 ---
+请严格按照以下 JSON Schema 输出一个 JSON 对象：`results` 数组中每个元素对应一条文本，`id` 与输入编号一致，不得遗漏或合并任何一条。
+
+**JSON Schema:**
+```json
+{llm_batch_response_schema_str}
+```
+
+--- 示例 ---
+
+输入:
+[id: 0]
+文本: 朋友拿了米其林一星餐厅的燕皮扁食去化验 检测出了硼砂成分（剧毒）
+辅助信息 (已识别的实体):
+企业名: ['米其林一星餐厅']
+有害物质: ['硼砂']
+
+期望输出JSON：
+```json
+{{
+  "results": [
+    {{
+      "id": 0,
+      "analysis_result": {{
+        "event_triples": [
+          {{"subject": "朋友", "predicate": "检测出", "object": "硼砂成分", "description": "朋友在米其林一星餐厅的燕皮扁食中检测出硼砂成分（剧毒）"}}
+        ],
+        "sentiment_analysis": {{"overall_score": -7, "positive_score": 0, "negative_score": 7, "sentiment_keywords": ["硼砂", "剧毒"], "analysis_details": "对餐厅食品中检测出剧毒硼砂感到震惊，情感负面。"}},
+        "ad_detection": {{"is_ad": false, "ad_type": null, "ad_keywords": null, "reasoning": "文本没有广告的迹象。"}}
+      }}
+    }}
+  ]
+}}
+```
+
+--- 待分析文本 ---
+
+{posts}
+"""
+
+
+async def analyze_text_with_llm(
+    text_content,
+    tags_content,
+    client: Optional[AsyncOpenAI] = None,
+    cache: Optional[LLMResultCache] = None,
+):
     """
     Call the LLM API to analyze the text and return structured JSON results.
     """
@@ -99,10 +163,19 @@ async def analyze_text_with_llm(text_content, tags_content):
 }}
 """
 
-    client = AsyncOpenAI(
-        api_key=os.getenv("GOOGLE_API_KEY"),
-        base_url=os.getenv("GOOGLE_URL"),
-    )
+    # Reposts and identical posts are answered from the cache without a network call
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.make_key(
+            text_content,
+            tags_content,
+            os.getenv("GOOGLE_CHAT_MODEL_ID"),
+            system_prompt + user_prompt_template + llm_response_schema_str,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     messages = [
         {"role": "system", "content": system_prompt},
         {
@@ -116,83 +189,160 @@ async def analyze_text_with_llm(text_content, tags_content):
     ]
 
     try:
-        async with AsyncOpenAI(
-            api_key=os.getenv("GOOGLE_API_KEY"),
-            base_url=os.getenv("GOOGLE_URL"),
-        ) as client:
-            completion = await client.chat.completions.create(
-                messages=messages,
-                model=os.getenv("GOOGLE_CHAT_MODEL_ID"),
-                response_format={"type": "json_object"},
-            )
-
-            result_json_str = completion.choices[0].message.content
-            llm_response = LLMResponse.model_validate_json(result_json_str)
-            return llm_response.model_dump()
+        # The shared client is pooled and retries 429/5xx responses with backoff
+        result_json_str = await create_completion(messages, client)
+        llm_response = LLMResponse.model_validate_json(result_json_str)
+        result = llm_response.model_dump()
+        if cache is not None:
+            cache.set(cache_key, result)
+        return result
 
     except ValidationError as e:
         print(f"Pydantic Validation Error for text: '{text_content}'\nError: {e}")
-        return {"analysis_result": None}
+        return failed_analysis(e)
     except Exception as e:
         print(f"Error calling LLM API or parsing JSON: {e}")
-        return {"analysis_result": None}
+        return failed_analysis(e)
+
+
+def _batch_cache_key(cache: LLMResultCache, text_content, tags_content) -> str:
+    return cache.make_key(
+        text_content,
+        tags_content,
+        os.getenv("GOOGLE_CHAT_MODEL_ID"),
+        batch_system_prompt
+        + batch_user_prompt_template
+        + llm_batch_response_schema_str,
+    )
+
+
+def build_batch_messages(items: List[Tuple[str, str]]) -> List[Dict[str, str]]:
+    posts = "\n\n".join(
+        f"[id: {i}]\n文本: {text_content}\n辅助信息 (已识别的实体):\n{tags_content}"
+        for i, (text_content, tags_content) in enumerate(items)
+    )
+    return [
+        {"role": "system", "content": batch_system_prompt},
+        {
+            "role": "user",
+            "content": batch_user_prompt_template.format(
+                count=len(items),
+                posts=posts,
+                llm_batch_response_schema_str=llm_batch_response_schema_str,
+            ),
+        },
+    ]
 
 
-async def process_llm_calling(input_file, output_file):
+def parse_batch_response(result_json_str: str, count: int) -> List[Optional[Dict]]:
     """
-    Reads a JSONL file, processes each line, and saves the result to a new file.
+    Validate every element of a batch response on its own, so one malformed
+    element only invalidates its own post. Missing or invalid ids map to None.
     """
-    processed_data = []
+    results: List[Optional[Dict]] = [None] * count
 
     try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            # Read all lines to get the total for the progress bar
-            lines = f.readlines()
-            total_lines = len(lines)
-
-            # Use tqdm to display the progress bar
-            for line in tqdm(lines, total=total_lines, desc="Processing JSONL"):
-                data = json.loads(line)
-                text = data.get("text", "")
-                tags = data.get("tags", {})
-                tags_content_lines = []
-
-                for k, v in tags.items():
-                    tags_content_lines.append(f"{k}: {list(v.keys())}")
-
-                tags_content = "\n".join(tags_content_lines)
-
-                if text:
-                    # Call LLM for analysis
-                    analysis_result = await analyze_text_with_llm(text, tags_content)
-
-                    # Merge the analysis results into the original data
-                    if analysis_result:
-                        data.update(analysis_result)
-                else:
-                    data.update(
-                        {
-                            "analysis_result": {
-                                "event_triples": [],
-                                "sentiment_analysis": None,
-                                "ad_detection": None,
-                            }
-                        }
-                    )
-
-                processed_data.append(data)
-
-    except FileNotFoundError:
-        print(f"Error: File '{input_file}' not found.")
-        return
-
-    # Write the processed data to a new JSONL file
-    with open(output_file, "w", encoding="utf-8") as f:
-        for item in processed_data:
-            json_line = json.dumps(item, ensure_ascii=False)
-            f.write(json_line + "\n")
-
-    print(f"Processing completed! The results have been saved to '{output_file}'.")
+        elements = json.loads(result_json_str).get("results")
+    except (json.JSONDecodeError, AttributeError) as e:
+        print(f"Batch response is not a JSON object: {e}")
+        return results
+
+    if not isinstance(elements, list):
+        print("Batch response has no `results` array")
+        return results
+
+    for element in elements:
+        try:
+            item = LLMBatchItem.model_validate(element)
+        except ValidationError as e:
+            print(f"Pydantic Validation Error for batch element: {e}")
+            continue
+        if 0 <= item.id < count and results[item.id] is None:
+            results[item.id] = item.model_dump(exclude={"id"})
+
+    return results
+
+
+async def analyze_batch_with_llm(
+    items: List[Tuple[str, str]],
+    client: Optional[AsyncOpenAI] = None,
+    cache: Optional[LLMResultCache] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Analyze several (text, tags) pairs with one LLM request.
+    The system prompt, schema and example are sent once per batch instead of
+    once per post. Posts whose element fails validation fall back to
+    `analyze_text_with_llm` one by one.
+    """
+    results: List[Optional[Dict]] = [None] * len(items)
+    cache_keys: List[Optional[str]] = [None] * len(items)
+
+    if cache is not None:
+        for i, (text_content, tags_content) in enumerate(items):
+            cache_keys[i] = _batch_cache_key(cache, text_content, tags_content)
+            results[i] = cache.get(cache_keys[i])
+
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    if pending:
+        try:
+            # The shared client is pooled and retries 429/5xx responses with backoff
+            result_json_str = await create_completion(
+                build_batch_messages([items[i] for i in pending]), client
+            )
+            batch_results = parse_batch_response(result_json_str, len(pending))
+        except Exception as e:
+            print(f"Error calling LLM API for batch of {len(pending)}: {e}")
+            batch_results = [None] * len(pending)
+
+        for i, result in zip(pending, batch_results):
+            results[i] = result
+            if result is not None and cache is not None:
+                cache.set(cache_keys[i], result)
+
+    failed = [i for i, result in enumerate(results) if result is None]
+    if failed:
+        print(f"Falling back to single-post calls for {len(failed)} post(s)")
+        # Sequential, so the batch never holds more than its one in-flight slot
+        for i in failed:
+            results[i] = await analyze_text_with_llm(
+                items[i][0], items[i][1], client, cache
+            )
+
+    return results
+
+
+async def process_llm_calling(
+    input_file,
+    output_file,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    resume: bool = True,
+    cache: Optional[LLMResultCache] = None,
+    batch_size: int = 1,
+):
+    """
+    Streams a JSONL file, processes the lines concurrently, and appends the
+    results to a new file in input order. Interrupted runs resume where they stopped.
+    Results found in `cache` are reused instead of calling the LLM again.
+    A `batch_size` above 1 packs that many posts into each request.
+    """
+    analyze = functools.partial(analyze_text_with_llm, cache=cache)
+    analyze_batch = None
+    if batch_size > 1:
+        analyze_batch = functools.partial(analyze_batch_with_llm, cache=cache)
+
+    await run_analysis(
+        input_file,
+        output_file,
+        analyze,
+        concurrency,
+        resume,
+        analyze_batch=analyze_batch,
+        batch_size=batch_size,
+    )
+
+    if cache is not None:
+        print(f"LLM cache: {cache.stats()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+import sys
+import os
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import json
+import time
+import click
+import asyncio
+import tempfile
+from itertools import cycle, islice
+
+from nlp.analyze_structured import DEFAULT_BATCH_SIZE, process_llm_calling
+from nlp.benchmark_concurrency import MockOpenAIServer
+from nlp.llm_engine import DEFAULT_CONCURRENCY, reset_usage_stats, usage_stats
+
+
+def build_fixture_corpus(fixture_file: str, posts: int, output_file: str):
+    """Repeat the tagged fixture records until the corpus has `posts` lines."""
+    with open(fixture_file, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        for i, data in enumerate(islice(cycle(records), posts)):
+            data = dict(data, weibo_id=f"{data.get('weibo_id', '')}-{i}")
+            f.write(json.dumps(data, ensure_ascii=False) + "\n")
+
+
+async def run_mode(
+    corpus_file: str,
+    batch_size: int,
+    concurrency: int,
+    posts: int,
+    mock: MockOpenAIServer | None = None,
+    port: int = 0,
+):
+    output_file = corpus_file + f".batch{batch_size}.out"
+    if mock is not None:
+        await mock.start(port)
+    reset_usage_stats()
+
+    try:
+        start = time.perf_counter()
+        await process_llm_calling(
+            corpus_file,
+            output_file,
+            concurrency,
+            resume=False,
+            batch_size=batch_size,
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        if mock is not None:
+            await mock.stop()
+
+    return {
+        "mode": "single" if batch_size <= 1 else f"batch({batch_size})",
+        "requests": usage_stats["requests"],
+        "prompt_tokens/post": usage_stats["prompt_tokens"] / posts,
+        "completion_tokens/post": usage_stats["completion_tokens"] / posts,
+        "ms/post": elapsed * 1000 / posts,
+    }
+
+
+@click.command()
+@click.option(
+    "--fixture", default="2.weibo_data_tagged.jsonl", help="tagged fixture corpus"
+)
+@click.option("--posts", default=50, help="number of posts to analyze per mode")
+@click.option("--batch_size", default=DEFAULT_BATCH_SIZE, help="posts per request")
+@click.option("--concurrency", default=DEFAULT_CONCURRENCY, help="requests in flight")
+@click.option(
+    "--mock/--live",
+    default=True,
+    help="answer from a local mock endpoint, or call the one in GOOGLE_URL",
+)
+@click.option("--latency", default=0.5, help="mock completion latency in seconds")
+@click.option("--port", default=8767, help="port of the mock server")
+def cli(
+    fixture: str,
+    posts: int,
+    batch_size: int,
+    concurrency: int,
+    mock: bool,
+    latency: float,
+    port: int,
+):
+    """
+    Compare single-post and batched prompting on the same corpus, against a
+    local OpenAI-compatible mock by default. The mock counts one token per
+    character, so token numbers only compare the two modes; run with --live
+    for real token counts and latencies.
+    """
+    if mock:
+        # The client reads these when it is created, after any .env was loaded
+        os.environ["GOOGLE_URL"] = f"http://127.0.0.1:{port}/v1"
+        os.environ["GOOGLE_API_KEY"] = "mock"
+        os.environ["GOOGLE_CHAT_MODEL_ID"] = "mock"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_file = os.path.join(tmp, "corpus.jsonl")
+        build_fixture_corpus(fixture, posts, corpus_file)
+
+        rows = [
+            asyncio.run(
+                run_mode(
+                    corpus_file,
+                    size,
+                    concurrency,
+                    posts,
+                    MockOpenAIServer(latency) if mock else None,
+                    port,
+                )
+            )
+            for size in (1, batch_size)
+        ]
+
+    print()
+    for row in rows:
+        print(
+            f"{row['mode']:>10}  requests={row['requests']:<5} "
+            f"prompt_tokens/post={row['prompt_tokens/post']:.0f}  "
+            f"completion_tokens/post={row['completion_tokens/post']:.0f}  "
+            f"ms/post={row['ms/post']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    cli()
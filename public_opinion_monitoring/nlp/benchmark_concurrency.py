@@ -0,0 +1,191 @@
+import sys
+import os
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import re
+import json
+import time
+import click
+import asyncio
+import tempfile
+
+from nlp.analyze import process_llm_calling
+from nlp.llm_engine import reset_usage_stats, usage_stats
+
+# Valid against models.llm_response.LLMResponse, so structured analysis keeps it
+MOCK_ANALYSIS = {
+    "analysis_result": {
+        "event_triples": [],
+        "sentiment_analysis": {
+            "overall_score": 0,
+            "positive_score": 0,
+            "negative_score": 0,
+            "sentiment_keywords": [],
+            "analysis_details": "mock",
+        },
+        "ad_detection": {
+            "is_ad": False,
+            "ad_type": None,
+            "ad_keywords": None,
+            "reasoning": "mock",
+        },
+    }
+}
+
+# The numbered posts of a batched prompt, see analyze_structured.build_batch_messages
+BATCH_ID_PATTERN = re.compile(r"^\[id: (\d+)\]$", re.MULTILINE)
+
+
+class MockOpenAIServer:
+    """
+    Minimal OpenAI-compatible endpoint on asyncio streams: every request is
+    answered with a chat completion after `latency` seconds, over keep-alive
+    connections. Records the peak number of requests in flight.
+
+    A batched prompt gets one result per numbered post. Usage counts one
+    token per character, so prompt sizes can be compared between modes.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._server = None
+
+    async def start(self, port: int):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", port)
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                content_length = 0
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    if name.strip().lower() == "content-length":
+                        content_length = int(value)
+                request = json.loads(await reader.readexactly(content_length))
+
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                await asyncio.sleep(self.latency)
+                self.in_flight -= 1
+
+                body = json.dumps(self._completion(request)).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _completion(request):
+        prompt = "".join(m.get("content") or "" for m in request.get("messages", []))
+        ids = BATCH_ID_PATTERN.findall(prompt)
+        if ids:
+            content = json.dumps(
+                {"results": [dict(MOCK_ANALYSIS, id=int(i)) for i in ids]}
+            )
+        else:
+            content = json.dumps(MOCK_ANALYSIS)
+
+        return {
+            "id": "mock",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "mock",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": len(prompt),
+                "completion_tokens": len(content),
+                "total_tokens": len(prompt) + len(content),
+            },
+        }
+
+
+def build_corpus(posts: int, output_file: str):
+    with open(output_file, "w", encoding="utf-8") as f:
+        for i in range(posts):
+            data = {"weibo_id": str(i), "text": f"食品安全 测试微博 {i}", "tags": {}}
+            f.write(json.dumps(data, ensure_ascii=False) + "\n")
+
+
+async def run_level(
+    corpus_file: str, port: int, latency: float, concurrency: int, posts: int
+):
+    server = MockOpenAIServer(latency)
+    await server.start(port)
+    reset_usage_stats()
+    try:
+        start = time.perf_counter()
+        await process_llm_calling(
+            corpus_file, corpus_file + ".out", concurrency, resume=False
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        await server.stop()
+
+    return {
+        "concurrency": concurrency,
+        "requests": usage_stats["requests"],
+        "peak_in_flight": server.peak_in_flight,
+        "posts/s": posts / elapsed,
+    }
+
+
+@click.command()
+@click.option("--posts", default=200, help="number of posts per concurrency level")
+@click.option("--latency", default=0.1, help="mock completion latency in seconds")
+@click.option("--levels", default="1,2,4,8,16,32", help="concurrency levels to run")
+@click.option("--port", default=8766, help="port of the mock server")
+def cli(posts: int, latency: float, levels: str, port: int):
+    """
+    Show that analysis throughput scales with --concurrency, by running the
+    same corpus through the engine against a local OpenAI-compatible mock.
+    """
+    # The client reads these when it is created, after any .env was loaded
+    os.environ["GOOGLE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ["GOOGLE_API_KEY"] = "mock"
+    os.environ["GOOGLE_CHAT_MODEL_ID"] = "mock"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_file = os.path.join(tmp, "corpus.jsonl")
+        build_corpus(posts, corpus_file)
+
+        rows = [
+            asyncio.run(run_level(corpus_file, port, latency, int(level), posts))
+            for level in levels.split(",")
+        ]
+
+    print(f"\nmock completion latency {latency * 1000:.0f}ms, {posts} posts")
+    baseline = rows[0]["posts/s"]
+    for row in rows:
+        print(
+            f"concurrency={row['concurrency']:<4} requests={row['requests']:<5} "
+            f"peak_in_flight={row['peak_in_flight']:<4} "
+            f"posts/s={row['posts/s']:7.1f}  speedup={row['posts/s'] / baseline:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,150 @@
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import unicodedata
+from typing import Any, Dict, Optional
+
+# Cached analyses older than this are treated as misses and evicted
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+# Upper bound on stored analyses; the least recently used are evicted first
+DEFAULT_MAX_ENTRIES = 1_000_000
+# Eviction runs once every this many writes instead of on every write
+_EVICT_EVERY = 1000
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Fold full-width characters and collapse whitespace so reposts share a key."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class LLMResultCache:
+    """
+    Persistent, content-addressed cache for LLM analysis results backed by SQLite.
+
+    Keys hash the normalized post text, the tag block, the model id and the
+    prompt template, so changing the prompt or the model never serves stale
+    analyses. Entries expire after `ttl_seconds` and the table is trimmed to
+    `max_entries` in least-recently-used order.
+    """
+
+    def __init__(
+        self,
+        path: str = "llm_cache.sqlite3",
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(
+        text_content: str, tags_content: str, model_id: Optional[str], prompt: str
+    ) -> str:
+        h = hashlib.sha256()
+        for part in (
+            normalize_text(text_content),
+            tags_content,
+            model_id or "",
+            prompt,
+        ):
+            h.update(part.encode("utf-8"))
+            h.update(b"\x00")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None or (
+            self.ttl_seconds is not None and now - row[1] > self.ttl_seconds
+        ):
+            self.misses += 1
+            return None
+
+        self._conn.execute(
+            "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+        )
+        self._conn.commit()
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any]):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), now, now),
+        )
+        self._conn.commit()
+
+        self._writes += 1
+        if self._writes % _EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used ones above `max_entries`."""
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+
+        if self.max_entries is not None:
+            self._conn.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+        self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        (size,) = self._conn.execute("SELECT count(*) FROM llm_cache").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": size,
+        }
+
+    def close(self):
+        self.evict()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,345 @@
+import sys
+import os
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import json
+import random
+import asyncio
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from openai import (
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+)
+import httpx
+from tqdm import tqdm
+
+from nlp.resumable_jsonl import DEFAULT_FSYNC_EVERY, ResumableJsonlWriter
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Default number of LLM requests allowed in flight at the same time
+DEFAULT_CONCURRENCY = 8
+# Retry policy for rate limits (429) and server errors (5xx)
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 30.0
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+AnalyzeFunc = Callable[[str, str], Awaitable[Dict[str, Any]]]
+AnalyzeBatchFunc = Callable[[List[Tuple[str, str]]], Awaitable[List[Dict[str, Any]]]]
+
+_client: Optional[AsyncOpenAI] = None
+
+# Token usage reported by the API, summed over every completion of the process
+usage_stats: Dict[str, int] = {
+    "requests": 0,
+    "prompt_tokens": 0,
+    "completion_tokens": 0,
+}
+
+
+def reset_usage_stats():
+    for k in usage_stats:
+        usage_stats[k] = 0
+
+
+def get_client(pool_size: int = DEFAULT_CONCURRENCY) -> AsyncOpenAI:
+    """
+    Return the process-wide AsyncOpenAI client.
+    The underlying httpx pool keeps `pool_size` keep-alive connections so that
+    concurrent requests reuse TLS sessions instead of reconnecting every call.
+    Retries are handled by `create_completion`, so the SDK's own retry is disabled.
+    """
+    global _client
+
+    if _client is not None:
+        return _client
+
+    _client = AsyncOpenAI(
+        api_key=os.getenv("GOOGLE_API_KEY"),
+        base_url=os.getenv("GOOGLE_URL"),
+        max_retries=0,
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+            ),
+        ),
+    )
+    return _client
+
+
+async def close_client():
+    """Close the shared client and release its connection pool."""
+    global _client
+
+    if _client is not None:
+        await _client.close()
+    _client = None
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in _RETRYABLE_STATUS
+    return False
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Honor Retry-After when the server sends it, otherwise use jittered exponential backoff."""
+    if isinstance(error, APIStatusError):
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), DEFAULT_BACKOFF_MAX)
+            except ValueError:
+                pass
+
+    delay = min(DEFAULT_BACKOFF_BASE * (2**attempt), DEFAULT_BACKOFF_MAX)
+    return delay * (0.5 + random.random() / 2)
+
+
+async def create_completion(
+    messages: list,
+    client: Optional[AsyncOpenAI] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> str:
+    """
+    Send a chat completion request in JSON mode and return the message content.
+    429/5xx responses and connection errors are retried with backoff;
+    any other error is raised to the caller.
+    """
+    client = client or get_client()
+
+    attempt = 0
+    while True:
+        try:
+            completion = await client.chat.completions.create(
+                messages=messages,
+                model=os.getenv("GOOGLE_CHAT_MODEL_ID"),
+                response_format={"type": "json_object"},
+            )
+            usage_stats["requests"] += 1
+            if completion.usage is not None:
+                usage_stats["prompt_tokens"] += completion.usage.prompt_tokens
+                usage_stats["completion_tokens"] += completion.usage.completion_tokens
+            return completion.choices[0].message.content
+        except Exception as e:
+            if attempt >= max_retries or not _is_retryable(e):
+                raise
+            delay = _retry_delay(e, attempt)
+            attempt += 1
+            print(
+                f"LLM request failed ({e}), retry {attempt}/{max_retries} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+
+def build_tags_content(tags: Dict[str, Any]) -> str:
+    """Render the tokenization tags as the auxiliary entity block of the prompt."""
+    tags_content_lines = []
+
+    for k, v in tags.items():
+        tags_content_lines.append(f"{k}: {list(v.keys())}")
+
+    return "\n".join(tags_content_lines)
+
+
+# Set on a record whose LLM call failed, to tell it apart from a post the
+# LLM found nothing in (`analysis_result` null)
+ANALYSIS_ERROR_KEY = "analysis_error"
+
+
+def failed_analysis(error: Exception) -> Dict[str, Any]:
+    return {"analysis_result": None, ANALYSIS_ERROR_KEY: str(error)}
+
+
+def _empty_analysis() -> Dict[str, Any]:
+    return {
+        "analysis_result": {
+            "event_triples": [],
+            "sentiment_analysis": None,
+            "ad_detection": None,
+        }
+    }
+
+
+async def analyze_record(data: Dict[str, Any], analyze: AnalyzeFunc) -> Dict[str, Any]:
+    """
+    Enrich a single tagged record with the LLM analysis result.
+    """
+    text = data.get("text", "")
+    tags = data.get("tags", {})
+
+    if text:
+        # Call LLM for analysis
+        analysis_result = await analyze(text, build_tags_content(tags))
+
+        # Merge the analysis results into the original data
+        if analysis_result:
+            data.update(analysis_result)
+    else:
+        data.update(_empty_analysis())
+
+    return data
+
+
+async def analyze_record_batch(
+    chunk: List[Dict[str, Any]], analyze_batch: AnalyzeBatchFunc
+) -> List[Dict[str, Any]]:
+    """
+    Enrich a chunk of tagged records with a single batched LLM call.
+    """
+    with_text = []
+    for data in chunk:
+        if data.get("text", ""):
+            with_text.append(data)
+        else:
+            data.update(_empty_analysis())
+
+    if with_text:
+        items = [
+            (data["text"], build_tags_content(data.get("tags", {})))
+            for data in with_text
+        ]
+        analysis_results = await analyze_batch(items)
+
+        for data, analysis_result in zip(with_text, analysis_results):
+            if analysis_result:
+                data.update(analysis_result)
+
+    return chunk
+
+
+def _chunked(records: Iterable[Dict[str, Any]], size: int):
+    chunk = []
+    for data in records:
+        chunk.append(data)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def analyze_in_order(
+    records: Iterable[Dict[str, Any]],
+    analyze: AnalyzeFunc,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    analyze_batch: Optional[AnalyzeBatchFunc] = None,
+    batch_size: int = 1,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Analyze records concurrently and yield them in input order.
+
+    At most `concurrency` requests are in flight. Finished results wait in a
+    bounded window until every earlier record is done, so a slow request only
+    stalls the output, not the other workers.
+    When `analyze_batch` is given, records are packed `batch_size` at a time
+    into one request each.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    window: deque = deque()
+    max_window = concurrency * 4
+
+    async def worker(chunk):
+        async with semaphore:
+            if analyze_batch is not None:
+                return await analyze_record_batch(chunk, analyze_batch)
+            return [await analyze_record(data, analyze) for data in chunk]
+
+    if analyze_batch is None:
+        batch_size = 1
+
+    try:
+        for chunk in _chunked(records, batch_size):
+            window.append(asyncio.create_task(worker(chunk)))
+            if len(window) >= max_window:
+                for data in await window.popleft():
+                    yield data
+
+        while window:
+            for data in await window.popleft():
+                yield data
+    finally:
+        for task in window:
+            task.cancel()
+
+
+def read_jsonl(input_file: str) -> Iterable[Dict[str, Any]]:
+    with open(input_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+async def run_analysis(
+    input_file: str,
+    output_file: str,
+    analyze: AnalyzeFunc,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    resume: bool = True,
+    fsync_every: int = DEFAULT_FSYNC_EVERY,
+    analyze_batch: Optional[AnalyzeBatchFunc] = None,
+    batch_size: int = 1,
+):
+    """
+    Streams a JSONL file through the LLM concurrently and appends each result
+    to the output file in input order as soon as it is ready.
+    Records already listed in the output's checkpoint are skipped, so rerunning
+    an interrupted job only pays for the remaining records. Records whose
+    analysis failed are left out of the output and retried on the next run.
+    With `analyze_batch`, `batch_size` records share one request.
+    """
+    if not os.path.exists(input_file):
+        print(f"Error: File '{input_file}' not found.")
+        return
+
+    get_client(concurrency)
+
+    failed = 0
+    try:
+        with (
+            ResumableJsonlWriter(output_file, resume, fsync_every) as writer,
+            tqdm(desc="Processing JSONL") as progress,
+        ):
+            async for data in analyze_in_order(
+                writer.skip_done(read_jsonl(input_file)),
+                analyze,
+                concurrency,
+                analyze_batch,
+                batch_size,
+            ):
+                if ANALYSIS_ERROR_KEY in data:
+                    writer.drop(data)
+                    failed += 1
+                else:
+                    writer.write(data)
+                progress.update(1)
+    finally:
+        await close_client()
+
+    print(f"Processing completed! The results have been saved to '{output_file}'.")
+    if failed:
+        print(f"{failed} records failed and were not saved; run again to retry them.")
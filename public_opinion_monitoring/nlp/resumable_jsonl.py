@@ -0,0 +1,235 @@
+import os
+import json
+import sqlite3
+import hashlib
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+# Number of records written between two fsync calls
+DEFAULT_FSYNC_EVERY = 100
+
+
+def checkpoint_path(output_file: str) -> str:
+    """The sidecar file that lists the records already written to `output_file`."""
+    return output_file + ".done"
+
+
+def key_index_path(checkpoint_file: str) -> str:
+    """The sidecar SQLite file that indexes the keys of `checkpoint_file`."""
+    return checkpoint_file + ".sqlite3"
+
+
+def record_key(data: Dict[str, Any]) -> str:
+    """The weibo_id of an input record, or a hash of its content without one."""
+    weibo_id = data.get("weibo_id")
+    if weibo_id:
+        return str(weibo_id)
+    content = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    return "sha256:" + hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _count_lines_up_to(path: str, max_lines: int) -> int:
+    """Return the byte offset just after the first `max_lines` lines of `path`."""
+    offset = 0
+    lines = 0
+    with open(path, "rb") as f:
+        while lines < max_lines:
+            line = f.readline()
+            if not line or not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            lines += 1
+    return offset
+
+
+class DoneKeyIndex:
+    """
+    On-disk set of the keys listed in a checkpoint file, so that resuming a
+    large corpus does not hold every processed key in memory.
+
+    Like spider/id_index.py, the index remembers how many bytes of the
+    checkpoint it has covered and only reads the lines appended since then
+    (all of them if the checkpoint was truncated or replaced).
+    """
+
+    def __init__(self, checkpoint_file: str, path: Optional[str] = None):
+        self.checkpoint_file = checkpoint_file
+        self.path = path or key_index_path(checkpoint_file)
+
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS done_keys (key TEXT PRIMARY KEY) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        self.catch_up()
+
+    def _get_offset(self) -> int:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'indexed_offset'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def catch_up(self):
+        """Index the checkpoint lines written since the last call."""
+        if not os.path.exists(self.checkpoint_file):
+            size = 0
+        else:
+            size = os.path.getsize(self.checkpoint_file)
+
+        offset = self._get_offset()
+        if size < offset:
+            # The checkpoint was truncated or started over; rebuild
+            self._conn.execute("DELETE FROM done_keys")
+            offset = 0
+
+        if size > offset:
+            keys = []
+            with open(self.checkpoint_file, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    keys.append((line[:-1].decode("utf-8"),))
+
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO done_keys (key) VALUES (?)", keys
+            )
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('indexed_offset', ?)",
+            (offset,),
+        )
+        self._conn.commit()
+
+    def __contains__(self, key: str) -> bool:
+        return (
+            self._conn.execute(
+                "SELECT 1 FROM done_keys WHERE key = ?", (key,)
+            ).fetchone()
+            is not None
+        )
+
+    def close(self):
+        self._conn.close()
+
+
+class ResumableJsonlWriter:
+    """
+    Append-only JSONL writer with a sidecar checkpoint of completed records,
+    keyed by `record_key`.
+
+    Records are appended as soon as they are written and fsynced in batches of
+    `fsync_every`. The checkpoint is only extended after the matching output
+    batch is durable, so line N of the checkpoint always describes line N of
+    the output. On resume, output lines written after the last checkpointed
+    batch (a crash between the two fsyncs) are truncated away, and every
+    checkpointed key can be skipped without re-reading the output.
+
+    Checkpointed keys are looked up in a `DoneKeyIndex` next to the
+    checkpoint rather than held in memory.
+
+    Keys are taken from the input records in `skip_done`, before they are
+    enriched, and handed to `write`/`drop` in the same order, so results
+    must be written in input order.
+    """
+
+    def __init__(
+        self,
+        output_file: str,
+        resume: bool = True,
+        fsync_every: int = DEFAULT_FSYNC_EVERY,
+    ):
+        self.output_file = output_file
+        self.checkpoint_file = checkpoint_path(output_file)
+        self.fsync_every = max(1, fsync_every)
+        self._pending_keys: List[str] = []
+        # Keys of the records yielded by skip_done and not written yet
+        self._keys: Deque[str] = deque()
+
+        if resume and os.path.exists(self.checkpoint_file):
+            self._recover()
+        else:
+            # Fresh run: start both files from scratch
+            open(self.output_file, "w", encoding="utf-8").close()
+            open(self.checkpoint_file, "w", encoding="utf-8").close()
+
+        self.done_keys = DoneKeyIndex(self.checkpoint_file)
+        self._out = open(self.output_file, "a", encoding="utf-8")
+        self._checkpoint = open(self.checkpoint_file, "a", encoding="utf-8")
+
+    def _recover(self):
+        checkpointed = 0
+        with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                checkpointed += 1
+
+        # Drop a partially written checkpoint line as well
+        with open(self.checkpoint_file, "r+b") as f:
+            f.truncate(_count_lines_up_to(self.checkpoint_file, checkpointed))
+
+        if os.path.exists(self.output_file):
+            offset = _count_lines_up_to(self.output_file, checkpointed)
+            with open(self.output_file, "r+b") as f:
+                f.truncate(offset)
+
+        print(
+            f"Resuming '{self.output_file}': {checkpointed} records already processed."
+        )
+
+    def is_done(self, data: Dict[str, Any]) -> bool:
+        return record_key(data) in self.done_keys
+
+    def skip_done(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Filter out the records whose key is already in the checkpoint."""
+        for data in records:
+            key = record_key(data)
+            if key not in self.done_keys:
+                self._keys.append(key)
+                yield data
+
+    def _next_key(self, data: Dict[str, Any]) -> str:
+        return self._keys.popleft() if self._keys else record_key(data)
+
+    def write(self, data: Dict[str, Any]):
+        self._out.write(json.dumps(data, ensure_ascii=False) + "\n")
+        self._pending_keys.append(self._next_key(data))
+        if len(self._pending_keys) >= self.fsync_every:
+            self.flush()
+
+    def drop(self, data: Dict[str, Any]):
+        """Leave a record out of this run, so a resumed run processes it again."""
+        self._next_key(data)
+
+    def flush(self):
+        """Make the pending output durable, then record it in the checkpoint."""
+        if not self._pending_keys:
+            return
+
+        self._out.flush()
+        os.fsync(self._out.fileno())
+
+        self._checkpoint.write("".join(f"{k}\n" for k in self._pending_keys))
+        self._checkpoint.flush()
+        os.fsync(self._checkpoint.fileno())
+
+        self.done_keys.catch_up()
+        self._pending_keys = []
+
+    def close(self):
+        self.flush()
+        self._out.close()
+        self._checkpoint.close()
+        self.done_keys.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
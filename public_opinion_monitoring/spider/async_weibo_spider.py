@@ -0,0 +1,217 @@
+import sys
+import os
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import time
+import random
+import asyncio
+import urllib.parse
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from spider.weibo_spider import headers, strip_html, needs_full_text, build_result
+from spider.id_index import WeiboIdIndex
+
+BASE_URL = "https://m.weibo.cn/api/container/getIndex"
+SHOW_URL = "https://m.weibo.cn/statuses/show"
+
+# Politeness budget: sustained requests per second and the allowed burst
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 4
+# Upper bound on open connections to m.weibo.cn
+DEFAULT_MAX_CONNECTIONS = 8
+DEFAULT_MAX_RETRIES = 4
+
+# Weibo answers 418 when it decides the client is a crawler
+_RETRYABLE_STATUS = {418, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter shared by every request of a crawl.
+    Tokens refill at `rate` per second up to `burst`; each request takes one.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def build_client(
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """A keep-alive client shared by all page and full-text requests of a crawl."""
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=httpx.Timeout(10.0),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+        transport=transport,
+    )
+
+
+async def fetch_json(
+    client: httpx.AsyncClient,
+    limiter: TokenBucket,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> Optional[Dict[str, Any]]:
+    """
+    GET a JSON document within the rate budget.
+    418/429/5xx responses and transport errors are retried with jittered
+    exponential backoff; returns None once the retries are exhausted.
+    """
+    for attempt in range(max_retries + 1):
+        await limiter.acquire()
+        try:
+            resp = await client.get(url, params=params)
+            if resp.status_code == 200:
+                return resp.json()
+            if resp.status_code not in _RETRYABLE_STATUS:
+                print(f"Request failed: {resp.status_code} {url}")
+                return None
+            error = f"status {resp.status_code}"
+        except (httpx.TransportError, ValueError) as e:
+            error = str(e)
+
+        if attempt < max_retries:
+            delay = min(2**attempt, 30) * (0.5 + random.random() / 2)
+            print(f"Request to {url} failed ({error}), retry in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    print(f"Giving up on {url} after {max_retries + 1} attempts")
+    return None
+
+
+async def get_full_text_and_region_async(
+    client: httpx.AsyncClient, limiter: TokenBucket, mid: str
+) -> Tuple[Optional[str], Optional[str]]:
+    body = await fetch_json(client, limiter, SHOW_URL, {"id": mid})
+    if body is None:
+        return None, None
+
+    data = body.get("data", {})
+    return strip_html(data.get("text", "")), data.get("region_name", None)
+
+
+async def _fetch_page(
+    client: httpx.AsyncClient, limiter: TokenBucket, keyword: str, page: int
+) -> Optional[List[Dict[str, Any]]]:
+    encoded_keyword = urllib.parse.quote(keyword)
+    params = {
+        "containerid": f"100103type=1&q={encoded_keyword}",
+        "page_type": "searchall",
+        "page": page,
+    }
+    data = await fetch_json(client, limiter, BASE_URL, params)
+    if data is None:
+        return None
+
+    cards = data.get("data", {}).get("cards", [])
+    return [card.get("mblog", {}) for card in cards if card.get("card_type") == 9]
+
+
+async def search_weibo_async(
+    keyword: str,
+    client: httpx.AsyncClient,
+    limiter: TokenBucket,
+    max_pages: int = 3,
+    known_ids=None,
+) -> List[Dict[str, Any]]:
+    """
+    Async counterpart of `search_weibo`: all result pages are requested
+    concurrently, then the long posts' full texts, all within the shared
+    rate budget. Results keep page order; pages after the first failed one
+    are dropped, as in the sequential spider.
+    Posts whose weibo_id is in `known_ids` (a set or a WeiboIdIndex) are
+    skipped before their full text is downloaded.
+    """
+    pages = await asyncio.gather(
+        *(_fetch_page(client, limiter, keyword, p) for p in range(1, max_pages + 1))
+    )
+
+    mblogs = []
+    for page in pages:
+        if page is None:
+            break
+        mblogs.extend(page)
+
+    if known_ids is not None:
+        mblogs = [m for m in mblogs if m.get("mid", "") not in known_ids]
+
+    async def resolve(mblog):
+        full_text, region_name = (None, None)
+        if needs_full_text(mblog):
+            full_text, region_name = await get_full_text_and_region_async(
+                client, limiter, mblog.get("mid", "")
+            )
+        return build_result(mblog, full_text, region_name)
+
+    return list(await asyncio.gather(*(resolve(m) for m in mblogs)))
+
+
+async def search_keywords(
+    keywords: List[str],
+    max_pages: int = 3,
+    rate: float = DEFAULT_RATE,
+    burst: int = DEFAULT_BURST,
+    known_ids=None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Crawl several keywords at once over one keep-alive client and one rate
+    limiter. Posts found under more than one keyword are returned once.
+    """
+    limiter = TokenBucket(rate, burst)
+    async with build_client(transport=transport) as client:
+        per_keyword = await asyncio.gather(
+            *(
+                search_weibo_async(k, client, limiter, max_pages, known_ids)
+                for k in keywords
+            )
+        )
+
+    seen = set()
+    results = []
+    for items in per_keyword:
+        for item in items:
+            if item["weibo_id"] not in seen:
+                seen.add(item["weibo_id"])
+                results.append(item)
+    return results
+
+
+if __name__ == "__main__":
+    from spider.weibo_spider import save_data_as_jsonl
+
+    filename = "1.weibo_foodsafety.jsonl"
+    with WeiboIdIndex(filename) as known_ids:
+        data = asyncio.run(
+            search_keywords(["食品安全"], max_pages=5, known_ids=known_ids)
+        )
+    save_data_as_jsonl(data, filename=filename)
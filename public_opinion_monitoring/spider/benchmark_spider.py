@@ -0,0 +1,84 @@
+import sys
+import os
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import time
+import click
+import asyncio
+import httpx
+
+from spider.async_weibo_spider import (
+    DEFAULT_BURST,
+    DEFAULT_RATE,
+    search_keywords,
+)
+
+
+def stub_transport(latency: float, cards_per_page: int = 10) -> httpx.MockTransport:
+    """
+    In-process stand-in for m.weibo.cn. Every response takes `latency` seconds
+    and every other post on a page is a long post that needs a full-text fetch.
+    """
+    stats = {"pages": 0, "requests": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        stats["requests"] += 1
+
+        if request.url.path.endswith("/statuses/show"):
+            mid = request.url.params["id"]
+            return httpx.Response(
+                200, json={"data": {"text": f"full text {mid}", "region_name": "x"}}
+            )
+
+        stats["pages"] += 1
+        query = request.url.params["containerid"]
+        page = request.url.params["page"]
+        cards = [
+            {
+                "card_type": 9,
+                "mblog": {
+                    "mid": f"{query}-{page}-{i}",
+                    "text": f"post {i}",
+                    "isLongText": i % 2 == 0,
+                    "user": {"screen_name": "u", "id": 1},
+                },
+            }
+            for i in range(cards_per_page)
+        ]
+        return httpx.Response(200, json={"data": {"cards": cards}})
+
+    transport = httpx.MockTransport(handler)
+    transport.stats = stats
+    return transport
+
+
+@click.command()
+@click.option("--keywords", default="食品安全,农残,添加剂", help="comma separated")
+@click.option("--pages", default=5, help="pages per keyword")
+@click.option("--rate", default=DEFAULT_RATE, help="requests per second budget")
+@click.option("--burst", default=DEFAULT_BURST, help="token bucket burst")
+@click.option("--latency", default=0.3, help="stub response latency in seconds")
+def cli(keywords: str, pages: int, rate: float, burst: int, latency: float):
+    """Measure crawl throughput against the stub at a fixed politeness budget."""
+    transport = stub_transport(latency)
+
+    start = time.perf_counter()
+    results = asyncio.run(
+        search_keywords(keywords.split(","), pages, rate, burst, transport=transport)
+    )
+    elapsed = time.perf_counter() - start
+
+    stats = transport.stats
+    print(
+        f"budget={rate}/s burst={burst} latency={latency}s: "
+        f"{stats['pages']} pages, {stats['requests']} requests, {len(results)} posts "
+        f"in {elapsed:.2f}s -> {stats['pages'] / elapsed:.2f} pages/s, "
+        f"{stats['requests'] / elapsed:.2f} req/s"
+    )
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,126 @@
+import os
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+
+def index_path(jsonl_path: str) -> str:
+    """The sidecar SQLite file that indexes the weibo_ids of `jsonl_path`."""
+    return jsonl_path + ".ids.sqlite3"
+
+
+class WeiboIdIndex:
+    """
+    Persistent weibo_id index for an append-only spider archive.
+
+    The index remembers how many bytes of the JSONL it has already covered.
+    When opened it only parses lines appended since then (all of them the
+    first time, or if the archive was replaced), so dedup costs O(new items)
+    no matter how large the archive grows.
+    """
+
+    def __init__(self, jsonl_path: str, path: Optional[str] = None):
+        self.jsonl_path = jsonl_path
+        self.path = path or index_path(jsonl_path)
+
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS weibo_ids (weibo_id TEXT PRIMARY KEY) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        self._catch_up()
+
+    def _get_offset(self) -> int:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'indexed_offset'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _set_offset(self, offset: int):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('indexed_offset', ?)",
+            (offset,),
+        )
+
+    def _catch_up(self):
+        """Index the lines appended to the archive by anything other than `append`."""
+        if not os.path.exists(self.jsonl_path):
+            size = 0
+        else:
+            size = os.path.getsize(self.jsonl_path)
+
+        offset = self._get_offset()
+        if size < offset:
+            # The archive was truncated or replaced; rebuild from scratch
+            self._conn.execute("DELETE FROM weibo_ids")
+            offset = 0
+
+        if size > offset:
+            ids = []
+            with open(self.jsonl_path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Leave a partially written last line for the next run
+                        break
+                    offset += len(line)
+                    try:
+                        weibo_id = json.loads(line).get("weibo_id")
+                    except ValueError:
+                        continue
+                    if weibo_id:
+                        ids.append((str(weibo_id),))
+
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO weibo_ids (weibo_id) VALUES (?)", ids
+            )
+
+        self._set_offset(offset)
+        self._conn.commit()
+
+    def __contains__(self, weibo_id) -> bool:
+        return (
+            self._conn.execute(
+                "SELECT 1 FROM weibo_ids WHERE weibo_id = ?", (str(weibo_id),)
+            ).fetchone()
+            is not None
+        )
+
+    def append(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Append the entries whose weibo_id is not archived yet and index them.
+        Returns the entries that were written.
+        """
+        new_entries = []
+        seen = set()
+        for entry in entries:
+            weibo_id = str(entry["weibo_id"])
+            if weibo_id in seen or weibo_id in self:
+                continue
+            seen.add(weibo_id)
+            new_entries.append(entry)
+
+        if not new_entries:
+            return new_entries
+
+        with open(self.jsonl_path, "a", encoding="utf-8") as f:
+            for entry in new_entries:
+                json_line = json.dumps(entry, ensure_ascii=False)
+                f.write(json_line + "\n")
+
+        # Anything appended concurrently is picked up here as well
+        self._catch_up()
+        return new_entries
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
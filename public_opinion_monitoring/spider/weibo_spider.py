@@ -1,8 +1,13 @@
 import requests
 import time
-import json
 import urllib.parse
 import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from spider.id_index import WeiboIdIndex
 
 headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
@@ -31,7 +36,37 @@ def get_full_text_and_region(mid):
     return None, None
 
 
-def search_weibo(keyword, max_pages=3):
+def needs_full_text(mblog):
+    """The search API truncates long posts; their full text needs a second request."""
+    return mblog.get("isLongText", False) or "...全文" in strip_html(
+        mblog.get("text", "")
+    )
+
+
+def build_result(mblog, full_text=None, region_name=None):
+    user = mblog.get("user", {})
+    mid = mblog.get("mid", "")
+    short_text = strip_html(mblog.get("text", ""))
+
+    return {
+        "weibo_id": mid,
+        "weibo_url": f"https://m.weibo.cn/detail/{mid}",
+        "text": full_text or short_text,
+        "created_at": mblog.get("created_at", ""),
+        "user": user.get("screen_name", ""),
+        "user_id": user.get("id", ""),
+        "attitudes_count": mblog.get("attitudes_count", 0),
+        "comments_count": mblog.get("comments_count", 0),
+        "reposts_count": mblog.get("reposts_count", 0),
+        "region_name": region_name,  # 可为 None
+    }
+
+
+def search_weibo(keyword, max_pages=3, known_ids=None):
+    """
+    Posts whose weibo_id is in `known_ids` (a set or a WeiboIdIndex) are skipped
+    before their full text is downloaded.
+    """
     encoded_keyword = urllib.parse.quote(keyword)
     containerid = f"100103type=1&q={encoded_keyword}"
     base_url = "https://m.weibo.cn/api/container/getIndex"
@@ -51,59 +86,27 @@ def search_weibo(keyword, max_pages=3):
         for card in cards:
             if card.get("card_type") == 9:
                 mblog = card.get("mblog", {})
-                user = mblog.get("user", {})
-                mid = mblog.get("mid", "")
-                short_text = strip_html(mblog.get("text", ""))
-                is_long = mblog.get("isLongText", False)
+                if known_ids is not None and mblog.get("mid", "") in known_ids:
+                    continue
 
                 full_text, region_name = (None, None)
-                if is_long or "...全文" in short_text:
-                    full_text, region_name = get_full_text_and_region(mid)
+                if needs_full_text(mblog):
+                    full_text, region_name = get_full_text_and_region(
+                        mblog.get("mid", "")
+                    )
                     time.sleep(0.5)
 
-                result = {
-                    "weibo_id": mid,
-                    "weibo_url": f"https://m.weibo.cn/detail/{mid}",
-                    "text": full_text or short_text,
-                    "created_at": mblog.get("created_at", ""),
-                    "user": user.get("screen_name", ""),
-                    "user_id": user.get("id", ""),
-                    "attitudes_count": mblog.get("attitudes_count", 0),
-                    "comments_count": mblog.get("comments_count", 0),
-                    "reposts_count": mblog.get("reposts_count", 0),
-                    "region_name": region_name,  # 可为 None
-                }
-
-                results.append(result)
+                results.append(build_result(mblog, full_text, region_name))
 
         time.sleep(1)
 
     return results
 
 
-def load_existing_ids(filepath):
-    if not os.path.exists(filepath):
-        return set()
-
-    ids = set()
-    with open(filepath, "r", encoding="utf-8") as f:
-        for line in f:
-            try:
-                item = json.loads(line.strip())
-                ids.add(item.get("weibo_id"))
-            except:
-                continue
-    return ids
-
-
 def save_data_as_jsonl(data, filename="1.weibo_foodsafety.jsonl"):
-    existing_ids = load_existing_ids(filename)
-    new_entries = [entry for entry in data if entry["weibo_id"] not in existing_ids]
-
-    with open(filename, "a", encoding="utf-8") as f:
-        for entry in new_entries:
-            json_line = json.dumps(entry, ensure_ascii=False)
-            f.write(json_line + "\n")
+    # The sidecar id index only parses lines appended since the last run
+    with WeiboIdIndex(filename) as index:
+        new_entries = index.append(data)
 
     print(
         f"Found {len(data)} total, {len(new_entries)} new entries saved to {filename}"
@@ -0,0 +1,103 @@
+from collections import deque
+from typing import Dict, Iterator, List, Tuple
+
+
+class TermMatcher:
+    """
+    Aho-Corasick automaton over the domain dictionary.
+
+    The automaton is compiled once; `find_all` then reports every dictionary
+    term in a text, overlapping ones included, in a single left-to-right pass
+    whose cost depends on the text length and the number of matches, not on
+    the dictionary size or on how the text happens to be segmented.
+    """
+
+    def __init__(self, domain_dict: Dict[str, str]):
+        self.domain_dict = domain_dict
+        # goto[state] maps a character to the next state
+        self._goto: List[Dict[str, int]] = [{}]
+        # Longest proper suffix of the state that is also a trie state
+        self._fail: List[int] = [0]
+        # Term ending exactly at the state, if any
+        self._term: List[str] = [""]
+        # Nearest suffix state (via fail links) that ends a term
+        self._dict_link: List[int] = [0]
+
+        for term in domain_dict:
+            if term:
+                self._add(term)
+        self._build()
+
+    def _add(self, term: str):
+        state = 0
+        for ch in term:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._term.append("")
+                self._dict_link.append(0)
+            state = nxt
+        self._term[state] = term
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+
+                self._fail[nxt] = fail
+                self._dict_link[nxt] = (
+                    fail if self._term[fail] else self._dict_link[fail]
+                )
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (start offset, term) for every dictionary term occurring in `text`."""
+        goto, fail, terms, dict_link = (
+            self._goto,
+            self._fail,
+            self._term,
+            self._dict_link,
+        )
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            out = state if terms[state] else dict_link[state]
+            while out:
+                term = terms[out]
+                yield i - len(term) + 1, term
+                out = dict_link[out]
+
+    def tag(
+        self, text: str, count_mode: bool = False
+    ) -> Tuple[Dict[str, dict], Dict[str, List[int]]]:
+        """
+        Classify the dictionary terms found in `text`.
+        Returns the category mapping ({category: {term: count}} in count
+        mode, {category: [term, ...]} otherwise) together with the start
+        offsets of every term.
+        """
+        offsets: Dict[str, List[int]] = {}
+        for start, term in self.find_all(text):
+            offsets.setdefault(term, []).append(start)
+
+        tag_result: Dict[str, dict] = {}
+        for term, starts in offsets.items():
+            category = self.domain_dict[term]
+            if count_mode:
+                tag_result.setdefault(category, {})[term] = len(starts)
+            else:
+                tag_result.setdefault(category, []).append(term)
+
+        return tag_result, offsets
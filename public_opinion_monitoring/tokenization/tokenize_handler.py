@@ -1,12 +1,35 @@
+import sys
+import os
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
 import json
 import jieba
 import jieba.posseg as pseg
 import spacy
-from collections import defaultdict, Counter
-from typing import List, Dict, Tuple
+from multiprocessing import Pool
+from collections import defaultdict
+from typing import Iterable, List, Dict, Optional, Tuple
+
+from tokenization.term_matcher import TermMatcher
+
+# Records handed to a worker process at a time
+DEFAULT_CHUNK_SIZE = 256
+# Texts per spaCy nlp.pipe batch
+DEFAULT_SPACY_BATCH_SIZE = 64
+
+# The spaCy model is loaded once per process, on first use
+_spacy_nlp: Optional[spacy.Language] = None
+# Segmenter owned by a worker process of the parallel mode
+_worker_segmenter: Optional["CustomSegmenter"] = None
 
-# Load the spaCy model globally
-spacyNlp = spacy.load("zh_core_web_sm")
+
+def get_spacy_nlp() -> spacy.Language:
+    global _spacy_nlp
+    if _spacy_nlp is None:
+        _spacy_nlp = spacy.load("zh_core_web_sm")
+    return _spacy_nlp
 
 
 class CustomSegmenter:
@@ -20,6 +43,8 @@ class CustomSegmenter:
         self.dict_path = dict_path
         self.domain_dict = self.load_dict(dict_path)
         self.phrase_set = set(self.domain_dict.keys())
+        # Compiled once so every post is tagged in one pass over its raw text
+        self.matcher = TermMatcher(self.domain_dict)
 
         if engine == "jieba":
             self.init_jieba()
@@ -49,10 +74,6 @@ class CustomSegmenter:
         # After adding the dictionary, you need to reload the jieba word segmenter
         jieba.load_userdict(self.dict_path)
 
-    def segment(self, text: str) -> List[str]:
-        """Use jieba for word segmentation."""
-        return list(jieba.cut(text))
-
     def posseg(self, text: str) -> List[Tuple[str, str]]:
         """Use jieba for part-of-speech tagging."""
         return [(word, flag) for word, flag in pseg.cut(text)]
@@ -62,7 +83,13 @@ def spacy_process(text: str) -> Dict[str, any]:
     """
     Use spaCy's complete NLP pipeline to perform tokenization, part-of-speech tagging, and entity recognition in one go.
     """
-    doc = spacyNlp(text)
+    return spacy_doc_results(get_spacy_nlp()(text))
+
+
+def spacy_doc_results(doc) -> Dict[str, any]:
+    """
+    Extract tokens, entities and event triples from an already processed spaCy Doc.
+    """
     event_triples = get_event_triples(doc)
     # Get tokenization and part-of-speech tags
     tokens_and_pos = [(token.text, token.pos_) for token in doc]
@@ -78,27 +105,6 @@ def spacy_process(text: str) -> Dict[str, any]:
     }
 
 
-def tag_custom_units(
-    words: List[str], domain_dict: Dict[str, str], count_mode: bool = False
-) -> Dict[str, dict]:
-    """
-    Specially designed to process words in custom dictionaries and perform classification and counting.
-    """
-    tag_result = defaultdict(Counter if count_mode else list)
-    for w in words:
-        if w in domain_dict:
-            category = domain_dict[w]
-            if count_mode:
-                tag_result[category][w] += 1
-            else:
-                if w not in tag_result[category]:
-                    tag_result[category].append(w)
-    if count_mode:
-        return {k: dict(v) for k, v in tag_result.items()}
-    else:
-        return dict(tag_result)
-
-
 def get_event_triples(doc):
     event_triples = []
     for token in doc:
@@ -132,44 +138,114 @@ def get_event_triples(doc):
     return event_triples
 
 
+def tokenize_records(
+    records: List[dict],
+    segmenter: CustomSegmenter,
+    count_mode: bool = False,
+    batch_size: int = DEFAULT_SPACY_BATCH_SIZE,
+) -> List[dict]:
+    """
+    Tokenize and tag a batch of records. spaCy runs through nlp.pipe, and the
+    jieba tokens are taken from the part-of-speech pass instead of segmenting
+    the same text a second time.
+    """
+    texts = [data.get("text", "") for data in records]
+    docs = get_spacy_nlp().pipe(texts, batch_size=batch_size)
+
+    for data, text, doc in zip(records, texts, docs):
+        # 1. Use Jieba for word segmentation and part-of-speech tagging, focusing on custom lexicons
+        jieba_pos_tags = segmenter.posseg(text)
+        jieba_tokens = [word for word, _ in jieba_pos_tags]
+
+        # 2. Use spaCy for general tasks and retrieve common entities
+        spacy_results = spacy_doc_results(doc)
+
+        # 3. Match the custom lexicon against the raw text, independent of segmentation
+        custom_tags, tag_offsets = segmenter.matcher.tag(text, count_mode)
+
+        # 4. Combine all results into the output data
+        data["jieba_tokens"] = jieba_tokens
+        data["jieba_pos_tags"] = jieba_pos_tags
+        data["tags"] = custom_tags
+        data["tag_offsets"] = tag_offsets
+        data["spacy_pos_tags"] = spacy_results["tokens_and_pos"]
+        data["spacy_entities"] = spacy_results["spacy_entities"]
+        data["raw_event_triples"] = spacy_results["event_triples"]
+
+    return records
+
+
+def _init_worker(dict_path: str, engine: str):
+    """Load the custom dictionary and the spaCy model once per worker process."""
+    global _worker_segmenter
+    _worker_segmenter = CustomSegmenter(dict_path, engine=engine)
+    get_spacy_nlp()
+
+
+def _tokenize_lines(args: Tuple[List[str], bool, int]) -> List[str]:
+    lines, count_mode, batch_size = args
+    records = [json.loads(line) for line in lines]
+    records = tokenize_records(records, _worker_segmenter, count_mode, batch_size)
+    return [json.dumps(data, ensure_ascii=False) + "\n" for data in records]
+
+
+def _read_chunks(fr, chunk_size: int) -> Iterable[List[str]]:
+    lines = []
+    for line in fr:
+        if not line.strip():
+            continue
+        lines.append(line)
+        if len(lines) >= chunk_size:
+            yield lines
+            lines = []
+    if lines:
+        yield lines
+
+
 def process_text_tokenization(
     input_path: str,
     output_path: str,
     segmenter: CustomSegmenter,
     count_mode: bool = False,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    batch_size: int = DEFAULT_SPACY_BATCH_SIZE,
 ):
     """
     Process JSONL files according to the new logic.
+    With `workers` > 1 (0 means one per CPU core) the input is sharded into
+    chunks across a process pool; each worker loads the dictionary and the
+    spaCy model once, and the chunks are written back in input order.
     """
-    domain_dict = segmenter.domain_dict
+    if workers == 0:
+        workers = os.cpu_count() or 1
 
     with (
         open(input_path, "r", encoding="utf-8") as fr,
         open(output_path, "w", encoding="utf-8") as fw,
     ):
-        for line in fr:
-            data = json.loads(line)
-            text = data.get("text", "")
-
-            # 1. Use Jieba for word segmentation and part-of-speech tagging, focusing on custom lexicons
-            jieba_tokens = segmenter.segment(text)
-            jieba_pos_tags = segmenter.posseg(text)
-
-            # 2. Use spaCy for general tasks and retrieve common entities
-            spacy_results = spacy_process(text)
-
-            # 3. Use Jieba's word segmentation results to specifically process custom lexicons
-            custom_tags = tag_custom_units(jieba_tokens, domain_dict, count_mode)
-
-            # 4. Combine all results into the output data
-            data["jieba_tokens"] = jieba_tokens
-            data["jieba_pos_tags"] = jieba_pos_tags
-            data["tags"] = custom_tags
-            data["spacy_pos_tags"] = spacy_results["tokens_and_pos"]
-            data["spacy_entities"] = spacy_results["spacy_entities"]
-            data["raw_event_triples"] = spacy_results["event_triples"]
-
-            fw.write(json.dumps(data, ensure_ascii=False) + "\n")
+        chunks = _read_chunks(fr, chunk_size)
+
+        if workers <= 1:
+            for lines in chunks:
+                records = [json.loads(line) for line in lines]
+                for data in tokenize_records(
+                    records, segmenter, count_mode, batch_size
+                ):
+                    fw.write(json.dumps(data, ensure_ascii=False) + "\n")
+            return
+
+        with Pool(
+            workers,
+            initializer=_init_worker,
+            initargs=(segmenter.dict_path, segmenter.engine),
+        ) as pool:
+            # imap keeps the output in input order while workers run ahead
+            for out_lines in pool.imap(
+                _tokenize_lines,
+                ((lines, count_mode, batch_size) for lines in chunks),
+            ):
+                fw.writelines(out_lines)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,192 @@
+import sys
+import os
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import time
+import click
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from vector.index_backend import (
+    DEFAULT_EF_CONSTRUCTION,
+    DEFAULT_HNSW_M,
+    FaissHnswBackend,
+)
+
+
+def synthetic_corpus(count: int, dim: int, seed: int = 0):
+    """
+    Clustered, normalized vectors (posts about the same event sit close
+    together) with long-tailed like/comment counts.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(count // 200, 1), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)]
+    vectors += 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    records = [
+        {
+            "weibo_id": f"bench-{i}",
+            "attitudes_count": int(a),
+            "comments_count": int(c),
+        }
+        for i, (a, c) in enumerate(
+            zip(rng.zipf(1.8, count) - 1, rng.zipf(2.2, count) - 1)
+        )
+    ]
+    return vectors, records
+
+
+def exact_top_k(
+    vectors: np.ndarray, queries: np.ndarray, k: int, mask: Optional[np.ndarray]
+) -> List[set]:
+    scores = queries @ vectors.T
+    if mask is not None:
+        scores[:, ~mask] = -np.inf
+    top = np.argsort(-scores, axis=1)[:, :k]
+    return [set(row[np.isfinite(scores[i, row])]) for i, row in enumerate(top)]
+
+
+def measure(search, queries: np.ndarray, truth: List[set], k: int) -> Dict[str, float]:
+    latencies = []
+    hits = 0
+    expected = 0
+    for query, relevant in zip(queries, truth):
+        start = time.perf_counter()
+        found = search(query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(relevant & set(found))
+        expected += len(relevant)
+
+    return {
+        "recall": hits / max(expected, 1),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+def report(name: str, row: Dict[str, float]):
+    print(
+        f"{name:<28} recall@k={row['recall']:.3f}  "
+        f"p50={row['p50_ms']:.3f}ms  p99={row['p99_ms']:.3f}ms"
+    )
+
+
+@click.command()
+@click.option("--vectors", default=None, help=".npy of real embeddings (optional)")
+@click.option("--count", default=50000, help="synthetic corpus size")
+@click.option("--dim", default=768, help="synthetic vector dimension")
+@click.option("--queries", default=200, help="number of queries")
+@click.option("--k", default=10, help="top-k")
+@click.option("--m", default=DEFAULT_HNSW_M, help="HNSW graph degree")
+@click.option("--ef_construction", default=DEFAULT_EF_CONSTRUCTION)
+@click.option("--ef_search", default="16,32,64,128", help="comma separated")
+@click.option("--nlist", default=128, help="IVF_FLAT clusters")
+@click.option("--nprobe", default="1,4,10,32", help="comma separated")
+@click.option("--min_attitudes", default=5, help="filter used for filtered runs")
+def cli(
+    vectors: Optional[str],
+    count: int,
+    dim: int,
+    queries: int,
+    k: int,
+    m: int,
+    ef_construction: int,
+    ef_search: str,
+    nlist: int,
+    nprobe: str,
+    min_attitudes: int,
+):
+    """
+    Recall/latency of the local HNSW backend (plain and filtered top-k) and
+    of IVF_FLAT, the Milvus default, against exact search on the same data.
+    """
+    import faiss
+
+    corpus, records = synthetic_corpus(count, dim)
+    if vectors:
+        corpus = np.load(vectors).astype(np.float32)
+        corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+        corpus = corpus[: len(records)]
+        records = records[: len(corpus)]
+        dim = corpus.shape[1]
+
+    rng = np.random.default_rng(1)
+    query_rows = rng.integers(0, len(corpus), queries)
+    query_vectors = corpus[query_rows] + 0.05 * rng.standard_normal(
+        (queries, dim)
+    ).astype(np.float32)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+
+    attitudes = np.array([r["attitudes_count"] for r in records])
+    filter_mask = attitudes >= min_attitudes
+    truth = exact_top_k(corpus, query_vectors, k, None)
+    filtered_truth = exact_top_k(corpus, query_vectors, k, filter_mask)
+    print(
+        f"{len(corpus)} vectors, dim={dim}, {queries} queries, k={k}, "
+        f"{filter_mask.mean():.1%} pass attitudes_count>={min_attitudes}\n"
+    )
+
+    report(
+        "exact (numpy)",
+        measure(lambda q, k: np.argsort(-(corpus @ q))[:k], query_vectors, truth, k),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        backend = FaissHnswBackend(tmp, dim, m=m, ef_construction=ef_construction)
+        backend.upsert(records, corpus)
+        backend.flush()
+        print(f"HNSW build (M={m}): {time.perf_counter() - start:.1f}s")
+
+        row_of = {r["weibo_id"]: i for i, r in enumerate(records)}
+        for ef in (int(e) for e in ef_search.split(",")):
+            backend.ef_search = ef
+            report(
+                f"HNSW efSearch={ef}",
+                measure(
+                    lambda q, k: [row_of[h["weibo_id"]] for h in backend.search(q, k)],
+                    query_vectors,
+                    truth,
+                    k,
+                ),
+            )
+            report(
+                f"HNSW efSearch={ef} filtered",
+                measure(
+                    lambda q, k: [
+                        row_of[h["weibo_id"]]
+                        for h in backend.search(q, k, min_attitudes=min_attitudes)
+                    ],
+                    query_vectors,
+                    filtered_truth,
+                    k,
+                ),
+            )
+
+    start = time.perf_counter()
+    quantizer = faiss.IndexFlatL2(dim)
+    ivf = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_L2)
+    ivf.train(corpus)
+    ivf.add(corpus)
+    print(f"\nIVF_FLAT build (nlist={nlist}): {time.perf_counter() - start:.1f}s")
+    for probe in (int(p) for p in nprobe.split(",")):
+        ivf.nprobe = probe
+        report(
+            f"IVF_FLAT nprobe={probe}",
+            measure(
+                lambda q, k: ivf.search(q.reshape(1, -1), k)[1][0],
+                query_vectors,
+                truth,
+                k,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# HNSW graph degree, build-time and query-time beam widths
+DEFAULT_HNSW_M = 32
+DEFAULT_EF_CONSTRUCTION = 200
+DEFAULT_EF_SEARCH = 64
+
+
+class VectorIndexBackend(ABC):
+    """
+    Storage for the public opinion vectors.
+    Vectors are L2-normalized float32; a hit's `score` is the similarity
+    reported by the backend (higher is closer for inner product, lower for L2).
+    """
+
+    @abstractmethod
+    def upsert(self, raw_data_list: List[Dict[str, Any]], vectors: np.ndarray) -> int:
+        """Add or replace the records keyed by weibo_id; returns the records written."""
+
+    @abstractmethod
+    def search(
+        self,
+        vector: np.ndarray,
+        limit: int = 3,
+        min_attitudes: Optional[int] = None,
+        min_comments: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Top-`limit` records, optionally restricted by attitudes/comments counts."""
+
+    def flush(self):
+        """Persist pending writes."""
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class FaissHnswBackend(VectorIndexBackend):
+    """
+    Local HNSW index (faiss) persisted to a directory, for offline analysis
+    and tests without a Milvus server.
+
+    `index.faiss` holds the graph; `meta.json`, `attitudes.npy` and
+    `comments.npy` map faiss row ids to weibo_ids and engagement counts.
+    Each flush writes the four files into a fresh generation directory and
+    then switches the `CURRENT` pointer file to it, so readers see either the
+    old or the new generation as a whole.
+    New records are appended incrementally. HNSW cannot replace vectors in
+    place, so an already indexed weibo_id only gets its counts refreshed.
+    With `read_only=True` the index is memory-mapped instead of loaded.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dim: int = 768,
+        m: int = DEFAULT_HNSW_M,
+        ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+        ef_search: int = DEFAULT_EF_SEARCH,
+        read_only: bool = False,
+    ):
+        # faiss is only needed when the local backend is used
+        import faiss
+
+        self._faiss = faiss
+        self.path = path
+        self.read_only = read_only
+        self.ef_search = ef_search
+        os.makedirs(path, exist_ok=True)
+
+        generation = self._current_generation()
+        if generation is not None:
+            self._load(generation)
+        else:
+            self.index = faiss.IndexHNSWFlat(dim, m, faiss.METRIC_INNER_PRODUCT)
+            self.index.hnsw.efConstruction = ef_construction
+            self.ids = []
+            self.attitudes = np.zeros(0, dtype=np.int64)
+            self.comments = np.zeros(0, dtype=np.int64)
+
+        self.index.hnsw.efSearch = ef_search
+        self._row_of = {weibo_id: row for row, weibo_id in enumerate(self.ids)}
+        self._dirty = False
+
+    def _current_generation(self) -> Optional[str]:
+        pointer = os.path.join(self.path, "CURRENT")
+        if os.path.exists(pointer):
+            with open(pointer, "r", encoding="utf-8") as f:
+                return os.path.join(self.path, f.read().strip())
+        # Indexes flushed before generations were introduced
+        if os.path.exists(os.path.join(self.path, "index.faiss")):
+            return self.path
+        return None
+
+    def _load(self, directory: str):
+        flags = self._faiss.IO_FLAG_MMAP if self.read_only else 0
+        self.index = self._faiss.read_index(
+            os.path.join(directory, "index.faiss"), flags
+        )
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            self.ids: List[str] = json.load(f)["ids"]
+        mmap_mode = "r" if self.read_only else None
+        self.attitudes = np.load(
+            os.path.join(directory, "attitudes.npy"), mmap_mode=mmap_mode
+        )
+        self.comments = np.load(
+            os.path.join(directory, "comments.npy"), mmap_mode=mmap_mode
+        )
+
+        sizes = {
+            "index.faiss": self.index.ntotal,
+            "meta.json": len(self.ids),
+            "attitudes.npy": len(self.attitudes),
+            "comments.npy": len(self.comments),
+        }
+        if len(set(sizes.values())) != 1:
+            raise RuntimeError(f"inconsistent vector index in {directory}: {sizes}")
+
+    def upsert(self, raw_data_list: List[Dict[str, Any]], vectors: np.ndarray) -> int:
+        if self.read_only:
+            raise RuntimeError("index was opened read-only")
+
+        # A weibo_id repeated within the batch keeps its last record
+        latest = {str(data["weibo_id"]): i for i, data in enumerate(raw_data_list)}
+
+        new_rows = []
+        new_attitudes = []
+        new_comments = []
+        for weibo_id, i in latest.items():
+            data = raw_data_list[i]
+            attitudes = data.get("attitudes_count", 0)
+            comments = data.get("comments_count", 0)
+
+            row = self._row_of.get(weibo_id)
+            if row is not None:
+                self.attitudes[row] = attitudes
+                self.comments[row] = comments
+                continue
+
+            self._row_of[weibo_id] = len(self.ids)
+            self.ids.append(weibo_id)
+            new_rows.append(i)
+            new_attitudes.append(attitudes)
+            new_comments.append(comments)
+
+        if new_rows:
+            self.index.add(np.ascontiguousarray(vectors[new_rows], dtype=np.float32))
+            self.attitudes = np.concatenate(
+                [self.attitudes, np.asarray(new_attitudes, dtype=np.int64)]
+            )
+            self.comments = np.concatenate(
+                [self.comments, np.asarray(new_comments, dtype=np.int64)]
+            )
+
+        self._dirty = True
+        return len(raw_data_list)
+
+    def search(
+        self,
+        vector: np.ndarray,
+        limit: int = 3,
+        min_attitudes: Optional[int] = None,
+        min_comments: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        faiss = self._faiss
+        query = np.ascontiguousarray(vector, dtype=np.float32).reshape(1, -1)
+
+        params = faiss.SearchParametersHNSW()
+        params.efSearch = max(self.ef_search, limit)
+        if min_attitudes is not None or min_comments is not None:
+            mask = np.ones(len(self.ids), dtype=bool)
+            if min_attitudes is not None:
+                mask &= self.attitudes >= min_attitudes
+            if min_comments is not None:
+                mask &= self.comments >= min_comments
+            allowed = np.flatnonzero(mask).astype(np.int64)
+            if len(allowed) == 0:
+                return []
+            # The selector must outlive the search call
+            selector = faiss.IDSelectorBatch(len(allowed), faiss.swig_ptr(allowed))
+            params.sel = selector
+
+        scores, rows = self.index.search(query, limit, params=params)
+
+        return [
+            {
+                "weibo_id": self.ids[row],
+                "score": float(score),
+                "attitudes_count": int(self.attitudes[row]),
+                "comments_count": int(self.comments[row]),
+            }
+            for score, row in zip(scores[0], rows[0])
+            if row >= 0
+        ]
+
+    def flush(self):
+        if not self._dirty:
+            return
+
+        # Write a complete new generation, then publish it with a single
+        # atomic rename of the pointer file; a crash before that rename
+        # leaves the previous generation in place
+        path = self.path
+        previous = self._current_generation()
+        generation = tempfile.mkdtemp(prefix="gen-", dir=path)
+        self._faiss.write_index(self.index, os.path.join(generation, "index.faiss"))
+        np.save(os.path.join(generation, "attitudes.npy"), self.attitudes)
+        np.save(os.path.join(generation, "comments.npy"), self.comments)
+        with open(os.path.join(generation, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"ids": self.ids, "saved_at": time.time()}, f)
+        for name in os.listdir(generation):
+            with open(os.path.join(generation, name), "rb") as f:
+                os.fsync(f.fileno())
+
+        pointer = os.path.join(path, "CURRENT")
+        with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+            f.write(os.path.basename(generation))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer + ".tmp", pointer)
+        self._dirty = False
+
+        # Readers that memory-mapped the old files keep them until they close
+        if previous is not None and previous != path:
+            shutil.rmtree(previous, ignore_errors=True)
@@ -1,3 +1,14 @@
+import sys
+import os
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+import json
+import asyncio
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
 from sentence_transformers import SentenceTransformer
 from pymilvus import (
     connections,
@@ -8,8 +19,12 @@ from pymilvus import (
     utility,
 )
 
-model = SentenceTransformer("paraphrase-multilingual-mpnet-base-v2")
+from vector.index_backend import VectorIndexBackend
+
+model = SentenceTransformer("paraphrase-multilingual-mpnet-base-v2", device="cpu")
 vector_dim = 768
+collection_name = "weibo_public_opinion"
+text_max_length = 4096
 fields = [
     FieldSchema(
         name="weibo_id",
@@ -19,148 +34,285 @@ fields = [
         max_length=100,
     ),
     FieldSchema(name="weibo_vector", dtype=DataType.FLOAT_VECTOR, dim=vector_dim),
-    FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=4096),
+    FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=text_max_length),
     FieldSchema(name="attitudes_count", dtype=DataType.INT64),
     FieldSchema(name="comments_count", dtype=DataType.INT64),
 ]
 schema = CollectionSchema(fields, "Knowledge base, storing mixed vectors")
 
+# Records read from the JSONL and upserted to Milvus at a time
+DEFAULT_CHUNK_SIZE = 2048
+# Texts per SentenceTransformer forward pass
+DEFAULT_ENCODE_BATCH_SIZE = 64
 
-def hybrid_vectorize(data):
+# Vectors are normalized, so L2 ranks exactly like cosine similarity.
+# Pick nlist/nprobe from vector/benchmark_index.py rather than by guess.
+DEFAULT_INDEX_PARAMS = {
+    "index_type": "IVF_FLAT",
+    "metric_type": "L2",
+    "params": {"nlist": 128},
+}
+DEFAULT_SEARCH_PARAMS = {"nprobe": 10}
+
+
+def build_hybrid_text(data: Dict[str, Any]) -> str:
     """
-    Mix the text information and structured information into vector form.
+    Mix the text information and structured information into one text to embed.
     """
+    analysis_result = data.get("analysis_result") or {}
+    sentiment_analysis = analysis_result.get("sentiment_analysis") or {}
+
     text_parts = [
-        data["text"],
-        f"event_triples:{data['analysis_result']['event_triples']}",
-        f"sentiment_keywords:{data['analysis_result']['sentiment_analysis']['sentiment_keywords']}",
-        f"tags:{data['tags']}",
+        data.get("text", ""),
+        f"event_triples:{analysis_result.get('event_triples', [])}",
+        f"sentiment_keywords:{sentiment_analysis.get('sentiment_keywords', [])}",
+        f"tags:{data.get('tags', {})}",
     ]
-    combined_text = " ".join(text_parts)
-    vector = model.encode(combined_text)
+    return " ".join(text_parts)
+
+
+def hybrid_vectorize(
+    data_list: List[Dict[str, Any]], batch_size: int = DEFAULT_ENCODE_BATCH_SIZE
+) -> np.ndarray:
+    """
+    Encode a chunk of records in batches into L2-normalized float32 vectors.
+    """
+    combined_texts = [build_hybrid_text(data) for data in data_list]
+    vectors = model.encode(
+        combined_texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return vectors.astype(np.float32, copy=False)
+
+
+def vectorize_query(search_text: str) -> np.ndarray:
+    """
+    Encode a search query into an L2-normalized float32 vector. The raw text
+    is encoded, without the structured fields that records are embedded with.
+    """
+    vector = model.encode(
+        search_text.strip(),
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return vector.astype(np.float32, copy=False)
 
-    return vector.tolist()
 
+def connect_milvus(alias: str = "default"):
+    """Open the Milvus connection once; later calls reuse it."""
+    if connections.has_connection(alias):
+        return
 
-def insert_vector_to_milvusdb(raw_data_list, vectors):
     try:
-        connections.connect("default", host="localhost", port="19530")
+        connections.connect(alias, host="localhost", port="19530")
         print("Successfully connected to Milvus!")
     except Exception as e:
         print(f"Failed to connect to Milvus: {e}")
-        exit()
+        raise
+
+
+def get_collection(index_params: Optional[Dict[str, Any]] = None) -> Collection:
+    connect_milvus()
 
     if not utility.has_collection(collection_name):
         print(f"Collection '{collection_name}' does not exist. Creating now...")
         collection = Collection(name=collection_name, schema=schema)
         print(f"Collection '{collection_name}' created successfully.")
     else:
-        print(f"Collection '{collection_name}' already exists. Reusing it.")
         collection = Collection(name=collection_name)
 
     if not collection.has_index():
         print("Index does not exist. Creating an index...")
-        index_params = {
-            "index_type": "IVF_FLAT",
-            "metric_type": "L2",
-            "params": {"nlist": 128},
-        }
-        collection.create_index(field_name="weibo_vector", index_params=index_params)
+        collection.create_index(
+            field_name="weibo_vector",
+            index_params=index_params or DEFAULT_INDEX_PARAMS,
+        )
         print("Index created successfully.")
-    else:
-        print("Index already exists.")
 
-    print("Loading collection to memory...")
     collection.load()
-    print("Collection loaded.")
+    return collection
+
 
-    ids = [data["weibo_id"] for data in raw_data_list]
-    texts = [data["text"] for data in raw_data_list]
-    attitudes_counts = [data["attitudes_count"] for data in raw_data_list]
-    comments_counts = [data["comments_count"] for data in raw_data_list]
+def _truncate_utf8(text: str, max_bytes: int) -> str:
+    return text.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
 
-    data_to_insert = [
+
+def upsert_vectors_to_milvusdb(
+    collection: Collection, raw_data_list: List[Dict[str, Any]], vectors: np.ndarray
+) -> int:
+    """
+    Upsert a chunk keyed by weibo_id, so re-running the same file never
+    duplicates rows.
+    """
+    ids = [str(data["weibo_id"]) for data in raw_data_list]
+    texts = [
+        _truncate_utf8(data.get("text", ""), text_max_length) for data in raw_data_list
+    ]
+    attitudes_counts = [data.get("attitudes_count", 0) for data in raw_data_list]
+    comments_counts = [data.get("comments_count", 0) for data in raw_data_list]
+
+    data_to_upsert = [
         ids,
-        vectors,
+        list(vectors),
         texts,
         attitudes_counts,
         comments_counts,
     ]
 
-    collection = Collection(collection_name)
-    mr = collection.insert(data_to_insert)
-
-    print(f"Successfully inserted {mr.insert_count} pieces of data into Milvus.")
-    connections.disconnect(alias="default")
-
-
-def search_milvusdb(search_text):
-    try:
-        connections.connect("default", host="localhost", port="19530")
-        print("Successfully connected to Milvus!")
-    except Exception as e:
-        print(f"Failed to connect to Milvus: {e}")
-        exit()
-
-    collection = Collection(name=collection_name, schema=schema)
-    collection.load()
-
-    search_vector = model.encode(search_text).tolist()
-
-    search_params = {"nprobe": 10}
-    results = collection.search(
-        data=[search_vector],
-        anns_field="weibo_vector",
-        param=search_params,
-        limit=3,
-        output_fields=["text", "attitudes_count"],
-    )
+    mr = collection.upsert(data_to_upsert)
+    return mr.upsert_count
+
+
+def build_filter_expr(
+    min_attitudes: Optional[int] = None, min_comments: Optional[int] = None
+) -> Optional[str]:
+    conditions = []
+    if min_attitudes is not None:
+        conditions.append(f"attitudes_count >= {int(min_attitudes)}")
+    if min_comments is not None:
+        conditions.append(f"comments_count >= {int(min_comments)}")
+    return " and ".join(conditions) or None
+
+
+class MilvusBackend(VectorIndexBackend):
+    """The `weibo_public_opinion` Milvus collection as a vector index backend."""
+
+    def __init__(
+        self,
+        index_params: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ):
+        self.collection = get_collection(index_params)
+        self.search_params = search_params or DEFAULT_SEARCH_PARAMS
+
+    def upsert(self, raw_data_list: List[Dict[str, Any]], vectors: np.ndarray) -> int:
+        return upsert_vectors_to_milvusdb(self.collection, raw_data_list, vectors)
+
+    def search(
+        self,
+        vector: np.ndarray,
+        limit: int = 3,
+        min_attitudes: Optional[int] = None,
+        min_comments: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        results = self.collection.search(
+            data=[np.asarray(vector, dtype=np.float32).tolist()],
+            anns_field="weibo_vector",
+            param=self.search_params,
+            limit=limit,
+            expr=build_filter_expr(min_attitudes, min_comments),
+            output_fields=["text", "attitudes_count", "comments_count"],
+        )
+        return [
+            {
+                "weibo_id": hit.id,
+                "score": hit.distance,
+                "text": hit.entity.get("text"),
+                "attitudes_count": hit.entity.get("attitudes_count"),
+                "comments_count": hit.entity.get("comments_count"),
+            }
+            for hit in results[0]
+        ]
+
+    def flush(self):
+        self.collection.flush()
+
+
+def search_vectors(
+    search_text,
+    backend: Optional[VectorIndexBackend] = None,
+    limit: int = 3,
+    min_attitudes: Optional[int] = None,
+    min_comments: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Semantic search over any backend (Milvus by default), optionally only
+    among posts with at least `min_attitudes` likes / `min_comments` comments.
+    """
+    backend = backend or MilvusBackend()
+    search_vector = vectorize_query(search_text)
+    hits = backend.search(search_vector, limit, min_attitudes, min_comments)
 
     print("\nSearch results:")
-    for result in results[0]:
-        print(f"Distance: {result.distance}")
-        print(f"Weibo content: {result.entity.get('text')}")
-        print(f"Number of likes: {result.entity.get('attitudes_count')}\n")
-
-    connections.disconnect(alias="default")
-
-
-def read_jsonl_to_list(file_path):
-    data_list = []
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            for line in f:
-                if line.strip():
-                    try:
-                        data = json.loads(line)
-                        data_list.append(data)
-                    except json.JSONDecodeError as e:
-                        print(
-                            f"Error decoding JSON on line: {line.strip()}. Error: {e}"
-                        )
-    except FileNotFoundError:
-        print(f"Error: The file '{file_path}' was not found.")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-
-    return data_list
-
-
-def hybrid_vectorize(file_data):
-    combined_texts = [hybrid_vectorize(data) for data in raw_data_list]
-    return model.encode(combined_texts).tolist()
+    for hit in hits:
+        print(f"Score: {hit['score']}")
+        print(f"Weibo id: {hit['weibo_id']}")
+        if hit.get("text") is not None:
+            print(f"Weibo content: {hit['text']}")
+        print(f"Number of likes: {hit['attitudes_count']}\n")
+
+    return hits
+
+
+def search_milvusdb(
+    search_text,
+    limit: int = 3,
+    search_params: Optional[Dict[str, Any]] = None,
+    min_attitudes: Optional[int] = None,
+    min_comments: Optional[int] = None,
+):
+    return search_vectors(
+        search_text,
+        MilvusBackend(search_params=search_params),
+        limit,
+        min_attitudes,
+        min_comments,
+    )
 
 
-async def process_jsonl_file(input_file):
+def read_jsonl_chunks(
+    file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[List[Dict[str, Any]]]:
     """
-    Reads a JSONL file, processes each line.
+    Stream a JSONL file in chunks of at most `chunk_size` records, skipping
+    duplicated weibo_ids inside a chunk.
+    """
+    chunk: Dict[str, Dict[str, Any]] = {}
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Error decoding JSON on line: {line.strip()}. Error: {e}")
+                continue
+
+            chunk[str(data["weibo_id"])] = data
+            if len(chunk) >= chunk_size:
+                yield list(chunk.values())
+                chunk = {}
+
+    if chunk:
+        yield list(chunk.values())
+
+
+async def process_jsonl_file(
+    input_file,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    batch_size: int = DEFAULT_ENCODE_BATCH_SIZE,
+    backend: Optional[VectorIndexBackend] = None,
+):
+    """
+    Streams a JSONL file chunk by chunk: each chunk is embedded and upserted
+    into `backend` (the Milvus collection by default), so memory stays
+    bounded by `chunk_size` whatever the file size.
     """
-
     try:
-        file_data = read_jsonl_to_list(input_file)
-        vectors = hybrid_vectorize(file_data)
-        insert_vector_to_milvusdb(file_data, vectors)
+        backend = backend or MilvusBackend()
+        total = 0
+        for chunk in read_jsonl_chunks(input_file, chunk_size):
+            vectors = hybrid_vectorize(chunk, batch_size)
+            total += backend.upsert(chunk, vectors)
+            print(f"Upserted {total} records into {type(backend).__name__}.")
+        backend.flush()
 
+    except FileNotFoundError:
+        print(f"Error: The file '{input_file}' was not found.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
@@ -91,20 +91,28 @@ class GenerateNumberPlugin:
             raise e
 
 
-async def generate_kernel_plugins(kernel: Kernel) -> dict[str, KernelPlugin]:
-    kernel.add_plugin(GenerateNamesPlugin(), plugin_name="GenerateNames")
+def add_kernel_plugins(kernel: Kernel) -> dict[str, KernelPlugin]:
+    """Add the plugins of this sample to `kernel`, unless it already has them."""
+    if "GenerateNames" not in kernel.plugins:
+        kernel.add_plugin(GenerateNamesPlugin(), plugin_name="GenerateNames")
 
-    kernel.add_plugin(GenerateNumberPlugin(), "GenerateNumberPlugin")
+    if "GenerateNumberPlugin" not in kernel.plugins:
+        kernel.add_plugin(GenerateNumberPlugin(), "GenerateNumberPlugin")
 
-    kernel.add_function(
-        function_name="CorgiStory",
-        plugin_name="CorgiPlugin",
-        prompt_template_config=prompt_template_config,
-    )
+    if "CorgiPlugin" not in kernel.plugins:
+        kernel.add_function(
+            function_name="CorgiStory",
+            plugin_name="CorgiPlugin",
+            prompt_template_config=prompt_template_config,
+        )
 
     return kernel.plugins
 
 
+async def generate_kernel_plugins(kernel: Kernel) -> dict[str, KernelPlugin]:
+    return add_kernel_plugins(kernel)
+
+
 async def three_ways_to_call_kernel_function(kernel: Kernel) -> list[str]:
     plugins = await generate_kernel_plugins(kernel)
 
@@ -28,6 +28,18 @@ prompt_template_config = PromptTemplateConfig(
 )
 
 
+def get_chat_function(kernel: Kernel) -> KernelFunction:
+    """The chat prompt function of `kernel`, added on first use."""
+    plugin = kernel.plugins.get("chatPlugin")
+    if plugin and "chat" in plugin:
+        return plugin["chat"]
+    return kernel.add_function(
+        function_name="chat",
+        plugin_name="chatPlugin",
+        prompt_template_config=prompt_template_config,
+    )
+
+
 async def chat(
     input_text: str,
     kernel: Kernel,
@@ -54,11 +66,7 @@ async def chat_history_with_summary(
     chat_history.add_system_message(
         "You are a helpful chatbot who is good about giving book recommendations."
     )
-    chat_function = kernel.add_function(
-        function_name="chat",
-        plugin_name="chatPlugin",
-        prompt_template_config=prompt_template_config,
-    )
+    chat_function = get_chat_function(kernel)
 
     for input_text in input_texts:
         await chat(input_text, kernel, chat_function, chat_history)
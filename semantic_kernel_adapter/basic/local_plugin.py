@@ -1,16 +1,24 @@
 from semantic_kernel import Kernel
+from semantic_kernel.functions import KernelPlugin
 from pathlib import Path
 import asyncio
 
 
-async def generate_joke(kernel: Kernel, topic: str, style: str = "silly") -> str:
-    script_dir = Path(__file__).parent
+def get_fun_plugin(kernel: Kernel) -> KernelPlugin:
+    """The FunPlugin prompts of `kernel`, read from disk on first use."""
+    if "FunPlugin" in kernel.plugins:
+        return kernel.plugins["FunPlugin"]
 
+    script_dir = Path(__file__).parent
     plugins_directory = script_dir.parent / "prompt_template_samples"
-    kernelPlugin = kernel.add_plugin(
+    return kernel.add_plugin(
         parent_directory=str(plugins_directory), plugin_name="FunPlugin"
     )
 
+
+async def generate_joke(kernel: Kernel, topic: str, style: str = "silly") -> str:
+    kernelPlugin = get_fun_plugin(kernel)
+
     jokeFunction = kernelPlugin["Joke"]
     result = await kernel.invoke(jokeFunction, input=topic, style=style)
     return str(result)
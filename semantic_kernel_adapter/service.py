@@ -1,3 +1,5 @@
+from typing import Callable, Iterable
+
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 
@@ -9,6 +11,7 @@ from semantic_kernel.connectors.ai.open_ai import (
 from semantic_kernel.connectors.ai.google.google_ai import (
     GoogleAITextEmbedding,
 )
+from google.genai import Client as GoogleClient
 from openai import AsyncOpenAI
 from mem0 import MemoryClient
 
@@ -39,39 +42,49 @@ def get_kernel() -> Kernel:
     return Kernel()
 
 
+def get_openai_client(option: SemanticKernelOption) -> AsyncOpenAI:
+    return AsyncOpenAI(api_key=option.chat_api_key, base_url=option.chat_base_url)
+
+
+def get_google_client(option: SemanticKernelOption) -> GoogleClient:
+    return GoogleClient(api_key=option.embedding_api_key)
+
+
 def get_chat_completion_service(
-    option: SemanticKernelOption, service_id: str = "default"
+    option: SemanticKernelOption,
+    service_id: str = "default",
+    async_client: AsyncOpenAI | None = None,
 ) -> OpenAIChatCompletion:
     return OpenAIChatCompletion(
         ai_model_id=option.chat_model_id,
         service_id=service_id,
-        async_client=AsyncOpenAI(
-            api_key=option.chat_api_key,
-            base_url=option.chat_base_url,
-        ),
+        async_client=async_client or get_openai_client(option),
     )
 
 
 def get_text_embedding_service(
-    option: SemanticKernelOption, service_id: str = "embedding"
+    option: SemanticKernelOption,
+    service_id: str = "embedding",
+    client: GoogleClient | None = None,
 ) -> GoogleAITextEmbedding:
+    # Without a client, the service opens a new one for every embedding call
     return GoogleAITextEmbedding(
         embedding_model_id=option.embedding_model_id,
         service_id=service_id,
         api_key=option.embedding_api_key,
+        client=client,
     )
 
 
 def get_audio_to_text_service(
-    option: SemanticKernelOption, service_id: str = "audio_to_text"
+    option: SemanticKernelOption,
+    service_id: str = "audio_to_text",
+    async_client: AsyncOpenAI | None = None,
 ) -> OpenAIAudioToText:
     return OpenAIChatCompletion(
         ai_model_id=option.chat_model_id,
         service_id=service_id,
-        async_client=AsyncOpenAI(
-            api_key=option.chat_api_key,
-            base_url=option.chat_base_url,
-        ),
+        async_client=async_client or get_openai_client(option),
     )
 
 
@@ -81,17 +94,61 @@ def build_kernel_pipeline(
     chat_service_id: str = "default",
     embedding_service_id: str = "embedding",
     audio_service_id: str = "audio_to_text",
+    openai_client: AsyncOpenAI | None = None,
+    google_client: GoogleClient | None = None,
 ) -> Kernel:
     if option is None:
         option = SemanticKernelOption()
     if kernel is None:
         kernel = get_kernel()
-    kernel.add_service(get_chat_completion_service(option, chat_service_id))
-    kernel.add_service(get_text_embedding_service(option, embedding_service_id))
-    kernel.add_service(get_audio_to_text_service(option, audio_service_id))
+    if openai_client is None:
+        openai_client = get_openai_client(option)
+    kernel.add_service(
+        get_chat_completion_service(option, chat_service_id, openai_client)
+    )
+    kernel.add_service(
+        get_text_embedding_service(option, embedding_service_id, google_client)
+    )
+    kernel.add_service(
+        get_audio_to_text_service(option, audio_service_id, openai_client)
+    )
     return kernel
 
 
+class KernelFactory:
+    """
+    A kernel built once per application: its services share one HTTP client
+    per provider, so requests reuse keep-alive connections, and plugins are
+    registered once. `create_kernel` hands each request a clone, whose
+    plugin and filter changes do not leak into the shared kernel.
+    """
+
+    def __init__(
+        self,
+        option: SemanticKernelOption | None = None,
+        registrations: Iterable[Callable[[Kernel], object]] = (),
+    ):
+        if option is None:
+            option = SemanticKernelOption()
+        self.openai_client = get_openai_client(option)
+        self.google_client = get_google_client(option)
+        self.kernel = build_kernel_pipeline(
+            option,
+            openai_client=self.openai_client,
+            google_client=self.google_client,
+        )
+        for register in registrations:
+            register(self.kernel)
+
+    def create_kernel(self) -> Kernel:
+        return self.kernel.clone()
+
+    async def aclose(self) -> None:
+        await self.openai_client.close()
+        await self.google_client.aio.aclose()
+        self.google_client.close()
+
+
 def get_memory_client(option: SemanticKernelOption | None = None) -> MemoryClient:
     if option is None:
         option = SemanticKernelOption()
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from fastapi import APIRouter, Depends
 
 from pydantic import BaseModel
@@ -14,15 +16,20 @@ from langchain_adapter import (
 router = APIRouter(prefix="/langchain", tags=["lang_chain"])
 
 
+@lru_cache
+def get_langchain_option() -> option.LangChainOption:
+    """Read the settings (and .env) once instead of on every request."""
+    return option.LangChainOption()
+
+
 class ChatRequest(BaseModel):
     input_text: str = "Tell me a joke about cats"
 
 
 @router.post("/joke_generator")
-async def joke_generator(request: ChatRequest):
+async def joke_generator(request: ChatRequest, config=Depends(get_langchain_option)):
     input_text = request.input_text
-    config = option.LangChainOption()
-    result = chat.generate_joke(input_text, config)
+    result = await chat.agenerate_joke(input_text, chat.get_chain(config))
     return result
 
 
@@ -31,36 +38,36 @@ class CalculateRequest(BaseModel):
 
 
 @router.post("/calculate")
-async def calculate(request: CalculateRequest):
+async def calculate(request: CalculateRequest, config=Depends(get_langchain_option)):
     query = request.query
-    config = option.LangChainOption()
-    result = tool.calculate(query, config)
+    result = await tool.acalculate(query, config)
     return result
 
 
 @router.post("/calculate2")
-async def calculate2(request: CalculateRequest):
+async def calculate2(request: CalculateRequest, config=Depends(get_langchain_option)):
     """use  langchain agent or langgraph agent"""
 
     query = request.query
-    config = option.LangChainOption()
-    result = agent.calculate2(query, config)
+    result = await agent.acalculate2(query, config)
     return result
 
 
 @router.post("/describe_image")
-async def describe_image(request: multimodal.MultimodalData):
-    config = option.LangChainOption()
-    result = multimodal.multimodal(request, config)
+async def describe_image(
+    request: multimodal.MultimodalData, config=Depends(get_langchain_option)
+):
+    result = await multimodal.amultimodal(request, config)
     return result
 
 
 @router.post("/retriever")
-async def retriever(question: str = "what is `Structure`?"):
+async def retriever(
+    question: str = "what is `Structure`?", config=Depends(get_langchain_option)
+):
     """Get information from local files"""
 
-    config = option.LangChainOption()
-    result = embedding.retriever(question, "./README.md", config)
+    result = await embedding.aretriever(question, "./README.md", config)
     return result
 
 
@@ -68,22 +75,22 @@ async def retriever(question: str = "what is `Structure`?"):
 async def multi_query_retriever(
     question: str = "What is ai-concepts?",
     path: str = "https://learn.microsoft.com/zh-cn/azure/architecture/ai-ml/",
+    config=Depends(get_langchain_option),
 ):
     """Get information from network files"""
 
-    config = option.LangChainOption()
-    vectordb = embedding.vectordb_with_Chroma(path, config)
-    doc = embedding.multi_query_retriever_with_output(question, vectordb, config)
+    vectordb = await embedding.avectordb_with_Chroma(path, config)
+    doc = await embedding.amulti_query_retriever_with_output(question, vectordb, config)
     return doc
 
 
 @router.post("/contextual_compression")
 async def contextual_compression(
     question: str = "What did the president say about Ketanji Jackson Brown",
+    config=Depends(get_langchain_option),
 ):
     """do retrieval with contextual compression"""
 
-    config = option.LangChainOption()
-    retriever = compression.get_retriever(config)
-    doc = compression.contextual_compression(question, retriever, config)
+    retriever = await compression.aget_retriever(config)
+    doc = await compression.acontextual_compression(question, retriever, config)
     return doc
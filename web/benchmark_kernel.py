@@ -0,0 +1,159 @@
+from pathlib import Path
+import sys
+
+current_file_path = Path(__file__).resolve()
+project_root = current_file_path.parent.parent
+sys.path.insert(0, str(project_root))
+
+import time
+import asyncio
+import argparse
+import statistics
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from semantic_kernel_adapter import service
+from web import dependencies
+from web.api.v1 import sk_basic
+
+
+def build_mock_openai(latency: float) -> FastAPI:
+    """An OpenAI-compatible endpoint that answers every chat completion."""
+    mock = FastAPI()
+
+    @mock.post("/v1/chat/completions")
+    async def chat_completions():
+        await asyncio.sleep(latency)
+        return {
+            "id": "mock",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "mock",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "a mock answer"},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }
+
+    return mock
+
+
+def mock_option(base_url: str) -> service.SemanticKernelOption:
+    return service.SemanticKernelOption(
+        chat_model_id="mock",
+        chat_api_key="mock",
+        chat_base_url=base_url,
+        embedding_model_id="mock",
+        embedding_api_key="mock",
+        embedding_base_url=base_url,
+        audio_model_id="mock",
+        audio_api_key="mock",
+        audio_base_url=base_url,
+        mem0_api_key="mock",
+    )
+
+
+def build_app(option: service.SemanticKernelOption, shared: bool) -> FastAPI:
+    app = FastAPI()
+    app.include_router(sk_basic.router)
+
+    if shared:
+        factory = service.KernelFactory(
+            option,
+            registrations=[
+                sk_basic.basic.history_summarization_reducer.get_chat_function,
+                sk_basic.basic.local_plugin.get_fun_plugin,
+                sk_basic.basic.function.add_kernel_plugins,
+            ],
+        )
+
+        async def get_kernel_full():
+            return factory.create_kernel()
+
+        app.state.close = factory.aclose
+    else:
+
+        async def get_kernel_full():
+            # How get_kernel_full worked before: new kernel, services and clients
+            return service.build_kernel_pipeline(option)
+
+        async def close():
+            pass
+
+        app.state.close = close
+
+    app.dependency_overrides[dependencies.get_kernel_full] = get_kernel_full
+    return app
+
+
+async def latencies(app: FastAPI, path: str, requests: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    limit = asyncio.Semaphore(concurrency)
+    results = []
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=60
+    ) as client:
+
+        async def call():
+            async with limit:
+                start = time.perf_counter()
+                response = await client.post(path, json={})
+                response.raise_for_status()
+                results.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(call() for _ in range(requests)))
+    return results
+
+
+def percentile(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+async def run(port: int, latency: float, requests: int, concurrency: int):
+    server = uvicorn.Server(
+        uvicorn.Config(
+            build_mock_openai(latency), port=port, log_level="warning", lifespan="off"
+        )
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    option = mock_option(f"http://127.0.0.1:{port}/v1")
+    print(
+        f"mock completion latency {latency * 1000:.0f}ms, "
+        f"{requests} requests at concurrency {concurrency}"
+    )
+    try:
+        for path in ("/sk_basic/joke_generator", "/sk_basic/call_kernel_function"):
+            for label, shared in (("per request", False), ("shared", True)):
+                app = build_app(option, shared)
+                # Warm up imports and the first connection
+                await latencies(app, path, concurrency, concurrency)
+                values = await latencies(app, path, requests, concurrency)
+                await app.state.close()
+                print(
+                    f"{path:<32} {label:<12} p50={percentile(values, 50):7.2f}ms "
+                    f"p99={percentile(values, 99):7.2f}ms"
+                )
+    finally:
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.port, args.latency, args.requests, args.concurrency))
@@ -0,0 +1,111 @@
+from pathlib import Path
+import sys
+
+current_file_path = Path(__file__).resolve()
+project_root = current_file_path.parent.parent
+sys.path.insert(0, str(project_root))
+
+import time
+import asyncio
+import argparse
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from langchain_adapter import multimodal, option
+from web.api.v1 import lang
+
+
+class MockChatModel(BaseChatModel):
+    """A chat model that answers after `latency` seconds, sync or async."""
+
+    latency: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "mock"
+
+    def _result(self) -> ChatResult:
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content="a logo"))]
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        time.sleep(self.latency)
+        return self._result()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        await asyncio.sleep(self.latency)
+        return self._result()
+
+
+MOCK_OPTION = option.LangChainOption.model_construct(
+    lang_google_api_key="mock",
+    lang_google_chat_model="mock",
+    lang_google_embedding_model="mock",
+    ai21_api_key="mock",
+)
+
+
+def build_app(latency: float) -> FastAPI:
+    multimodal.init_chat_model = lambda *args, **kwargs: MockChatModel(latency=latency)
+
+    app = FastAPI()
+    app.include_router(lang.router)
+    app.dependency_overrides[lang.get_langchain_option] = lambda: MOCK_OPTION
+
+    @app.post("/blocking")
+    async def blocking(request: multimodal.MultimodalData):
+        # How every route called LangChain before: sync code in `async def`
+        return multimodal.multimodal(request, MOCK_OPTION)
+
+    return app
+
+
+async def throughput(app: FastAPI, path: str, requests: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    limit = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def call():
+            async with limit:
+                response = await client.post(
+                    path, json={"image_url": "https://example.com/logo.png"}
+                )
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(call() for _ in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+async def run(requests: int, latency: float, concurrency: list[int]):
+    app = build_app(latency)
+    print(f"mock model latency {latency * 1000:.0f}ms, {requests} requests per run")
+    for path in ("/blocking", "/langchain/describe_image"):
+        for level in concurrency:
+            rate = await throughput(app, path, requests, level)
+            print(f"{path:<28} concurrency={level:<3} {rate:7.1f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    args = parser.parse_args()
+
+    asyncio.run(
+        run(
+            args.requests,
+            args.latency,
+            [int(c) for c in args.concurrency.split(",")],
+        )
+    )
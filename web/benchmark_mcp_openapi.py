@@ -0,0 +1,139 @@
+from pathlib import Path
+import sys
+
+current_file_path = Path(__file__).resolve()
+project_root = current_file_path.parent.parent
+sys.path.insert(0, str(project_root))
+
+import gc
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import statistics
+
+import httpx
+from fastapi import FastAPI
+from mcp.server.fastmcp import FastMCP
+from pydantic import BaseModel
+
+from web.mcp_openapi_merge import (
+    McpOpenApiCache,
+    build_mcp_openapi_dict,
+    merge_openapi_into_app,
+    serve_openapi_bytes,
+)
+
+PREFIX = "/api/v1/bench"
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+
+
+class Customer(BaseModel):
+    name: str
+    addresses: list[Address]
+
+
+def build_server(tools: int, prompts: int, changed: int | None = None) -> FastMCP:
+    """A server with `tools` tools and `prompts` prompts; `changed` edits one."""
+    server = FastMCP(name="bench")
+    for i in range(tools):
+
+        def tool(customer: Customer, limit: int = 10) -> Customer:
+            return customer
+
+        description = f"Look up customers, variant {i}"
+        if i == changed:
+            description += " (edited)"
+        server.add_tool(tool, name=f"tool_{i}", description=description)
+
+    for i in range(prompts):
+
+        def prompt(topic: str, style: str = "plain") -> str:
+            return f"Write about {topic} in a {style} style."
+
+        server.prompt(name=f"prompt_{i}", description=f"Prompt {i}")(prompt)
+    return server
+
+
+async def timed(server: FastMCP, cache: McpOpenApiCache | None) -> float:
+    # Collect first so a pause for garbage left by the previous run is not
+    # charged to this one
+    gc.collect()
+    start = time.perf_counter()
+    await build_mcp_openapi_dict(server, prefix=PREFIX, group="bench", cache=cache)
+    return (time.perf_counter() - start) * 1000
+
+
+async def build_medians(tools: int, prompts: int, repeat: int) -> dict[str, float]:
+    """Median build time of each cache state over `repeat` runs."""
+    server = build_server(tools, prompts)
+    edited = build_server(tools, prompts, changed=tools // 2)
+    runs: dict[str, list[float]] = {
+        "no cache": [],
+        "cold cache": [],
+        "warm cache": [],
+        "one tool changed": [],
+    }
+    for _ in range(repeat):
+        runs["no cache"].append(await timed(server, None))
+        with tempfile.TemporaryDirectory() as tmp:
+            runs["cold cache"].append(await timed(server, McpOpenApiCache(tmp)))
+            # A new cache object, as after a restart: everything comes from disk
+            runs["warm cache"].append(await timed(server, McpOpenApiCache(tmp)))
+            runs["one tool changed"].append(await timed(edited, McpOpenApiCache(tmp)))
+    return {label: statistics.median(times) for label, times in runs.items()}
+
+
+async def serve(openapi: dict, requests: int, pre_serialized: bool) -> float:
+    app = FastAPI()
+    if pre_serialized:
+        serve_openapi_bytes(app)
+    merge_openapi_into_app(app, openapi)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        await c.get("/openapi.json")
+        start = time.perf_counter()
+        for _ in range(requests):
+            (await c.get("/openapi.json")).raise_for_status()
+    return (time.perf_counter() - start) * 1000 / requests
+
+
+async def run(tools: int, prompts: int, requests: int, repeat: int):
+    # FastMCP turns on INFO logging, which would log every request below
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    print(f"build, median of {repeat} runs")
+    # Tools and prompts apart show where the cache pays: a cached tool still
+    # costs its fingerprint, about as much as building its entry again
+    scopes = (
+        (f"{tools} tools", tools, 0),
+        (f"{prompts} prompts", 0, prompts),
+        (f"{tools} tools, {prompts} prompts", tools, prompts),
+    )
+    for scope, scope_tools, scope_prompts in scopes:
+        medians = await build_medians(scope_tools, scope_prompts, repeat)
+        print(scope)
+        for label, median in medians.items():
+            print(f"  {label:<22} {median:8.1f}ms")
+
+    server = build_server(tools, prompts)
+    openapi = await build_mcp_openapi_dict(server, prefix=PREFIX, group="bench")
+    for label, pre_serialized in (("JSONResponse", False), ("pre-serialized", True)):
+        latency = await serve(openapi, requests, pre_serialized)
+        print(f"GET /openapi.json {label:<15} {latency:8.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tools", type=int, default=500)
+    parser.add_argument("--prompts", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.tools, args.prompts, args.requests, args.repeat))
@@ -9,3 +9,8 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_CHAT_MODEL_ID = os.getenv("OPENAI_CHAT_MODEL_ID")
 GOOGLE_TEXT_EMBEDDING_MODEL_ID = os.getenv("GOOGLE_TEXT_EMBEDDING_MODEL_ID")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+# Seconds without requests before an MCP server is shut down; 0 keeps it running.
+# The servers stay stateful (tools use elicitation and session notifications),
+# so a server with open sessions is kept until its clients end them or the
+# session manager expires them, rather than running with stateless_http=True.
+MCP_IDLE_TIMEOUT = float(os.getenv("MCP_IDLE_TIMEOUT", "300"))
@@ -1,7 +1,9 @@
+from functools import lru_cache
+
 from fastapi import Depends
 from web.core.database import db
 
-from semantic_kernel_adapter import service
+from semantic_kernel_adapter import basic, service
 
 
 async def get_db():
@@ -12,5 +14,23 @@ async def get_kernel():
     return service.get_kernel()
 
 
+@lru_cache
+def get_kernel_factory() -> service.KernelFactory:
+    # Built on first use, so the app starts without the kernel settings
+    return service.KernelFactory(
+        registrations=[
+            basic.history_summarization_reducer.get_chat_function,
+            basic.local_plugin.get_fun_plugin,
+            basic.function.add_kernel_plugins,
+        ]
+    )
+
+
+async def close_kernel_factory():
+    if get_kernel_factory.cache_info().currsize:
+        await get_kernel_factory().aclose()
+        get_kernel_factory.cache_clear()
+
+
 async def get_kernel_full():
-    return service.build_kernel_pipeline()
+    return get_kernel_factory().create_kernel()
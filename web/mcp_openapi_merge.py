@@ -1,16 +1,27 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
-from fastapi import FastAPI
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
 from contextlib import asynccontextmanager
 import inspect
 from pathlib import Path
 from typing import Any
 import re
+import os
+import json
+import types
+import hashlib
 import asyncio
 from faker import Faker
 
 fake = Faker("en_US")
 
+# Bump when the generated fragments change shape, to drop old cache files
+CACHE_VERSION = 1
+
+RESOURCE_ATTRS = ["path", "pattern", "text", "data"]
+
 
 def add_resource_properties(schema: dict, resource: Any, attrs: list):
     """
@@ -251,8 +262,7 @@ def register_resource_schema(openapi, prefix, group, resource):
         "required": ["uriTemplate", "name", "title", "description", "mimeType"],
     }
 
-    attrs = ["path", "pattern", "text", "data"]
-    add_resource_properties(output_schema, resource, attrs)
+    add_resource_properties(output_schema, resource, RESOURCE_ATTRS)
 
     output_ref = register_schema_recursive(
         openapi, output_schema, f"{name}ResourceOutput"
@@ -399,6 +409,137 @@ async def register_prompt_schema(openapi, prefix, group, prompt):
     openapi["paths"][path] = {"post": post_obj}
 
 
+def _code_fingerprint(fn) -> Any:
+    """The bytecode of `fn`, stable across processes unlike its repr."""
+    code = getattr(fn, "__code__", None)
+    if code is None:
+        return getattr(fn, "__qualname__", type(fn).__qualname__)
+
+    def walk(code: types.CodeType) -> list:
+        consts = [
+            walk(c) if isinstance(c, types.CodeType) else repr(c)
+            for c in code.co_consts
+        ]
+        return [code.co_code.hex(), consts, list(code.co_names)]
+
+    return walk(code)
+
+
+def _mcp_server_entries(server) -> List[tuple]:
+    """
+    Returns (cache key, definition, register function, entry) of every tool,
+    resource, resource template and prompt, in document order. The
+    definition holds everything the register function reads from the entry.
+    """
+    out = []
+    for tool in _mcp_server_tools(server).values():
+        definition = [
+            tool.name,
+            tool.description,
+            getattr(tool, "parameters", None),
+            getattr(getattr(tool, "fn_metadata", None), "output_schema", None),
+        ]
+        out.append((f"tools/{tool.name}", definition, register_tool_schema, tool))
+
+    for resource in _mcp_server_resources(server).values():
+        definition = [
+            resource.name,
+            str(resource.uri),
+            resource.description,
+            resource.title,
+            resource.mime_type,
+            [get_attr(resource, attr, None) for attr in RESOURCE_ATTRS],
+        ]
+        out.append(
+            (
+                f"resources/{resource.name}",
+                definition,
+                register_resource_schema,
+                resource,
+            )
+        )
+
+    for template in _mcp_server_resource_templates(server).values():
+        definition = [
+            str(template.uri_template),
+            template.name,
+            template.title,
+            template.description,
+            template.mime_type,
+            getattr(template, "parameters", None),
+        ]
+        out.append(
+            (
+                f"templates/{template.name}",
+                definition,
+                register_resource_template_schema,
+                template,
+            )
+        )
+
+    for prompt in _mcp_server_prompts(server).values():
+        # The example output comes from rendering the prompt function itself
+        definition = [
+            prompt.name,
+            prompt.description,
+            prompt.title,
+            [(p.name, p.required) for p in prompt.arguments or []],
+            _code_fingerprint(getattr(prompt, "fn", None)),
+        ]
+        out.append(
+            (f"prompts/{prompt.name}", definition, register_prompt_schema, prompt)
+        )
+
+    return out
+
+
+class McpOpenApiCache:
+    """
+    Generated OpenAPI fragments of each MCP server entry, persisted as one
+    JSON file per prefix. An entry is regenerated only when the hash of its
+    definition changed, so unchanged prompts are not rendered again.
+
+    Rendering prompts is what this saves. A cached tool still costs the
+    hash of its definition, close to what building its entry costs, and any
+    change rewrites the whole file.
+    """
+
+    def __init__(self, cache_dir: str | Path = ".cache/mcp_openapi"):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, prefix: str) -> Path:
+        return (
+            self.cache_dir / f"{hashlib.sha256(prefix.encode()).hexdigest()[:16]}.json"
+        )
+
+    def load(self, prefix: str) -> Dict[str, Any]:
+        try:
+            data = json.loads(self._path(prefix).read_bytes())
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION or data.get("prefix") != prefix:
+            return {}
+        return data.get("entries", {})
+
+    def save(self, prefix: str, entries: Dict[str, Any]) -> None:
+        path = self._path(prefix)
+        data = {"version": CACHE_VERSION, "prefix": prefix, "entries": entries}
+        # Write then rename, so concurrent workers never read half a file
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data, default=str))
+            os.replace(tmp, path)
+        except OSError:
+            # A read-only deployment still serves the freshly built document
+            pass
+
+    @staticmethod
+    def fingerprint(prefix: str, group: str, definition: Any) -> str:
+        payload = json.dumps([CACHE_VERSION, prefix, group, definition], default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
 async def build_mcp_openapi_dict(
     server: Any,
     *,
@@ -406,6 +547,7 @@ async def build_mcp_openapi_dict(
     version: str = "1.0.0",
     prefix: str = "/api/v1/mcp",
     group: str = "mcp",
+    cache: McpOpenApiCache | None = None,
 ) -> Dict[str, Any]:
     """
     Build an OpenAPI for a "virtual endpoint" based on the FastMCP server's registration information.
@@ -414,12 +556,10 @@ async def build_mcp_openapi_dict(
     The requestBody uses the tool's own schema (if missing, the loose schema is used).
     - Resource list => GET {prefix}/resources
     - SSE base endpoint (optional description) => GET {prefix}/sse
-    """
-    tools = _mcp_server_tools(server)
-    resources = _mcp_server_resources(server)
-    resource_templates = _mcp_server_resource_templates(server)
-    prompts = _mcp_server_prompts(server)
 
+    With a `cache`, only entries whose definition changed since the last
+    build are generated again; the others are read from disk.
+    """
     openapi: Dict[str, Any] = {
         "openapi": "3.0.3",
         "info": {"title": title, "version": version},
@@ -427,21 +567,26 @@ async def build_mcp_openapi_dict(
         "components": {"schemas": {}},
     }
 
-    # ----------------- create tools paths -----------------
-    for name, tool in tools.items():
-        register_tool_schema(openapi, prefix, group, tool)
-
-    # ----------------- create resources paths -----------------
-    for name, resource in resources.items():
-        register_resource_schema(openapi, prefix, group, resource)
-
-    # ----------------- create resource_templates paths -----------------
-    for name, template in resource_templates.items():
-        register_resource_template_schema(openapi, prefix, group, template)
-
-    # ----------------- create prompts paths -----------------
-    for name, prompt in prompts.items():
-        await register_prompt_schema(openapi, prefix, group, prompt)
+    cached = cache.load(prefix) if cache else {}
+    entries = {}
+    for key, definition, register, entry in _mcp_server_entries(server):
+        digest = McpOpenApiCache.fingerprint(prefix, group, definition)
+        fragment = cached.get(key)
+        if not fragment or fragment.get("hash") != digest:
+            fragment = {"hash": digest, "paths": {}, "components": {"schemas": {}}}
+            result = register(fragment, prefix, group, entry)
+            if inspect.isawaitable(result):
+                await result
+        entries[key] = fragment
+
+        openapi["paths"].update(fragment["paths"])
+        # Like a single pass over the document: the first schema of a name wins
+        schemas = openapi["components"]["schemas"]
+        for name, schema in fragment["components"]["schemas"].items():
+            schemas.setdefault(name, schema)
+
+    if cache and entries != cached:
+        cache.save(prefix, entries)
 
     # Resource List
     res_path = f"{prefix}/resources"
@@ -494,14 +639,52 @@ def merge_openapi_into_app(app: FastAPI, sub_openapi: Dict[str, Any]) -> None:
     """
     Merge sub_openapi's paths/components into app's openapi_schema.
     """
-    main_schema = app.openapi()
+    # A new schema object, so serve_openapi_bytes knows to serialize again
+    main_schema = dict(app.openapi())
     # merge paths
+    main_schema["paths"] = dict(main_schema.get("paths", {}))
     for p, item in sub_openapi.get("paths", {}).items():
-        main_schema.setdefault("paths", {})[p] = item
+        main_schema["paths"][p] = item
     # merge components
     sub_comp = sub_openapi.get("components") or {}
-    main_comp = main_schema.setdefault("components", {})
+    main_comp = main_schema["components"] = dict(main_schema.get("components", {}))
     for comp_type, comp_dict in sub_comp.items():
-        dst = main_comp.setdefault(comp_type, {})
+        dst = main_comp[comp_type] = dict(main_comp.get(comp_type, {}))
         dst.update(comp_dict)
     app.openapi_schema = main_schema
+
+
+def serve_openapi_bytes(
+    app: FastAPI, prepare: Callable[[], Awaitable[None]] | None = None
+) -> None:
+    """
+    Replace the app's `openapi_url` route with one that serializes the
+    schema once, and again only after `app.openapi_schema` is replaced,
+    instead of encoding the whole document on every request.
+
+    `prepare` is awaited before each response, e.g. to merge documents
+    that are only built on the first request.
+    """
+    app.router.routes = [
+        route
+        for route in app.router.routes
+        if getattr(route, "path", None) != app.openapi_url
+    ]
+    cached: Dict[str, Any] = {"schema": None, "body": b""}
+
+    async def openapi(request: Request) -> Response:
+        # As FastAPI's own route: list the mount point as a server
+        root_path = request.scope.get("root_path", "").rstrip("/")
+        server_urls = {server.get("url") for server in app.servers or []}
+        if root_path and root_path not in server_urls and app.root_path_in_servers:
+            app.servers.insert(0, {"url": root_path})
+
+        if prepare is not None:
+            await prepare()
+        schema = app.openapi()
+        if schema is not cached["schema"]:
+            cached["body"] = json.dumps(jsonable_encoder(schema)).encode()
+            cached["schema"] = schema
+        return Response(cached["body"], media_type="application/json")
+
+    app.add_route(app.openapi_url, openapi, include_in_schema=False)
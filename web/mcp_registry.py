@@ -0,0 +1,183 @@
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from fastapi import FastAPI
+
+from web.mcp_openapi_merge import (
+    McpOpenApiCache,
+    build_mcp_openapi_dict,
+    merge_openapi_into_app,
+)
+
+
+@dataclass
+class McpServer:
+    name: str
+    prefix: str
+    group: str
+    version: str
+    # Creates the FastMCP server; called on first use, and again after an
+    # idle shutdown since a session manager can only run once
+    factory: Callable[[], Any]
+
+
+@dataclass
+class _Running:
+    server: Any
+    mcp_app: Callable
+    stop: asyncio.Event = field(default_factory=asyncio.Event)
+    task: asyncio.Task | None = None
+    active: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class LazyMcpApp:
+    """
+    ASGI app mounted at an MCP server's prefix. The server is created and
+    its sub-app lifespan entered on the first request; after `idle_timeout`
+    seconds without requests in flight and without open sessions it is shut
+    down and dropped.
+    """
+
+    def __init__(self, mcp: McpServer, idle_timeout: float | None = None):
+        self.mcp = mcp
+        self.idle_timeout = idle_timeout
+        self._running: _Running | None = None
+        self._lock = asyncio.Lock()
+        self._watcher: asyncio.Task | None = None
+
+    @property
+    def server(self) -> Any | None:
+        """The running FastMCP server, if any."""
+        return self._running.server if self._running else None
+
+    async def __call__(self, scope, receive, send) -> None:
+        running = await self._start()
+        running.active += 1
+        try:
+            await running.mcp_app(scope, receive, send)
+        finally:
+            running.active -= 1
+            running.last_used = time.monotonic()
+
+    async def _start(self) -> _Running:
+        if self._running:
+            return self._running
+
+        async with self._lock:
+            if self._running:
+                return self._running
+
+            server = self.mcp.factory()
+            running = _Running(server, server.streamable_http_app())
+            started = asyncio.Event()
+            # The lifespan holds an anyio task group, which must be exited by
+            # the task that entered it, so it lives in a task of its own
+            running.task = asyncio.create_task(self._serve(running, started))
+            wait = asyncio.create_task(started.wait())
+            await asyncio.wait([running.task, wait], return_when="FIRST_COMPLETED")
+            if not started.is_set():
+                wait.cancel()
+                await running.task
+
+            self._running = running
+            if self.idle_timeout and self._watcher is None:
+                self._watcher = asyncio.create_task(self._watch_idle())
+            return running
+
+    @staticmethod
+    async def _serve(running: _Running, started: asyncio.Event) -> None:
+        async with running.mcp_app.router.lifespan_context(running.mcp_app):
+            started.set()
+            await running.stop.wait()
+
+    async def _watch_idle(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.idle_timeout, 30))
+            running = self._running
+            if running is None:
+                continue
+            idle = time.monotonic() - running.last_used
+            if (
+                running.active == 0
+                and idle >= self.idle_timeout
+                and not self._open_sessions(running)
+            ):
+                await self.stop()
+
+    @staticmethod
+    def _open_sessions(running: _Running) -> int:
+        # A stateful session manager keeps each client's session in memory;
+        # shutting it down would answer their Mcp-Session-Id with 404. The
+        # manager drops sessions that are deleted or expire, and stateless
+        # servers never track any.
+        manager = running.server.session_manager
+        return len(getattr(manager, "_server_instances", ()))
+
+    async def stop(self) -> None:
+        async with self._lock:
+            running, self._running = self._running, None
+            if running is None:
+                return
+            running.stop.set()
+            await running.task
+
+    async def aclose(self) -> None:
+        if self._watcher:
+            self._watcher.cancel()
+            self._watcher = None
+        await self.stop()
+
+
+class McpServerRegistry:
+    """
+    MCP servers declared up front but created on demand: each is started
+    on the first request to its prefix, and all of them are created for
+    the OpenAPI document on the first request for it.
+    """
+
+    def __init__(
+        self,
+        servers: List[McpServer],
+        idle_timeout: float | None = None,
+        openapi_cache: McpOpenApiCache | None = None,
+    ):
+        self.apps: Dict[str, LazyMcpApp] = {
+            mcp.prefix: LazyMcpApp(mcp, idle_timeout) for mcp in servers
+        }
+        self.openapi_cache = openapi_cache
+        self._openapi_lock = asyncio.Lock()
+        self._openapi_merged = False
+
+    def mount(self, app: FastAPI) -> None:
+        for prefix, lazy in self.apps.items():
+            app.mount(prefix, lazy, lazy.mcp.name)
+
+    async def merge_openapi(self, app: FastAPI) -> None:
+        """Merge the OpenAPI document of every server into `app`, once."""
+        if self._openapi_merged:
+            return
+
+        async with self._openapi_lock:
+            if self._openapi_merged:
+                return
+            for lazy in self.apps.values():
+                mcp = lazy.mcp
+                # Documenting a server does not need its session manager,
+                # so a server that is not running is not kept around
+                mcp_oa = await build_mcp_openapi_dict(
+                    lazy.server or mcp.factory(),
+                    title=mcp.name,
+                    version=mcp.version,
+                    prefix=mcp.prefix,
+                    group=mcp.group,
+                    cache=self.openapi_cache,
+                )
+                merge_openapi_into_app(app, mcp_oa)
+            self._openapi_merged = True
+
+    async def aclose(self) -> None:
+        for lazy in self.apps.values():
+            await lazy.aclose()